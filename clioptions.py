@@ -18,7 +18,7 @@ logger.info("Using config file at: %s", VPINFE_INI_PATH)
 iniconfig = IniConfig(str(VPINFE_INI_PATH))
 
 
-def buildMetaData(downloadMedia: bool = True, updateAll: bool = True, tableName: str = None, userMedia: bool = False, progress_cb=None, log_cb=None):
+def buildMetaData(downloadMedia: bool = True, updateAll: bool = True, tableName: str = None, userMedia: bool = False, progress_cb=None, log_cb=None, jobs: int = None):
     return metadata_service.build_metadata(
         downloadMedia=downloadMedia,
         updateAll=updateAll,
@@ -27,6 +27,7 @@ def buildMetaData(downloadMedia: bool = True, updateAll: bool = True, tableName:
         progress_cb=progress_cb,
         log_cb=log_cb,
         iniconfig=iniconfig,
+        jobs=jobs,
     )
 
 
@@ -40,6 +41,15 @@ def restore_info_files(table_name: str = None, progress_cb=None, log_cb=None):
         progress_cb=progress_cb, log_cb=log_cb)
 
 
+def faststartVideos(tableName=None, progress_cb=None, log_cb=None):
+    return metadata_service.faststart_videos(
+        tableName=tableName,
+        progress_cb=progress_cb,
+        log_cb=log_cb,
+        iniconfig=iniconfig,
+    )
+
+
 def listMissingTables():
     return table_report_service.list_missing_tables(iniconfig=iniconfig, log=logger.info)
 
@@ -114,6 +124,7 @@ def parseArgs():
     parser.add_argument("--vpxpatch", action="store_true", help="Attempt to apply patches automatically")
     parser.add_argument("--gamepadtest", action="store_true", help="Test and map your gamepad via JS API")
     parser.add_argument("--headless", action="store_true", help="Run web servers/services only, skip the Chromium frontend")
+    parser.add_argument("--faststart-videos", action="store_true", help="Find table videos with the moov atom at the end and cache fast-start copies for the asset server to send")
     parser.add_argument("--claim-user-media", action="store_true", help="Bulk mark existing media files as user-sourced so they won't be overwritten by vpinmediadb")
 
     # Secondary args
@@ -121,7 +132,8 @@ def parseArgs():
     parser.add_argument("--update-all", action="store_true", help="Reparse all tables when building meta.ini")
     parser.add_argument("--user-media", action="store_true", help="With --buildmeta: skip vpinmediadb downloads and claim existing local media as user-sourced")
     parser.add_argument("--restore-info", action="store_true", help="Put back the table info and collections a newer VPinFE saved before upgrading them. Your current files are kept first")
-    parser.add_argument("--table", help="Specify a single table folder name to process with --buildmeta, --claim-user-media or --restore-info")
+    parser.add_argument("--jobs", type=int, metavar="N", help="With --buildmeta: tables to process at once (0 = one per CPU, 1 = serial). Defaults to Settings.metadatajobs")
+    parser.add_argument("--table", help="Specify a single table folder name to process with --buildmeta, --claim-user-media, --faststart-videos or --restore-info")
 
     args, unknown = parser.parse_known_args()  # macOS-friendly parsing
 
@@ -168,12 +180,16 @@ def parseArgs():
         claimUserMedia(tableName=args.table)
         sys.exit()
 
+    if args.faststart_videos:
+        faststartVideos(tableName=args.table)
+        sys.exit()
+
     if args.restore_info:
         restore_info_files(table_name=args.table)
         sys.exit()
 
     if args.buildmeta:
-        buildMetaData(downloadMedia=not args.no_media, updateAll=args.update_all, tableName=args.table, userMedia=args.user_media)
+        buildMetaData(downloadMedia=not args.no_media, updateAll=args.update_all, tableName=args.table, userMedia=args.user_media, jobs=args.jobs)
         sys.exit()
 
     if args.gamepadtest:
@@ -60,11 +60,11 @@ def get_collections_metadata() -> list[dict]:
     return rows
 
 
-def filter_tables_by_collection(tables, collection: str):
+def filter_tables_by_collection(tables, collection: str, index=None):
     manager = get_collections_manager()
     if manager.is_filter_based(collection):
         filters = manager.get_filters(collection)
-        filtered = TableListFilters(tables).apply_filters(
+        filtered = TableListFilters(tables, index=index).apply_filters(
             letter=filters["letter"],
             theme=filters["theme"],
             table_type=filters["table_type"],
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from typing import Any
 
 from common.table_metadata import is_truthy
 
 
+# More threads than this stops helping even on a slow share and just queues on the server.
+MAX_TABLE_SCAN_WORKERS = 32
+# Each metadata job may also be downloading media, so the cap is kept friendly to the hosts.
+MAX_METADATA_JOBS = 16
+
+
 def _parser(source):
     return getattr(source, "config", source)
 
@@ -39,6 +46,13 @@ def cfg_int(source, section: str, key: str, fallback: int = 0) -> int:
         return fallback
 
 
+def resolve_metadata_jobs(jobs: int) -> int:
+    """How many tables a metadata build works on at once; 0 or less means one per CPU."""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return max(1, min(MAX_METADATA_JOBS, jobs))
+
+
 @dataclass(frozen=True)
 class SettingsConfig:
     table_root_dir: str = ""
@@ -60,6 +74,9 @@ class SettingsConfig:
     cab_mode: bool = False
     hide_quit_button: bool = False
     restore_last_table: bool = True
+    table_scan_workers: int = 1
+    metadata_jobs: int = 1
+    watch_tables: bool = False
 
     @classmethod
     def from_config(cls, source: Any) -> "SettingsConfig":
@@ -84,6 +101,9 @@ class SettingsConfig:
             cab_mode=cfg_bool(source, "Settings", "cabmode", False),
             hide_quit_button=cfg_bool(source, "Settings", "MMhideQuitButton", False),
             restore_last_table=cfg_bool(source, "Settings", "restorelasttable", True),
+            table_scan_workers=max(1, min(MAX_TABLE_SCAN_WORKERS, cfg_int(source, "Settings", "tablescanworkers", 1))),
+            metadata_jobs=cfg_int(source, "Settings", "metadatajobs", 1),
+            watch_tables=cfg_bool(source, "Settings", "watchtables", False),
         )
 
 
@@ -182,6 +202,17 @@ class DisplayConfig:
         return ""
 
 
+@dataclass(frozen=True)
+class LoggerConfig:
+    slow_api_call_ms: int = 0
+
+    @classmethod
+    def from_config(cls, source: Any) -> "LoggerConfig":
+        return cls(
+            slow_api_call_ms=max(0, cfg_int(source, "Logger", "slowapicallms", 0)),
+        )
+
+
 @dataclass(frozen=True)
 class VPinPlayConfig:
     api_endpoint: str = ""
@@ -0,0 +1,93 @@
+"""A directory of generated files, bounded in bytes and trimmed least-recently-used first.
+
+Shared by the asset server's image derivatives and fast-start video copies. Entries are
+named by a hash of whatever they were made from, so a changed source simply gets a new
+name and the stale entry ages out. Recency is the file's mtime, touched on every hit,
+which keeps the cache correct across restarts without an index file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class BoundedFileCache:
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._building: dict[str, threading.Lock] = {}
+        self._total_bytes: int | None = None  # counted from disk on first add
+
+    @staticmethod
+    def key(*parts) -> str:
+        raw = "\0".join(str(part) for part in parts)
+        return hashlib.sha1(raw.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    @staticmethod
+    def tmp_path(path: Path) -> Path:
+        return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    @staticmethod
+    def touch(path: Path) -> bool:
+        """Mark an entry as just used; False when it does not exist."""
+        try:
+            os.utime(path, None)
+        except OSError:
+            return False
+        return True
+
+    @contextmanager
+    def building(self, key: str):
+        """Held while an entry is made, so concurrent requests for it make it once."""
+        with self._lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def added(self, size: int, replaced: int = 0) -> None:
+        """Account for a new entry of `size` bytes, trimming the oldest if over budget.
+
+        `replaced` is the size of the entry it overwrote, if any, which no longer counts.
+        """
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry[1] for entry in self._scan())
+            else:
+                self._total_bytes += size - replaced
+            if self._total_bytes <= self.max_bytes:
+                return
+            # Trim to 90% so a full cache is not rescanned on every new entry.
+            target = self.max_bytes * 9 // 10
+            entries = sorted(self._scan())
+            total = sum(entry[1] for entry in entries)
+            for _mtime, entry_size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= entry_size
+            self._total_bytes = total
@@ -0,0 +1,149 @@
+"""Resized, re-encoded copies of table images for the asset server.
+
+Themes draw a wheel icon a couple of hundred pixels wide from a `wheel.png` that is often
+1000+ px, and a backglass thumbnail from a 4K `bg.png`. Every one of those is decoded at
+full size in Chromium and uploaded to the GPU. A request like
+`/tables/<table>/medias/wheel.png?w=256&fmt=webp` gets a copy scaled to fit the box
+instead, encoded once and then served from disk like any other file.
+
+Derivatives are keyed by the source path, its size and mtime_ns and the requested box
+and format, so replacing an image produces a new key and the old copy simply ages out of
+the size-bounded cache (see file_cache).
+
+Pillow is a core dependency, but if it cannot be imported the server just sends the
+original image.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from common.file_cache import BoundedFileCache
+
+
+logger = logging.getLogger("vpinfe.common.image_derivatives")
+
+SOURCE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif"}
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 85, "method": 4}),
+    "png": ("PNG", "image/png", {"optimize": False}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 85}),
+}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+# Larger than any screen a theme draws on; bigger boxes are clamped to this.
+MAX_DIMENSION = 4096
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    width: int | None
+    height: int | None
+    fmt: str
+
+    @property
+    def tag(self) -> str:
+        """Short text that tells derivatives of one source apart, e.g. in ETags."""
+        return f"w{self.width or 0}h{self.height or 0}.{self.fmt}"
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.fmt][1]
+
+    @classmethod
+    def from_query(cls, query: str) -> "DerivativeSpec | None":
+        """The derivative a `w=&h=&fmt=` query asks for, or None to serve the original.
+
+        A query without a size or format, or with values that do not parse, leaves the
+        original alone rather than failing the request. Only a format means a same-size
+        re-encode.
+        """
+        if not query:
+            return None
+        params = parse_qs(query)
+        if not any(key in params for key in ("w", "h", "fmt")):
+            return None
+
+        def dimension(key):
+            raw = (params.get(key) or [""])[0].strip()
+            if not raw:
+                return None
+            value = int(raw)
+            if value <= 0:
+                raise ValueError(key)
+            return min(value, MAX_DIMENSION)
+
+        try:
+            width, height = dimension("w"), dimension("h")
+        except ValueError:
+            return None
+        fmt = (params.get("fmt") or ["webp"])[0].strip().lower()
+        fmt = FORMAT_ALIASES.get(fmt, fmt)
+        if fmt not in FORMATS:
+            return None
+        return cls(width, height, fmt)
+
+
+def is_derivable(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SOURCE_EXTENSIONS
+
+
+class ImageDerivativeCache(BoundedFileCache):
+    def __init__(self, root: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        super().__init__(root, max_bytes)
+
+    def get(self, source_path: str, st: os.stat_result, spec: DerivativeSpec) -> Path | None:
+        """Path of the derivative, rendering it on first request; None to send the original."""
+        key = self.key(os.path.abspath(source_path), st.st_size, st.st_mtime_ns, spec.tag)
+        path = self.path(key, f".{spec.fmt}")
+        if self.touch(path):
+            return path
+
+        # Three windows often ask for the same image at once; render it once.
+        with self.building(key):
+            if self.touch(path):
+                return path
+            size = self._render(source_path, path, spec)
+            if size is None:
+                return None
+        self.added(size)
+        return path
+
+    def _render(self, source_path: str, path: Path, spec: DerivativeSpec) -> int | None:
+        try:
+            from PIL import Image, ImageOps
+        except Exception:
+            return None
+
+        pil_format, _content_type, options = FORMATS[spec.fmt]
+        tmp_path = self.tmp_path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with Image.open(source_path) as img:
+                img = ImageOps.exif_transpose(img)
+                has_alpha = (
+                    img.mode in ("RGBA", "LA")
+                    or (img.mode == "P" and "transparency" in img.info)
+                )
+                if spec.fmt == "jpeg":
+                    has_alpha = False
+                img = img.convert("RGBA" if has_alpha else "RGB")
+                # Fit inside the box, keeping the aspect ratio; never upscale.
+                img.thumbnail(
+                    (spec.width or MAX_DIMENSION, spec.height or MAX_DIMENSION),
+                    Image.Resampling.LANCZOS,
+                )
+                img.save(tmp_path, format=pil_format, **options)
+            os.replace(tmp_path, path)
+            return path.stat().st_size
+        except Exception as exc:
+            logger.warning("Could not make %s derivative of %s: %s", spec.tag, source_path, exc)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return None
@@ -149,7 +149,7 @@ def replace_atomic(source, path):
         raise
 
 
-def write_json_atomic(path, data):
+def write_json_atomic(path, data, indent=4):
     """Write a .info so a reader sees either the old file or the new one, never half of one.
 
     A plain open(path, "w") truncates before it writes, so an interrupted write leaves a
@@ -161,7 +161,7 @@ def write_json_atomic(path, data):
     handle_fd, tmp = tempfile.mkstemp(dir=directory, prefix=".vpinfe_write_", suffix=".tmp")
     try:
         with os.fdopen(handle_fd, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=4)
+            json.dump(data, handle, indent=indent)
             handle.flush()
             os.fsync(handle.fileno())
         os.replace(tmp, path)
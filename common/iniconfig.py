@@ -70,6 +70,9 @@ class IniConfig:
 				'disabledefaultchromeoptions': 'false',
 				'MMhideQuitButton': 'false',
 				'restorelasttable': 'true',
+				'tablescanworkers': '1',
+				'metadatajobs': '1',
+				'watchtables': 'false',
 				},
 			'Input': {
 				'joyleft': '',
@@ -102,6 +105,7 @@ class IniConfig:
 			'Logger': {
 				'level': 'debug',
 				'console': 'true',
+				'slowapicallms': '0',
 				},
 				'Media': {
 					'tabletype': 'table',
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
 import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from common.config_access import MediaConfig, SettingsConfig
+from common.config_access import MediaConfig, SettingsConfig, resolve_metadata_jobs
 from common.iniconfig import IniConfig
 from common.jobs import JobReporter
 from common.media_paths import media_filename_map
 from common.metaconfig import MetaConfig
-from common.paths import get_ini_config
+from common.mp4_faststart import FASTSTART, MOOV_AT_END, FaststartCache
+from common.paths import FASTSTART_CACHE_DIR, VPX_PARSE_CACHE_PATH, get_ini_config
 from common.standalonescripts import StandaloneScripts
 from common.tableparser import TableParser
 from common.vpsdb import VPSdb
+from common.vpx_parse_cache import UNCACHED_FIELDS, VPXParseCache, file_stamp
 from common.vpxparser import VPXParser
 
 
@@ -22,6 +28,57 @@ def _config(config: IniConfig | None = None) -> IniConfig:
     return config or get_ini_config()
 
 
+def _extract_vpx(vpx_path: str):
+    """Parse one .vpx in a pool worker. The parent owns the parse cache, so none here."""
+    values = VPXParser().singleFileExtract(vpx_path)
+    if values:
+        # Nothing in a metadata build reads the script; don't pickle it back to the parent.
+        for key in UNCACHED_FIELDS:
+            values.pop(key, None)
+    return values
+
+
+def _parse_executor(workers: int):
+    """Where cache misses are parsed: a process pool when one is safe to start, else threads.
+
+    Hashing a .vpx releases the GIL but the olefile walk and the VBScript scans do not, so
+    processes are what let a rebuild use every core. They are only started where that
+    cannot go wrong: forked from a process with no other threads (the CLI build), or
+    spawned from the frozen app, where freeze_support() in main.py catches the child.
+    Spawning from a source checkout would re-run main.py, which has no __main__ guard,
+    and forking the running frontend or manager UI would copy its threads' locks.
+    """
+    if getattr(sys, "frozen", False):
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    if threading.active_count() == 1 and "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vpx-parse")
+
+
+class _TableReport:
+    """One table's log and progress calls, held until it is that table's turn to report.
+
+    Tables finish out of order in a parallel build; replaying in table order keeps the
+    log and the progress bar exactly as a serial build would produce them.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[bool, str]] = []
+
+    def log(self, message: str) -> None:
+        self.calls.append((True, message))
+
+    def progress(self, message: str) -> None:
+        self.calls.append((False, message))
+
+    def replay(self, reporter: JobReporter, current: int, total: int) -> None:
+        for is_log, message in self.calls:
+            if is_log:
+                reporter.log(message)
+            else:
+                reporter.progress(current, total, message)
+
+
 def build_metadata(
     downloadMedia: bool = True,
     updateAll: bool = True,
@@ -30,14 +87,15 @@ def build_metadata(
     progress_cb=None,
     log_cb=None,
     iniconfig: IniConfig | None = None,
+    jobs: int | None = None,
 ):
     config = _config(iniconfig)
 
     reporter = JobReporter(logger, progress_cb=progress_cb, log_cb=log_cb)
     log = reporter.log
 
-    not_found_tables = 0
-    parservpx = VPXParser()
+    # A rebuild over an unchanged library then costs a stat per .vpx, not a full read.
+    parse_cache = VPXParseCache(VPX_PARSE_CACHE_PATH)
 
     settings = SettingsConfig.from_config(config)
     media_config = MediaConfig.from_config(config)
@@ -46,6 +104,9 @@ def build_metadata(
     tp.loadTables(reload=True)
     tables = tp.getAllTables()
 
+    if not tableName:
+        parse_cache.prune(table.fullPathVPXfile for table in tables if table.fullPathVPXfile)
+
     if tableName:
         tables = [table for table in tables if table.tableDirName == tableName]
         if not tables:
@@ -54,6 +115,9 @@ def build_metadata(
         log(f"Processing single table: {tableName}")
 
     total = len(tables)
+    if jobs is None:
+        jobs = settings.metadata_jobs
+    workers = min(resolve_metadata_jobs(jobs), total) or 1
 
     vps = VPSdb(settings.table_root_dir, config)
     log(f"Found {len(vps)} tables in VPSdb")
@@ -61,19 +125,35 @@ def build_metadata(
     if progress_cb:
         reporter.progress(0, total, "Starting")
 
-    for current, table in enumerate(tables, 1):
+    parse_pool = _parse_executor(workers) if workers > 1 else None
+
+    def parse_vpx(vpx_path):
+        stamp = file_stamp(vpx_path)
+        values = parse_cache.lookup(vpx_path, stamp)
+        if values is not None:
+            return values
+        if parse_pool is None:
+            values = _extract_vpx(vpx_path)
+        else:
+            values = parse_pool.submit(_extract_vpx, vpx_path).result()
+        if values:
+            parse_cache.store(vpx_path, stamp, values)
+        return values
+
+    def process_table(table, log, progress):
+        """Returns 1 when the table could not be matched or parsed, else 0."""
         info_path = os.path.join(table.fullPathTable, f"{table.tableDirName}.info")
 
         if os.path.exists(info_path) and not updateAll:
             if progress_cb:
-                reporter.progress(current, total, f"Skipping {table.tableDirName}")
-            continue
+                progress(f"Skipping {table.tableDirName}")
+            return 0
 
         meta = MetaConfig(info_path)
 
         log(f"Checking VPSdb for {table.tableDirName}")
         if progress_cb:
-            reporter.progress(current, total, f"Processing {table.tableDirName}")
+            progress(f"Processing {table.tableDirName}")
 
         vpsSearchData = vps.parseTableNameFromDir(table.tableDirName)
         vpsData = (
@@ -88,16 +168,14 @@ def build_metadata(
 
         if not vpsData:
             log("  - Not found in VPS")
-            not_found_tables += 1
-            continue
+            return 1
 
         log(f"Parsing VPX file: {table.fullPathVPXfile}")
-        vpxData = parservpx.singleFileExtract(table.fullPathVPXfile)
+        vpxData = parse_vpx(table.fullPathVPXfile)
 
         if not vpxData:
             log(f"  - VPX file not found or failed to parse: {table.fullPathVPXfile}")
-            not_found_tables += 1
-            continue
+            return 1
 
         meta.writeConfigMeta({
             "vpsdata": vpsData,
@@ -116,6 +194,31 @@ def build_metadata(
                 log("Downloaded media")
             except KeyError:
                 log("No media found")
+        return 0
+
+    not_found_tables = 0
+    try:
+        if workers == 1:
+            for current, table in enumerate(tables, 1):
+                not_found_tables += process_table(
+                    table, log, lambda message, current=current: reporter.progress(current, total, message)
+                )
+        else:
+            # Each table runs lookup -> parse -> .info -> media on its own thread; the
+            # parse itself goes to parse_pool. Tables only touch their own folder and
+            # .info, so the results do not depend on how the work interleaves.
+            def run(table):
+                report = _TableReport()
+                return process_table(table, report.log, report.progress), report
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="buildmeta") as pool:
+                for current, (missed, report) in enumerate(pool.map(run, tables), 1):
+                    report.replay(reporter, current, total)
+                    not_found_tables += missed
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+        parse_cache.save()
 
     if progress_cb:
         reporter.progress(total, total, "Complete")
@@ -199,3 +302,58 @@ def claim_user_media(tableName=None, progress_cb=None, log_cb=None, iniconfig: I
 
     log(f"\nDone. Scanned {total} tables, claimed {total_claimed} media files as user-sourced.")
     return {"tables_processed": total, "media_claimed": total_claimed}
+
+
+VIDEO_ATTRS = ("TableVideoPath", "BGVideoPath", "DMDVideoPath")
+
+
+def faststart_videos(tableName=None, progress_cb=None, log_cb=None, iniconfig: IniConfig | None = None, cache: FaststartCache | None = None):
+    """Check where every table video keeps its moov and cache fast-start copies of the rest.
+
+    The asset server then sends the copies in place of the originals (see
+    common.mp4_faststart); the videos in the table folders are not touched.
+    """
+    config = _config(iniconfig)
+    cache = cache or FaststartCache(FASTSTART_CACHE_DIR, remux_in_background=False)
+
+    reporter = JobReporter(logger, progress_cb=progress_cb, log_cb=log_cb)
+    log = reporter.log
+
+    settings = SettingsConfig.from_config(config)
+    tp = TableParser(settings.table_root_dir, config)
+    tp.loadTables(reload=True)
+    tables = tp.getAllTables()
+
+    if tableName:
+        tables = [table for table in tables if table.tableDirName == tableName]
+        if not tables:
+            log(f"Table folder '{tableName}' not found")
+            return {"videos_scanned": 0, "already_faststart": 0, "remuxed": 0, "skipped": 0}
+
+    counts = {"videos_scanned": 0, "already_faststart": 0, "remuxed": 0, "skipped": 0}
+    total = len(tables)
+    reporter.progress(0, total, "Starting")
+    for current, table in enumerate(tables, 1):
+        reporter.progress(current, total, f"Checking {table.tableDirName}")
+        for attr in VIDEO_ATTRS:
+            video = getattr(table, attr, None)
+            if not video or not os.path.isfile(video):
+                continue
+            counts["videos_scanned"] += 1
+            info, copy = cache.ensure(video)
+            name = os.path.basename(video)
+            if info.status == FASTSTART:
+                counts["already_faststart"] += 1
+            elif info.status == MOOV_AT_END and copy is not None:
+                counts["remuxed"] += 1
+                log(f"  {table.tableDirName}: {name} has moov at the end; cached a fast-start copy")
+            else:
+                counts["skipped"] += 1
+                log(f"  {table.tableDirName}: left {name} as is ({info.reason or info.status})")
+    reporter.progress(total, total, "Complete")
+
+    log(
+        f"\nDone. Checked {counts['videos_scanned']} videos: {counts['already_faststart']} already fast-start, "
+        f"{counts['remuxed']} fast-start copies cached, {counts['skipped']} left as is."
+    )
+    return counts
@@ -0,0 +1,296 @@
+"""Fast-start copies of table videos whose `moov` atom sits after the media data.
+
+An MP4's `moov` atom holds the sample tables the player needs before it can decode a
+single frame. Encoders that write it last (the default for ffmpeg without
+`-movflags +faststart`, and common in downloaded table videos) leave Chromium to fetch the
+start of the file, see `mdat`, then issue another range request for the end of the file
+before the first frame appears. When the wheel stops on a table that is a visible delay.
+
+Moving `moov` in front of `mdat` is a byte shuffle, not a re-encode: the atom is copied
+earlier and every chunk offset in its `stco`/`co64` tables that points into the moved-over
+range is increased by the atom's size. The copies are kept in a size-bounded cache keyed
+by the source path, size and mtime, and the asset server sends one in place of the
+original when it exists.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from common.file_cache import BoundedFileCache
+
+
+logger = logging.getLogger("vpinfe.common.mp4_faststart")
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024 * 1024
+# A moov this large is not a table video; leave the file alone rather than load it.
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+# Atoms whose children are atoms, on the way from moov down to the chunk offset tables.
+CONTAINER_ATOMS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts", b"dinf"}
+
+FASTSTART = "faststart"
+MOOV_AT_END = "moov_at_end"
+UNSUPPORTED = "unsupported"
+NOT_MP4 = "not_mp4"
+
+
+@dataclass(frozen=True)
+class Atom:
+    kind: bytes
+    offset: int
+    size: int
+    header_size: int
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.size
+
+
+@dataclass(frozen=True)
+class FaststartInfo:
+    status: str
+    reason: str = ""
+    moov: Atom | None = None
+    first_mdat: Atom | None = None
+
+    @property
+    def needs_remux(self) -> bool:
+        return self.status == MOOV_AT_END
+
+
+def _read_atom_header(data, offset: int, limit: int) -> Atom | None:
+    """The atom at `offset` in `data` (bytes or a file), or None if it does not fit."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        head = bytes(data[offset:offset + 16])
+    else:
+        data.seek(offset)
+        head = data.read(16)
+    if len(head) < 8:
+        return None
+    size, kind = struct.unpack(">I4s", head[:8])
+    header_size = 8
+    if size == 1:
+        if len(head) < 16:
+            return None
+        size = struct.unpack(">Q", head[8:16])[0]
+        header_size = 16
+    elif size == 0:
+        size = limit - offset
+    if size < header_size or offset + size > limit:
+        return None
+    return Atom(kind, offset, size, header_size)
+
+
+def read_top_level_atoms(f, file_size: int) -> list[Atom] | None:
+    """The file's top-level atoms in order, or None if they do not tile the file."""
+    atoms = []
+    offset = 0
+    while offset < file_size:
+        atom = _read_atom_header(f, offset, file_size)
+        if atom is None:
+            return None
+        atoms.append(atom)
+        offset = atom.end
+    return atoms
+
+
+def analyze(path: str | os.PathLike) -> FaststartInfo:
+    """Where the file's moov sits, reading only the atom headers."""
+    try:
+        with open(path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            atoms = read_top_level_atoms(f, file_size)
+    except OSError as exc:
+        return FaststartInfo(UNSUPPORTED, f"unreadable: {exc}")
+    if not atoms or atoms[0].kind not in (b"ftyp", b"free", b"skip", b"wide"):
+        return FaststartInfo(NOT_MP4, "no ftyp atom")
+
+    moov = next((atom for atom in atoms if atom.kind == b"moov"), None)
+    first_mdat = next((atom for atom in atoms if atom.kind == b"mdat"), None)
+    if moov is None or first_mdat is None:
+        return FaststartInfo(NOT_MP4, "no moov or mdat atom")
+    if moov.offset < first_mdat.offset:
+        return FaststartInfo(FASTSTART, moov=moov, first_mdat=first_mdat)
+    if any(atom.kind == b"moof" for atom in atoms):
+        return FaststartInfo(UNSUPPORTED, "fragmented MP4", moov, first_mdat)
+    if moov.size > MAX_MOOV_BYTES:
+        return FaststartInfo(UNSUPPORTED, "moov atom too large", moov, first_mdat)
+    return FaststartInfo(MOOV_AT_END, moov=moov, first_mdat=first_mdat)
+
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, moved_from: int, moved_to: int, delta: int) -> None:
+    """Add `delta` to every chunk offset in [moved_to, moved_from) within moov[start:end].
+
+    Data between the insertion point and moov's old position moves down by moov's size;
+    data after the old moov ends up where it was.
+    """
+    offset = start
+    while offset < end:
+        atom = _read_atom_header(moov, offset, end)
+        if atom is None:
+            raise ValueError("malformed atom inside moov")
+        body = atom.offset + atom.header_size
+        if atom.kind == b"cmov":
+            raise ValueError("compressed moov")
+        if atom.kind in CONTAINER_ATOMS:
+            _shift_chunk_offsets(moov, body, atom.end, moved_from, moved_to, delta)
+        elif atom.kind in (b"stco", b"co64"):
+            wide = atom.kind == b"co64"
+            fmt, width = (">Q", 8) if wide else (">I", 4)
+            count = struct.unpack_from(">I", moov, body + 4)[0]
+            table = body + 8
+            if table + count * width > atom.end:
+                raise ValueError(f"truncated {atom.kind.decode()} table")
+            for i in range(count):
+                pos = table + i * width
+                value = struct.unpack_from(fmt, moov, pos)[0]
+                if moved_to <= value < moved_from:
+                    value += delta
+                    if not wide and value > 0xFFFFFFFF:
+                        raise ValueError("chunk offset no longer fits in stco")
+                    struct.pack_into(fmt, moov, pos, value)
+        offset = atom.end
+
+
+def _copy_range(src, dst, start: int, length: int) -> None:
+    src.seek(start)
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(1024 * 1024, remaining))
+        if not chunk:
+            raise ValueError("file ended early")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def write_faststart(src_path: str | os.PathLike, dst_path: str | os.PathLike, info: FaststartInfo | None = None) -> FaststartInfo:
+    """Write a copy of `src_path` with moov moved in front of the first mdat.
+
+    Returns the analysis; nothing is written unless its status is MOOV_AT_END. Raises
+    ValueError when the moov cannot be rewritten safely (the copy is then not made).
+    """
+    info = info or analyze(src_path)
+    if not info.needs_remux:
+        return info
+    moov_atom, insert_at = info.moov, info.first_mdat.offset
+
+    with open(src_path, "rb") as src:
+        file_size = os.fstat(src.fileno()).st_size
+        src.seek(moov_atom.offset)
+        moov = bytearray(src.read(moov_atom.size))
+        if len(moov) != moov_atom.size:
+            raise ValueError("file ended inside moov")
+        if moov_atom.header_size == 8 and struct.unpack_from(">I", moov, 0)[0] == 0:
+            # "To end of file" is only true where it was; give the atom its real size.
+            if moov_atom.size > 0xFFFFFFFF:
+                raise ValueError("moov atom too large")
+            struct.pack_into(">I", moov, 0, moov_atom.size)
+        _shift_chunk_offsets(
+            moov, moov_atom.header_size, len(moov),
+            moved_from=moov_atom.offset, moved_to=insert_at, delta=moov_atom.size,
+        )
+
+        with open(dst_path, "wb") as dst:
+            _copy_range(src, dst, 0, insert_at)
+            dst.write(moov)
+            _copy_range(src, dst, insert_at, moov_atom.offset - insert_at)
+            _copy_range(src, dst, moov_atom.end, file_size - moov_atom.end)
+    return info
+
+
+class FaststartCache(BoundedFileCache):
+    """Fast-start copies for the asset server, made by the library job or in the background.
+
+    `lookup` is on the request path: it answers from a memo of each file's analysis, and
+    never remuxes inline. With `remux_in_background`, a miss on a file that needs one
+    queues it on a single worker thread, so the next time the table comes up it is fast.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = DEFAULT_MAX_BYTES, remux_in_background: bool = True) -> None:
+        super().__init__(root, max_bytes)
+        self.remux_in_background = remux_in_background
+        self._analysis: dict[tuple, FaststartInfo] = {}
+        self._pending: queue.Queue = queue.Queue()
+        self._queued: set[tuple] = set()
+        self._worker: threading.Thread | None = None
+
+    def _key(self, source_path: str, st: os.stat_result) -> str:
+        return self.key(os.path.abspath(source_path), st.st_size, st.st_mtime_ns, "faststart")
+
+    def analysis(self, source_path: str, st: os.stat_result) -> FaststartInfo:
+        memo_key = (os.path.abspath(source_path), st.st_size, st.st_mtime_ns)
+        info = self._analysis.get(memo_key)
+        if info is None:
+            info = analyze(source_path)
+            self._analysis[memo_key] = info
+        return info
+
+    def cached_copy(self, source_path: str, st: os.stat_result) -> Path | None:
+        """The fast-start copy of the file if one has been made."""
+        path = self.path(self._key(source_path, st), ".mp4")
+        return path if self.touch(path) else None
+
+    def lookup(self, source_path: str, st: os.stat_result) -> Path | None:
+        """The cached fast-start copy of the file, or None to send the original."""
+        path = self.cached_copy(source_path, st)
+        if path is not None:
+            return path
+        if self.remux_in_background and self.analysis(source_path, st).needs_remux:
+            self._queue(source_path, st)
+        return None
+
+    def ensure(self, source_path: str, st: os.stat_result | None = None) -> tuple[FaststartInfo, Path | None]:
+        """Analyse the file and make its fast-start copy if it needs one."""
+        st = st or os.stat(source_path)
+        info = self.analysis(source_path, st)
+        if not info.needs_remux:
+            return info, None
+        key = self._key(source_path, st)
+        path = self.path(key, ".mp4")
+        with self.building(key):
+            if self.touch(path):
+                return info, path
+            tmp_path = self.tmp_path(path)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                write_faststart(source_path, tmp_path, info)
+                os.replace(tmp_path, path)
+            except (OSError, ValueError) as exc:
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                info = FaststartInfo(UNSUPPORTED, str(exc), info.moov, info.first_mdat)
+                self._analysis[(os.path.abspath(source_path), st.st_size, st.st_mtime_ns)] = info
+                return info, None
+        self.added(path.stat().st_size)
+        return info, path
+
+    def _queue(self, source_path: str, st: os.stat_result) -> None:
+        memo_key = (os.path.abspath(source_path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if memo_key in self._queued:
+                return
+            self._queued.add(memo_key)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="faststart-remux", daemon=True)
+                self._worker.start()
+        self._pending.put((source_path, st))
+
+    def _work(self) -> None:
+        while True:
+            source_path, st = self._pending.get()
+            try:
+                info, path = self.ensure(source_path, st)
+                if path is not None:
+                    logger.info("Made fast-start copy of %s", source_path)
+                elif info.status == UNSUPPORTED:
+                    logger.info("Left %s as is: %s", source_path, info.reason)
+            except Exception:
+                logger.warning("Fast-start remux of %s failed", source_path, exc_info=True)
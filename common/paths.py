@@ -26,6 +26,13 @@ THEMES_DIR = CONFIG_DIR / "themes"
 PLUGIN_PROFILES_DIR = CONFIG_DIR / "plugin_profiles"
 USER_CONFIG_PATH = VPINFE_INI_PATH
 USER_ROMS_PATH = CONFIG_DIR / "roms.json"
+TABLE_SCAN_INDEX_PATH = CONFIG_DIR / "table_scan_index.json"
+VPX_PARSE_CACHE_PATH = CONFIG_DIR / "vpx_parse_cache.json"
+IMAGE_DERIVATIVE_CACHE_DIR = CONFIG_DIR / "cache" / "image_derivatives"
+FASTSTART_CACHE_DIR = CONFIG_DIR / "cache" / "faststart"
+WEB_PAGE_CACHE_DIR = CONFIG_DIR / "cache" / "web_pages"
+# Theme updates downloaded while the theme was in use, installed at the next start.
+THEME_UPDATES_DIR = CONFIG_DIR / "cache" / "theme_updates"
 
 
 def ensure_config_dir() -> Path:
@@ -1,8 +1,12 @@
 import configparser
 import json
 import logging
+import marshal
 import re
+import struct
 import sys
+import threading
+from collections.abc import Mapping
 from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 from typing import BinaryIO
@@ -217,7 +221,141 @@ def load_roms() -> dict:
         return json.load(f)
 
 
-roms = load_roms()
+# roms.json is a few megabytes of JSON and a score lookup needs one entry of it, so it is
+# read on first use rather than at import, and kept as a compiled snapshot under the
+# config dir's cache: the ROM names with where each entry's marshal bytes sit, read
+# back without parsing the entries themselves. An entry is unmarshalled the first time
+# it is asked for. The snapshot is keyed by the roms.json release SHA the updater
+# records (common/pinmame_score_parser_updater.py) plus the file's size and mtime, so
+# a new download, or a hand-edited file, is compiled afresh. The SHA only guards the
+# snapshot on disk: a running process reloads when the file's size or mtime changes,
+# which every download does, without reading the config on each lookup.
+ROMS_SHA_SECTION = "pinmame-score-parser"
+ROMS_SHA_KEY = "romsupdatesha"
+ROMS_SNAPSHOT_FORMAT = 1
+
+
+class RomDatabase(Mapping):
+    """roms.json, read-only, with each ROM's entry decoded on first lookup."""
+
+    def __init__(self, offsets: dict[str, tuple[int, int]], blob: bytes | memoryview, stamp: tuple = ()) -> None:
+        self._offsets = offsets
+        self._blob = blob
+        self._entries: dict[str, dict] = {}
+        self._lowered: dict[str, str] | None = None
+        self.stamp = stamp
+
+    @classmethod
+    def compile(cls, roms: dict, stamp: tuple = ()) -> "RomDatabase":
+        offsets = {}
+        chunks = []
+        position = 0
+        for name, entry in roms.items():
+            chunk = marshal.dumps(entry)
+            offsets[name] = (position, len(chunk))
+            chunks.append(chunk)
+            position += len(chunk)
+        return cls(offsets, b"".join(chunks), stamp)
+
+    def __getitem__(self, name: str) -> dict:
+        entry = self._entries.get(name)
+        if entry is None:
+            start, length = self._offsets[name]
+            entry = marshal.loads(self._blob[start:start + length])
+            self._entries[name] = entry
+        return entry
+
+    def __contains__(self, name) -> bool:
+        return name in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def find(self, name: str) -> str | None:
+        """The ROM's name as roms.json spells it, matched without regard to case."""
+        if name in self._offsets:
+            return name
+        if self._lowered is None:
+            lowered = {}
+            for existing in self._offsets:
+                lowered.setdefault(existing.lower(), existing)
+            self._lowered = lowered
+        return self._lowered.get(name.lower())
+
+    def to_snapshot(self) -> bytes:
+        header = marshal.dumps((ROMS_SNAPSHOT_FORMAT, self.stamp, self._offsets))
+        return struct.pack("<I", len(header)) + header + self._blob
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, stamp: tuple) -> "RomDatabase | None":
+        # Only the header is unmarshalled here; the entries stay as bytes in `data`.
+        try:
+            (header_length,) = struct.unpack_from("<I", data)
+            snapshot_format, snapshot_stamp, offsets = marshal.loads(data[4:4 + header_length])
+        except (EOFError, ValueError, TypeError, struct.error):
+            return None
+        if snapshot_format != ROMS_SNAPSHOT_FORMAT or snapshot_stamp != stamp:
+            return None
+        return cls(offsets, memoryview(data)[4 + header_length:], stamp)
+
+
+_roms: RomDatabase | None = None
+_roms_lock = threading.Lock()
+
+
+def get_roms_snapshot_path(roms_path: Path) -> Path:
+    return roms_path.parent / "cache" / "roms.snapshot"
+
+
+def _recorded_roms_sha() -> str:
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(USER_CONFIG_PATH, encoding="utf-8")
+    except configparser.Error:
+        return ""
+    return parser.get(ROMS_SHA_SECTION, ROMS_SHA_KEY, fallback="").strip().lower()
+
+
+def _roms_file_stamp(roms_path: Path) -> tuple:
+    st = roms_path.stat()
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _load_rom_database(roms_path: Path, stamp: tuple) -> RomDatabase:
+    snapshot_path = get_roms_snapshot_path(roms_path)
+    try:
+        database = RomDatabase.from_snapshot(snapshot_path.read_bytes(), stamp)
+    except OSError:
+        database = None
+    if database is not None:
+        return database
+
+    database = RomDatabase.compile(load_roms(), stamp)
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = snapshot_path.with_suffix(".tmp")
+        temp_path.write_bytes(database.to_snapshot())
+        temp_path.replace(snapshot_path)
+    except OSError as exc:
+        logging.warning("Could not write roms.json snapshot %s: %s", snapshot_path, exc)
+    return database
+
+
+def get_roms() -> RomDatabase:
+    """The ROM database, loaded on first use and again whenever roms.json changes.
+
+    Raises FileNotFoundError when roms.json has not been downloaded yet.
+    """
+    global _roms
+    roms_path = get_roms_path()
+    with _roms_lock:
+        file_stamp = _roms_file_stamp(roms_path)
+        if _roms is None or _roms.stamp[1:] != file_stamp:
+            _roms = _load_rom_database(roms_path, (_recorded_roms_sha(),) + file_stamp)
+        return _roms
 
 
 def get_default_initials() -> str:
@@ -1498,7 +1636,7 @@ def resolve_rom_name(rom_name: str) -> str:
     if alias_key is not None:
         return rom_aliases[alias_key]
 
-    rom_key = _lookup_case_insensitive(roms, rom_name)
+    rom_key = get_roms().find(rom_name)
     if rom_key is not None:
         return rom_key
 
@@ -1541,7 +1679,7 @@ def format_result(rom_name: str, result: int | list[ParsedEntry]) -> list[str]:
     result = apply_default_initials(result)
 
     if isinstance(result, int):
-        lines.append(f"{roms[resolved_rom_name]['scoretype']}: {result:,}")
+        lines.append(f"{get_roms()[resolved_rom_name]['scoretype']}: {result:,}")
         return lines
 
     last_section = None
@@ -1561,7 +1699,7 @@ def detect_score_type(rom_name: str, filename: str | None = None) -> str:
         return "ini"
 
     resolved_rom_name = resolve_rom_name(rom_name)
-    return roms[resolved_rom_name]["scoretype"]
+    return get_roms()[resolved_rom_name]["scoretype"]
 
 def _has_meaningful_entry(entry: ParsedEntry) -> bool:
     return bool(
@@ -1613,7 +1751,7 @@ def read_rom(
         return decode_ini_file(resolved_filename)
 
     resolved_rom_name = resolve_rom_name(rom_name)
-    rom_config = roms.get(resolved_rom_name)
+    rom_config = get_roms().get(resolved_rom_name)
     if rom_config is None:
         raise KeyError(f"Unknown ROM: {rom_name}")
 
@@ -0,0 +1,118 @@
+"""Run the app's startup steps as a dependency graph rather than one after another.
+
+main.py used to download roms.json, refresh the theme registry, start DOF, scan the
+library, start the asset server and NiceGUI strictly in turn, so the windows waited on
+the slowest network call as well as the library scan. Each step is now a task naming the
+tasks it needs; a task starts on a small thread pool as soon as those have finished, so
+unrelated steps overlap.
+
+`run()` returns once every foreground task is done, which is when the windows can
+launch. Background tasks, for refreshes nothing at startup waits on, start with the
+rest but are not waited for. A task marked optional has its failure logged and the rest
+of startup carries on; any other failure stops startup with a `StartupError`, as an
+exception from the old sequence did.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable
+
+
+logger = logging.getLogger("vpinfe.common.startup")
+
+
+class StartupError(RuntimeError):
+    pass
+
+
+@dataclass
+class StartupTask:
+    name: str
+    func: Callable[[], Any]
+    requires: tuple[str, ...] = ()
+    optional: bool = False
+    background: bool = False
+    result: Any = None
+    error: Exception | None = None
+    elapsed: float | None = None
+
+
+class StartupPlan:
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max_workers
+        self.tasks: dict[str, StartupTask] = {}
+
+    def add(self, name: str, func: Callable[[], Any], requires=(), optional: bool = False,
+            background: bool = False) -> StartupTask:
+        """Declare a task. What it requires has to be declared first, which also rules
+        out cycles. Nothing may require a background task, since nothing waits on one."""
+        if name in self.tasks:
+            raise ValueError(f"Startup task '{name}' is already declared")
+        requires = tuple(requires)
+        for requirement in requires:
+            if requirement not in self.tasks:
+                raise ValueError(f"Startup task '{name}' requires undeclared task '{requirement}'")
+            if self.tasks[requirement].background:
+                raise ValueError(f"Startup task '{name}' cannot require background task '{requirement}'")
+        task = StartupTask(name, func, requires, optional, background)
+        self.tasks[name] = task
+        return task
+
+    def run(self) -> dict[str, Any]:
+        """Run every task, returning the foreground tasks' results by name."""
+        started_at = perf_counter()
+        pending = dict(self.tasks)
+        done: set[str] = set()
+        running = {}
+        failed: StartupTask | None = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup") as pool:
+            def launch_ready():
+                for name, task in list(pending.items()):
+                    if all(requirement in done for requirement in task.requires):
+                        del pending[name]
+                        if task.background:
+                            threading.Thread(
+                                target=self._run_task, args=(task,), name=f"startup-{name}", daemon=True
+                            ).start()
+                        else:
+                            running[pool.submit(self._run_task, task)] = task
+
+            launch_ready()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    if task.error is not None and not task.optional:
+                        failed = failed or task
+                    done.add(task.name)
+                if failed is None:
+                    launch_ready()
+
+        if failed is not None:
+            raise StartupError(f"Startup task '{failed.name}' failed: {failed.error}") from failed.error
+        logger.info("Startup tasks ready in %.0f ms", (perf_counter() - started_at) * 1000)
+        return {name: task.result for name, task in self.tasks.items() if not task.background}
+
+    def _run_task(self, task: StartupTask) -> None:
+        started_at = perf_counter()
+        try:
+            task.result = task.func()
+        except Exception as exc:
+            task.error = exc
+            if task.optional:
+                logger.exception("Startup task '%s' failed", task.name)
+        finally:
+            task.elapsed = perf_counter() - started_at
+        logger.info(
+            "Startup task '%s' %s in %.0f ms%s",
+            task.name,
+            "failed" if task.error is not None else "finished",
+            task.elapsed * 1000,
+            " (background)" if task.background else "",
+        )
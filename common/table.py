@@ -1,39 +1,119 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import sys
+import threading
 from typing import Any
 
 
-@dataclass
+# The bulky parts of a .info that almost nothing reads while browsing the wheel: the
+# media download records and the parsed high-score leaderboard. A loaded table keeps
+# them as one compact JSON string and only turns them back into dicts when something
+# asks for the full metadata.
+_DEFERRED_SECTIONS = ("Medias",)
+_DEFERRED_USER_KEYS = ("Score",)
+
+_PATH_FIELDS = (
+    "tableDirName",
+    "fullPathTable",
+    "fullPathVPXfile",
+    "BGImagePath",
+    "DMDImagePath",
+    "TableImagePath",
+    "FSSImagePath",
+    "WheelImagePath",
+    "CabImagePath",
+    "realDMDImagePath",
+    "realDMDColorImagePath",
+    "FlyerImagePath",
+    "TableVideoPath",
+    "BGVideoPath",
+    "DMDVideoPath",
+    "AudioPath",
+)
+
+_FIELDS = (
+    *_PATH_FIELDS[:3],
+    "creation_time",
+    "pupPackExists",
+    "altColorExists",
+    "altSoundExists",
+    "vniExists",
+    "b2sExists",
+    *_PATH_FIELDS[3:],
+    "info_restorable",
+    "info_backup_stamp",
+)
+
+_DEFAULTS = {
+    "pupPackExists": False,
+    "altColorExists": False,
+    "altSoundExists": False,
+    "vniExists": False,
+    "b2sExists": False,
+    "info_restorable": False,
+    "info_backup_stamp": "",
+}
+
+
+_meta_generation = 0
+# Tables are loaded on the scan's thread pool and edited from the API threads, and `+= 1`
+# on a global is a read and a write that two threads can interleave.
+_meta_generation_lock = threading.Lock()
+
+
+def meta_generation() -> int:
+    """Bumped whenever any table's metadata is replaced, so library-wide indexes built
+    from derived keys know when to look for what changed."""
+    return _meta_generation
+
+
+def _intern_keys(value):
+    """Share one copy of each dict key across tables. Every .info is parsed on its own, so
+    otherwise each table carries its own "Title", "Manufacturer", "VPSId"..."""
+    if isinstance(value, dict):
+        return {sys.intern(k) if isinstance(k, str) else k: _intern_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_intern_keys(v) for v in value]
+    return value
+
+
 class Table:
-    tableDirName: str | None = None
-    fullPathTable: str | None = None
-    fullPathVPXfile: str | None = None
-    creation_time: float | None = None
-
-    pupPackExists: bool = False
-    altColorExists: bool = False
-    altSoundExists: bool = False
-    vniExists: bool = False
-    b2sExists: bool = False
-
-    BGImagePath: str | None = None
-    DMDImagePath: str | None = None
-    TableImagePath: str | None = None
-    FSSImagePath: str | None = None
-    WheelImagePath: str | None = None
-    CabImagePath: str | None = None
-    realDMDImagePath: str | None = None
-    realDMDColorImagePath: str | None = None
-    FlyerImagePath: str | None = None
-
-    TableVideoPath: str | None = None
-    BGVideoPath: str | None = None
-    DMDVideoPath: str | None = None
-
-    AudioPath: str | None = None
-
-    metaConfig: dict[str, Any] | None = None
+    """One table folder as the scan found it.
+
+    Slotted because a library holds thousands of these for the life of the process.
+    `metaConfig` is the parsed .info; `lightMeta` is the same dict without forcing the
+    deferred sections back in, for the many callers that only want titles and filters.
+    """
+
+    __slots__ = (*_FIELDS, "_meta", "_deferred", "derived_keys", "meta_version", "json_fragment", "__weakref__")
+
+    tableDirName: str | None
+    fullPathTable: str | None
+    fullPathVPXfile: str | None
+    creation_time: float | None
+
+    pupPackExists: bool
+    altColorExists: bool
+    altSoundExists: bool
+    vniExists: bool
+    b2sExists: bool
+
+    BGImagePath: str | None
+    DMDImagePath: str | None
+    TableImagePath: str | None
+    FSSImagePath: str | None
+    WheelImagePath: str | None
+    CabImagePath: str | None
+    realDMDImagePath: str | None
+    realDMDColorImagePath: str | None
+    FlyerImagePath: str | None
+
+    TableVideoPath: str | None
+    BGVideoPath: str | None
+    DMDVideoPath: str | None
+
+    AudioPath: str | None
 
     # Read during the scan because the scan already listed the folder. Asking again later
     # costs a second walk of the library, which on a network share is the whole cost.
@@ -41,6 +121,120 @@ class Table:
     # Restorable means a saved copy this build can actually read, not merely a saved copy.
     # After a restore the folder still holds the ones it could not use, and counting those
     # would leave the offer on screen with nothing behind it.
-    info_restorable: bool = False
+    info_restorable: bool
     # Newest backup's timestamp, so the restore dialog can name the day it goes back to.
-    info_backup_stamp: str = ""
+    info_backup_stamp: str
+
+    # Sort/filter keys worked out from the metadata (table_metadata.table_keys), dropped
+    # whenever the metadata is replaced.
+    derived_keys: Any
+    # The meta_generation() at this table's last metadata change, and its serialized row
+    # for the frontend (table_state.table_json_fragment), dropped along with the keys.
+    meta_version: int
+    json_fragment: str | None
+
+    def __init__(self, metaConfig: dict[str, Any] | None = None, **values: Any) -> None:
+        unknown = set(values) - set(_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown Table field(s): {', '.join(sorted(unknown))}")
+        for name in _FIELDS:
+            setattr(self, name, values.get(name, _DEFAULTS.get(name)))
+        self._meta = metaConfig
+        self._deferred = None
+        self.derived_keys = None
+        self.meta_version = _meta_generation
+        self.json_fragment = None
+
+    @property
+    def metaConfig(self) -> dict[str, Any] | None:
+        if self._deferred is not None:
+            self._restore_deferred()
+        return self._meta
+
+    @metaConfig.setter
+    def metaConfig(self, value: dict[str, Any] | None) -> None:
+        # Whoever assigns a dict owns it and expects to see it back unchanged, so nothing
+        # is split out of an assigned dict; only load_meta() defers sections.
+        self._meta = value
+        self._deferred = None
+        self._meta_changed()
+
+    @property
+    def lightMeta(self) -> dict[str, Any] | None:
+        """The parsed .info, minus any deferred sections not yet asked for."""
+        return self._meta
+
+    def load_meta(self, meta: dict[str, Any] | None) -> None:
+        """Take ownership of a freshly parsed .info, deferring its heavy sections."""
+        if not isinstance(meta, dict):
+            self.metaConfig = meta
+            return
+        meta = _intern_keys(meta)
+        deferred: dict[str, Any] = {}
+        for name in _DEFERRED_SECTIONS:
+            if name in meta:
+                deferred[name] = meta.pop(name)
+        user = meta.get("User")
+        if isinstance(user, dict):
+            for key in _DEFERRED_USER_KEYS:
+                if key in user:
+                    deferred.setdefault("User", {})[key] = user.pop(key)
+        self._meta = meta
+        self._deferred = json.dumps(deferred, separators=(",", ":")) if deferred else None
+        self._meta_changed()
+
+    def invalidate_keys(self) -> None:
+        """Forget the derived sort/filter keys after editing `metaConfig` in place."""
+        self._meta_changed()
+
+    def _meta_changed(self) -> None:
+        global _meta_generation
+        self.derived_keys = None
+        self.json_fragment = None
+        with _meta_generation_lock:
+            _meta_generation += 1
+            self.meta_version = _meta_generation
+
+    def expanded_meta(self) -> dict[str, Any] | None:
+        """The full parsed .info without keeping the deferred sections loaded afterwards.
+
+        For one-off readers such as the theme payload: the top level and `User` are fresh
+        dicts, every other section is shared with the table.
+        """
+        if self._deferred is None:
+            return self._meta
+        meta = dict(self._meta)
+        for name, value in json.loads(self._deferred).items():
+            if name == "User" and isinstance(meta.get("User"), dict):
+                meta["User"] = {**meta["User"], **value}
+            else:
+                meta[name] = value
+        return meta
+
+    def _restore_deferred(self) -> None:
+        deferred = json.loads(self._deferred)
+        self._deferred = None
+        meta = self._meta
+        for name, value in deferred.items():
+            if name == "User" and isinstance(meta.get("User"), dict):
+                meta["User"].update(value)
+            else:
+                meta[name] = value
+
+    def intern_paths(self) -> None:
+        """Share path strings with every other holder of the same path (index, reloads)."""
+        for name in _PATH_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, sys.intern(value))
+
+    def update_from(self, other: "Table") -> None:
+        """Become `other`, keeping this object's identity for lists that already hold it."""
+        for name in _FIELDS:
+            setattr(self, name, getattr(other, name))
+        self._meta = other._meta
+        self._deferred = other._deferred
+        self._meta_changed()
+
+    def __repr__(self) -> str:
+        return f"Table(tableDirName={self.tableDirName!r}, fullPathTable={self.fullPathTable!r})"
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import ast
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
 
 from common.metaconfig import MetaConfig
+from common.table import Table
 
 
 DETECTION_KEYS = (
@@ -29,6 +31,29 @@ def normalize_meta(meta: Any) -> Dict[str, Any]:
     return {}
 
 
+def table_meta(table) -> Dict[str, Any]:
+    """A table's parsed .info for reading titles, filter fields and flags.
+
+    Does not pull a table's deferred sections (Medias, User.Score) back into memory; read
+    `table.metaConfig` when those are wanted.
+    """
+    meta = getattr(table, "lightMeta", None)
+    if meta is None:
+        meta = getattr(table, "metaConfig", {})
+    return normalize_meta(meta)
+
+
+def full_table_meta(table) -> Dict[str, Any]:
+    """A table's whole parsed .info, deferred sections included, for a one-off read.
+
+    Unlike `table.metaConfig` this does not keep the deferred sections loaded on the table.
+    """
+    expanded = getattr(table, "expanded_meta", None)
+    if callable(expanded):
+        return normalize_meta(expanded())
+    return normalize_meta(getattr(table, "metaConfig", {}))
+
+
 def section(meta: Any, name: str) -> Dict[str, Any]:
     normalized = normalize_meta(meta)
     value = normalized.get(name, {})
@@ -86,7 +111,7 @@ def reorder_leading_article(title: Any) -> str:
 
 
 def table_title(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     vpinfe = section(meta, "VPinFE")
     info = section(meta, "Info")
     alt_title = str(vpinfe.get("alttitle", "") or "").strip()
@@ -99,7 +124,7 @@ def table_title(table) -> str:
 
 
 def table_themes(table) -> list[str]:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     value = get_meta_value(meta, "Info", "Themes", None)
     if value:
         return value if isinstance(value, list) else [value]
@@ -119,28 +144,28 @@ def table_themes(table) -> list[str]:
 
 
 def table_type(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     return str(first_meta_value(meta, ("Info", "Type"), ("VPSdb", "type"), default="") or "")
 
 
 def table_manufacturer(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     return str(first_meta_value(meta, ("Info", "Manufacturer"), ("VPSdb", "manufacturer"), default="") or "")
 
 
 def table_year(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     value = first_meta_value(meta, ("Info", "Year"), ("VPSdb", "year"), default="")
     return str(value) if value else ""
 
 
 def table_rating(table) -> int:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     return normalize_rating(get_meta_value(meta, "User", "Rating", 0))
 
 
 def table_vps_id(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     alt_vpsid = str(section(meta, "VPinFE").get("altvpsid", "") or "").strip()
     if alt_vpsid:
         return alt_vpsid
@@ -148,7 +173,77 @@ def table_vps_id(table) -> str:
 
 
 def base_table_vps_id(table) -> str:
-    return str(section(getattr(table, "metaConfig", {}), "Info").get("VPSId", "") or "").strip()
+    return str(section(table_meta(table), "Info").get("VPSId", "") or "").strip()
+
+
+NUMERIC_SORT_FIELDS = ("LastRun", "StartCount", "RunTime")
+
+
+@dataclass(frozen=True)
+class TableKeys:
+    """Everything the wheel sorts, filters and pages on, worked out once per table.
+
+    Sorting and filtering run over the whole library on every press, and each of these
+    is a handful of dict lookups and string operations per table. A Table keeps its keys
+    until its metadata is replaced; see `table_keys()`.
+    """
+
+    title: str
+    sort_key: str
+    # First character as the letter filter sees it, and the alpha-paging bucket ('#' for
+    # anything that is not a letter). They differ on digits: "24" filters under "2".
+    first_char: str
+    group: str
+    year: str
+    type: str
+    manufacturer: str
+    themes: tuple[str, ...]
+    rating: int
+    numeric: Mapping[str, int]
+
+
+def _numeric_user_value(meta: Dict[str, Any], field: str) -> int:
+    default = -1 if field == "LastRun" else 0
+    user = section(meta, "User")
+    info = section(meta, "Info")
+    try:
+        return int(user.get(field, info.get(field, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def compute_table_keys(table) -> TableKeys:
+    title = table_title(table)
+    meta = table_meta(table)
+    return TableKeys(
+        title=title,
+        sort_key=title.lower(),
+        first_char=title[0].upper() if title else "",
+        group=title[0].upper() if title and title[0].isalpha() else "#",
+        year=table_year(table),
+        type=table_type(table),
+        manufacturer=table_manufacturer(table),
+        themes=tuple(table_themes(table)),
+        rating=table_rating(table),
+        numeric={field: _numeric_user_value(meta, field) for field in NUMERIC_SORT_FIELDS},
+    )
+
+
+def table_keys(table) -> TableKeys:
+    """The table's derived sort and filter keys, cached on Table objects.
+
+    A Table drops its cached keys whenever its metadata is assigned or reloaded, which is
+    how every edit reaches it (`persist_table_meta`, a rescan). Code that edits
+    `metaConfig` in place has to call `table.invalidate_keys()` itself. Anything that is
+    not a Table is worked out fresh each time.
+    """
+    if not isinstance(table, Table):
+        return compute_table_keys(table)
+    keys = table.derived_keys
+    if keys is None:
+        keys = compute_table_keys(table)
+        table.derived_keys = keys
+    return keys
 
 
 def get_or_create_user_meta(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -171,7 +266,9 @@ def load_table_meta(table) -> Dict[str, Any]:
     meta_path = meta_file_path(table)
     if meta_path.exists():
         return normalize_meta(MetaConfig(str(meta_path)).data)
-    return normalize_meta(getattr(table, "metaConfig", {}))
+    # Callers write this back with persist_table_meta, so it has to carry the deferred
+    # sections too.
+    return full_table_meta(table)
 
 
 def persist_table_meta(table, config: Dict[str, Any]) -> None:
@@ -3,18 +3,21 @@ from __future__ import annotations
 import logging
 import threading
 from time import perf_counter
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from pathlib import Path
 
-from common.paths import COLLECTIONS_PATH, get_ini_config, get_tables_path
-from common.table_metadata import first_meta_value, normalize_rating, reorder_leading_article, section
+from common.paths import COLLECTIONS_PATH, TABLE_SCAN_INDEX_PATH, get_ini_config, get_tables_path
+from common.table_metadata import first_meta_value, normalize_rating, reorder_leading_article, section, table_meta
+from common.table_watcher import TableWatcher
 from common.tableparser import TableParser
 from common.vpxcollections import VPXCollections
 
 
 _LOCK = threading.Lock()
 _PARSER: Optional[TableParser] = None
+_WATCHER: Optional[TableWatcher] = None
+_REFRESH_LISTENERS: List[Callable[[], None]] = []
 logger = logging.getLogger("vpinfe.common.table_repository")
 
 
@@ -25,7 +28,9 @@ def ensure_tables_loaded(reload: bool = False) -> List[Any]:
         tables_root = get_tables_path()
         needs_new_parser = _PARSER is None or str(_PARSER.tablesRootFilePath) != tables_root
         if needs_new_parser:
-            _PARSER = TableParser(tables_root, get_ini_config())
+            # The scan index turns a start on an unchanged library into a stat per
+            # folder instead of a listing and a .info read per folder.
+            _PARSER = TableParser(tables_root, get_ini_config(), index_path=TABLE_SCAN_INDEX_PATH)
         elif reload:
             _PARSER.loadTables(reload=True)
         tables = list(_PARSER.getAllTables())
@@ -40,8 +45,27 @@ def ensure_tables_loaded(reload: bool = False) -> List[Any]:
     return tables
 
 
+def add_refresh_listener(callback: Callable[[], None]) -> None:
+    """Call `callback()` whenever a rescan or a folder refresh has updated the library,
+    e.g. after a Manager UI edit or a change the table watcher picked up."""
+    with _LOCK:
+        _REFRESH_LISTENERS.append(callback)
+
+
+def _notify_refreshed() -> None:
+    with _LOCK:
+        listeners = list(_REFRESH_LISTENERS)
+    for callback in listeners:
+        try:
+            callback()
+        except Exception:
+            logger.exception("Table refresh listener failed")
+
+
 def refresh_tables() -> List[Any]:
-    return ensure_tables_loaded(reload=True)
+    tables = ensure_tables_loaded(reload=True)
+    _notify_refreshed()
+    return tables
 
 
 def unreadable_tables() -> List[Dict[str, str]]:
@@ -70,9 +94,67 @@ def restorable_table_names() -> List[str]:
 
 
 def refresh_table(table_path: str) -> List[Any]:
-    normalized = str(Path(table_path).expanduser().resolve())
-    tables = refresh_tables()
-    return [table for table in tables if str(Path(table.fullPathTable).resolve()) == normalized]
+    """Re-read one table folder and splice it into the cached library.
+
+    Falls back to a full rescan only when the folder is not directly under the current
+    tables root, or nothing has been loaded yet.
+    """
+    tables = _refresh_table(table_path)
+    _notify_refreshed()
+    return tables
+
+
+def _refresh_table(table_path: str) -> List[Any]:
+    normalized = Path(table_path).expanduser().resolve()
+    with _LOCK:
+        parser = _PARSER
+        if parser is not None and str(parser.tablesRootFilePath) == get_tables_path() \
+                and normalized.parent == parser.tablesRootFilePath.resolve():
+            started_at = perf_counter()
+            table = parser.refreshTable(parser.tablesRootFilePath / normalized.name)
+            logger.debug("refresh_table %s elapsed=%.3fs", normalized.name, perf_counter() - started_at)
+            return [table] if table is not None else []
+
+    tables = ensure_tables_loaded(reload=True)
+    return [table for table in tables if str(Path(table.fullPathTable).resolve()) == str(normalized)]
+
+
+def refresh_folders(table_paths: List[str]) -> int:
+    """Apply a batch of changed table folders, as queued by the table watcher."""
+    refreshed = 0
+    for table_path in table_paths:
+        try:
+            _refresh_table(table_path)
+            refreshed += 1
+        except Exception:
+            logger.exception("Failed to refresh table folder %s", table_path)
+    if table_paths:
+        _notify_refreshed()
+    return refreshed
+
+
+def start_table_watcher(poll_interval: float = 5.0) -> Optional[TableWatcher]:
+    """Watch the tables root and refresh changed folders in the background."""
+    global _WATCHER
+    ensure_tables_loaded()
+    with _LOCK:
+        if _WATCHER is not None:
+            return _WATCHER
+        tables_root = Path(get_tables_path())
+        if not tables_root.is_dir():
+            logger.info("Table watcher not started: %s is not a directory", tables_root)
+            return None
+        _WATCHER = TableWatcher(tables_root, refresh_folders, poll_interval=poll_interval)
+    _WATCHER.start()
+    return _WATCHER
+
+
+def stop_table_watcher() -> None:
+    global _WATCHER
+    with _LOCK:
+        watcher, _WATCHER = _WATCHER, None
+    if watcher is not None:
+        watcher.stop()
 
 
 def get_missing_tables(reload: bool = False) -> List[Dict[str, str]]:
@@ -101,7 +183,7 @@ def _collections_map() -> Dict[str, List[str]]:
 
 
 def table_to_row(table, collections_map: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
-    meta = table.metaConfig or {}
+    meta = table_meta(table)
     info = section(meta, "Info")
     user = section(meta, "User")
     vpinfe = section(meta, "VPinFE")
@@ -0,0 +1,129 @@
+"""Persistent record of what the last library scan found in each table folder.
+
+A scan lists every table folder, lists its `medias/`, and opens its `.info`. On a network
+share each of those is a round trip, and a library of a couple of thousand tables spends
+tens of seconds on work that comes out the same as last time. The index keeps the result
+per folder next to the stamps it was read under, so the next scan only re-reads the
+folders whose stamps moved.
+
+A stamp is the folder's own mtime plus the mtime and size of the `.info` and of the
+subfolders the scan looked inside (`medias/`, `pinmame/`). The folder mtime alone is not
+enough: a media download lands in `medias/` and an in-place `.info` edit rewrites the
+file, and neither touches the folder itself. Those are stat calls, not listings or reads.
+
+The index is a cache and never the source of truth. Anything it cannot vouch for - a
+different table root or table type, an unreadable file, an unknown version - is thrown
+away and the folder is read again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from common.info_restore import write_json_atomic
+
+
+logger = logging.getLogger("vpinfe.common.table_scan_index")
+
+INDEX_VERSION = 1
+
+
+def folder_stamp(table_dir: str, dir_stat: os.stat_result, watched: Iterable[str]) -> list:
+    """The stamp a folder is stored under: its mtime, then (name, mtime, size) per watched path.
+
+    Lists rather than tuples so a stamp compares equal to itself after a JSON round trip.
+    """
+    stamp: list[Any] = [dir_stat.st_mtime_ns]
+    for name in watched:
+        try:
+            st = os.stat(os.path.join(table_dir, name))
+        except OSError:
+            stamp.append([name, None, None])
+        else:
+            stamp.append([name, st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+class TableScanIndex:
+    def __init__(self, path: str | Path, *, root: str | Path, table_type: str = "table") -> None:
+        self.path = Path(path)
+        self.root = str(root)
+        self.table_type = table_type
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._loaded = False
+
+    def load(self) -> None:
+        """Read the index from disk once. A missing or foreign index just starts empty."""
+        if self._loaded:
+            return
+        self._loaded = True
+        self._entries = {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable table scan index %s: %s", self.path, exc)
+            return
+
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        # Media paths are resolved against the table type, and every path is under the
+        # root, so an index written for either of something else is no use at all.
+        if data.get("root") != self.root or data.get("table_type") != self.table_type:
+            logger.info("Table scan index was built for another library; rescanning.")
+            return
+        entries = data.get("folders")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def lookup(self, table_dir: str, dir_stat: os.stat_result) -> dict[str, Any] | None:
+        """The stored record for a folder, or None when it is unknown or has changed."""
+        record = self._entries.get(table_dir)
+        if not isinstance(record, dict):
+            return None
+        stamp = record.get("stamp")
+        if not isinstance(stamp, list) or not stamp:
+            return None
+        watched = [part[0] for part in stamp[1:] if isinstance(part, list) and part]
+        if folder_stamp(table_dir, dir_stat, watched) != stamp:
+            return None
+        return record
+
+    def store(self, table_dir: str, record: dict[str, Any]) -> None:
+        self._entries[table_dir] = record
+        self._dirty = True
+
+    def discard(self, table_dir: str) -> None:
+        if self._entries.pop(table_dir, None) is not None:
+            self._dirty = True
+
+    def prune(self, seen: Iterable[str]) -> None:
+        """Forget folders that are no longer in the library."""
+        keep = set(seen)
+        for table_dir in [key for key in self._entries if key not in keep]:
+            del self._entries[table_dir]
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "table_type": self.table_type,
+            "folders": self._entries,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(str(self.path), payload, indent=None)
+        except (OSError, TypeError, ValueError) as exc:
+            # Losing the index only costs the next start a full scan.
+            logger.warning("Could not save table scan index %s: %s", self.path, exc)
+            return
+        self._dirty = False
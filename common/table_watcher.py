@@ -0,0 +1,296 @@
+"""Notice table folders changing on disk and hand them over in batches.
+
+The library is otherwise only re-read when something asks for it, so a table copied in
+by hand, or media dropped into a folder by another tool, stays invisible until the next
+full rescan. The watcher queues the folders that changed and passes them to a callback
+a batch at a time; the callback re-reads just those folders.
+
+On Linux it uses inotify, which costs nothing while the library is idle. Everywhere
+else - and on Linux when inotify is unavailable or out of watches, which a big library
+on a default kernel can be - it falls back to polling the same stamps the scan index
+keeps. That is a stat per watched path per interval, so the interval stays in seconds.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from common.table_scan_index import folder_stamp
+from common.tableparser import WATCHED_SUBDIRS
+
+
+logger = logging.getLogger("vpinfe.common.table_watcher")
+
+ChangeCallback = Callable[[list[str]], None]
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_FOLDER_MASK = (_IN_CLOSE_WRITE | _IN_ATTRIB | _IN_CREATE | _IN_DELETE
+                | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF)
+_ROOT_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """The few inotify calls the watcher needs, through libc. Linux only."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def read_events(self, timeout: float) -> list[tuple[int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class TableWatcher:
+    def __init__(
+        self,
+        root: str | Path,
+        on_changes: ChangeCallback,
+        *,
+        poll_interval: float = 5.0,
+        batch_delay: float = 0.5,
+        use_inotify: bool = True,
+    ) -> None:
+        self.root = Path(root)
+        self.on_changes = on_changes
+        self.poll_interval = max(0.1, float(poll_interval))
+        self.batch_delay = max(0.0, float(batch_delay))
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.mode: str | None = None
+        self._pending: set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._last_event = 0.0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._inotify: _Inotify | None = None
+        self._watches: dict[int, str] = {}
+        self._stamps: dict[str, list] = {}
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        if self.use_inotify and self._start_inotify():
+            self.mode = "inotify"
+            target = self._run_inotify
+        else:
+            self.mode = "poll"
+            self._stamps = self._snapshot()
+            target = self._run_poll
+        self._thread = threading.Thread(target=target, daemon=True, name="table-watcher")
+        self._thread.start()
+        logger.info("Watching %s for table changes (%s)", self.root, self.mode)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._inotify is not None:
+            try:
+                self._inotify.close()
+            except OSError:
+                pass
+            self._inotify = None
+        self._watches.clear()
+
+    def queue(self, paths: Iterable[str]) -> None:
+        """Queue folders by hand; they go out with the next batch."""
+        with self._pending_lock:
+            self._pending.update(str(path) for path in paths)
+            self._last_event = time.monotonic()
+
+    def flush(self) -> list[str]:
+        """Hand every queued folder to the callback now. Returns what was sent."""
+        with self._pending_lock:
+            batch = sorted(self._pending)
+            self._pending.clear()
+        if not batch:
+            return batch
+        try:
+            self.on_changes(batch)
+        except Exception:
+            logger.exception("Table change callback failed for %s folder(s)", len(batch))
+        return batch
+
+    # inotify
+
+    def _start_inotify(self) -> bool:
+        try:
+            self._inotify = _Inotify()
+            self._add_watch(str(self.root), _ROOT_MASK)
+            for entry in self._table_entries():
+                self._watch_table(entry.path)
+        except (OSError, AttributeError) as exc:
+            # ENOSPC is the usual one: the per-user watch limit is smaller than the library.
+            logger.info("inotify unavailable for %s (%s); polling instead", self.root, exc)
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+            self._watches.clear()
+            return False
+        return True
+
+    def _add_watch(self, path: str, mask: int) -> None:
+        wd = self._inotify.add_watch(path, mask)
+        self._watches[wd] = path
+
+    def _watch_table(self, table_dir: str) -> None:
+        try:
+            self._add_watch(table_dir, _FOLDER_MASK)
+        except FileNotFoundError:
+            return
+        for name in WATCHED_SUBDIRS:
+            subdir = os.path.join(table_dir, name)
+            if os.path.isdir(subdir):
+                try:
+                    self._add_watch(subdir, _FOLDER_MASK)
+                except FileNotFoundError:
+                    pass
+
+    def _run_inotify(self) -> None:
+        root = str(self.root)
+        while not self._stop_event.is_set():
+            try:
+                events = self._inotify.read_events(self.batch_delay or self.poll_interval)
+            except (OSError, ValueError):
+                if self._stop_event.is_set():
+                    return
+                logger.exception("inotify read failed; watcher stopped")
+                return
+            for wd, mask, name in events:
+                self._handle_event(root, wd, mask, name)
+            self._flush_when_settled()
+
+    def _handle_event(self, root: str, wd: int, mask: int, name: str) -> None:
+        if mask & _IN_Q_OVERFLOW:
+            # Events were dropped, so nothing short of every folder is trustworthy.
+            self.queue(entry.path for entry in self._table_entries())
+            return
+        path = self._watches.get(wd)
+        if path is None:
+            return
+        if mask & _IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+
+        if path == root:
+            if not name or name.startswith("."):
+                return
+            table_dir = os.path.join(root, name)
+            if mask & (_IN_CREATE | _IN_MOVED_TO) and mask & _IN_ISDIR:
+                try:
+                    self._watch_table(table_dir)
+                except OSError as exc:
+                    logger.warning("Could not watch new table folder %s: %s", table_dir, exc)
+            self.queue([table_dir])
+            return
+
+        parent, leaf = os.path.split(path)
+        if parent != root:
+            # A medias/ or pinmame/ watch: the table is the folder above it.
+            self.queue([parent])
+            return
+        if (mask & (_IN_CREATE | _IN_MOVED_TO) and mask & _IN_ISDIR
+                and name in WATCHED_SUBDIRS):
+            try:
+                self._add_watch(os.path.join(path, name), _FOLDER_MASK)
+            except OSError:
+                pass
+        self.queue([path])
+
+    def _flush_when_settled(self) -> None:
+        with self._pending_lock:
+            if not self._pending:
+                return
+            settled = time.monotonic() - self._last_event >= self.batch_delay
+        if settled:
+            self.flush()
+
+    # polling
+
+    def _run_poll(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._snapshot()
+            changed = [
+                path for path in set(current) | set(self._stamps)
+                if current.get(path) != self._stamps.get(path)
+            ]
+            self._stamps = current
+            if changed:
+                self.queue(changed)
+                self.flush()
+
+    def _snapshot(self) -> dict[str, list]:
+        stamps: dict[str, list] = {}
+        for entry in self._table_entries():
+            try:
+                dir_stat = entry.stat()
+            except OSError:
+                continue
+            watched = [f"{entry.name}.info", *WATCHED_SUBDIRS]
+            stamps[entry.path] = folder_stamp(entry.path, dir_stat, watched)
+        return stamps
+
+    def _table_entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.root) as entries:
+                return [
+                    entry for entry in entries
+                    if not entry.name.startswith(".") and entry.is_dir()
+                ]
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                logger.warning("Could not list tables root %s: %s", self.root, exc)
+            return []
@@ -1,8 +1,11 @@
+from common.table import Table, meta_generation
 from common.table_metadata import (
     get_meta_value,
     is_truthy,
     normalize_rating,
+    table_keys,
     table_manufacturer,
+    table_meta,
     table_rating,
     table_themes,
     table_title,
@@ -11,62 +14,205 @@ from common.table_metadata import (
 )
 
 
+def _split_values(value):
+    return {part.strip() for part in str(value).split(',')}
+
+
+def _selected_ratings(rating):
+    return [normalize_rating(part.strip()) for part in str(rating).split(',')]
+
+
+class TableFilterIndex:
+    """Which tables carry each letter, theme, type, manufacturer, year and rating.
+
+    Built once for a table list and kept alongside it, so a filter is a few set
+    intersections and the option lists are the keys already in hand, instead of a walk
+    over every table per criterion and five more per menu open.
+
+    Tables are known by their position in the list. A metadata edit or a rescan of one
+    folder replaces that table's derived keys and bumps `meta_generation()`; the next
+    query then re-files just the tables whose keys changed. Lists holding anything other
+    than Table objects have no such signal, so those are checked on every query.
+    """
+
+    FIELDS = ("letter", "theme", "type", "manufacturer", "year", "rating")
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._keys = []
+        self._postings = {field: {} for field in self.FIELDS}
+        self._options = None
+        self._volatile = not all(isinstance(table, Table) for table in tables)
+        self._generation = meta_generation()
+        for table_id, table in enumerate(tables):
+            keys = table_keys(table)
+            self._keys.append(keys)
+            self._file(table_id, keys)
+
+    def covers(self, tables):
+        """True when this index was built for this very list and it has not grown or shrunk."""
+        return tables is self.tables and len(tables) == len(self._keys)
+
+    @staticmethod
+    def _values(keys):
+        return {
+            "letter": (keys.first_char,) if keys.first_char else (),
+            "theme": keys.themes,
+            "type": (keys.type,),
+            "manufacturer": (keys.manufacturer,),
+            "year": (keys.year,),
+            "rating": (keys.rating,),
+        }
+
+    def _file(self, table_id, keys):
+        for field, values in self._values(keys).items():
+            postings = self._postings[field]
+            for value in values:
+                postings.setdefault(value, set()).add(table_id)
+
+    def _unfile(self, table_id, keys):
+        for field, values in self._values(keys).items():
+            postings = self._postings[field]
+            for value in values:
+                ids = postings.get(value)
+                if ids is None:
+                    continue
+                ids.discard(table_id)
+                if not ids:
+                    del postings[value]
+
+    def sync(self):
+        """Re-file any table whose metadata changed since the last query."""
+        generation = meta_generation()
+        if generation == self._generation and not self._volatile:
+            return
+        self._generation = generation
+        for table_id, table in enumerate(self.tables):
+            keys = table_keys(table)
+            old = self._keys[table_id]
+            if keys is old or keys == old:
+                continue
+            self._unfile(table_id, old)
+            self._file(table_id, keys)
+            self._keys[table_id] = keys
+            self._options = None
+
+    def options(self):
+        """The values each filter menu offers, worked out once per change."""
+        self.sync()
+        if self._options is None:
+            postings = self._postings
+            self._options = {
+                "letters": sorted(letter for letter in postings["letter"] if letter.isalnum()),
+                "themes": sorted(postings["theme"]),
+                "types": sorted(value for value in postings["type"] if value),
+                "manufacturers": sorted(value for value in postings["manufacturer"] if value),
+                "years": sorted(value for value in postings["year"] if value),
+            }
+        return self._options
+
+    def _union(self, field, values):
+        postings = self._postings[field]
+        ids = set()
+        for value in values:
+            ids |= postings.get(value, set())
+        return ids
+
+    def matching_ids(self, letter=None, theme=None, table_type=None, manufacturer=None, year=None, rating=None, rating_or_higher=False):
+        """Positions of the tables passing every given filter, in list order."""
+        self.sync()
+        selections = []
+        if letter and letter != "All":
+            selections.append(self._union("letter", {value.upper() for value in _split_values(letter)}))
+        if theme and theme != "All":
+            selections.append(self._union("theme", _split_values(theme)))
+        if table_type and table_type != "All":
+            selections.append(self._union("type", _split_values(table_type)))
+        if manufacturer and manufacturer != "All":
+            selections.append(self._union("manufacturer", _split_values(manufacturer)))
+        if year and year != "All":
+            selections.append(self._union("year", _split_values(year)))
+        if rating and rating != "All":
+            ratings = _selected_ratings(rating)
+            if is_truthy(rating_or_higher):
+                ratings = range(min(ratings), 6)
+            selections.append(self._union("rating", ratings))
+
+        if not selections:
+            return list(range(len(self._keys)))
+        selections.sort(key=len)
+        ids = selections[0].intersection(*selections[1:])
+        return sorted(ids)
+
+
 class TableListFilters:
-    """Filter tables by various criteria: starting letter, theme, type, and rating."""
+    """Filter tables by various criteria: starting letter, theme, type, and rating.
 
-    def __init__(self, tables=None):
+    Pass the `TableFilterIndex` kept for `tables` to answer from it; without one every
+    query walks the tables.
+    """
+
+    def __init__(self, tables=None, index=None):
         self.tables = list(tables or [])
+        self.index = index if index is not None and index.covers(tables) else None
 
     @staticmethod
     def _get_meta_value(table, section, key, fallback=""):
         """Helper to safely extract metadata values."""
-        return get_meta_value(getattr(table, "metaConfig", {}), section, key, fallback)
+        return get_meta_value(table_meta(table), section, key, fallback)
 
     def get_available_letters(self):
         """Return sorted list of unique starting letters from table names."""
+        if self.index is not None:
+            return list(self.index.options()["letters"])
         letters = set()
         for table in self.tables:
-            # Try Info.Title first (JSON format), then VPSdb.name (legacy)
-            name = table_title(table)
-            if name:
-                first_char = name[0].upper()
-                # Only include alphanumeric characters
-                if first_char.isalnum():
-                    letters.add(first_char)
+            first_char = table_keys(table).first_char
+            # Only include alphanumeric characters
+            if first_char.isalnum():
+                letters.add(first_char)
         return sorted(letters)
 
     def get_available_themes(self):
         """Return sorted list of unique themes from all tables."""
+        if self.index is not None:
+            return list(self.index.options()["themes"])
         themes = set()
         for table in self.tables:
-            themes.update(table_themes(table))
+            themes.update(table_keys(table).themes)
         return sorted(themes)
 
     def get_available_types(self):
         """Return sorted list of unique table types."""
+        if self.index is not None:
+            return list(self.index.options()["types"])
         types = set()
         for table in self.tables:
-            current_type = table_type(table)
+            current_type = table_keys(table).type
             if current_type:
                 types.add(current_type)
         return sorted(types)
 
     def get_available_manufacturers(self):
         """Return sorted list of unique manufacturers."""
+        if self.index is not None:
+            return list(self.index.options()["manufacturers"])
         manufacturers = set()
         for table in self.tables:
-            manufacturer = table_manufacturer(table)
+            manufacturer = table_keys(table).manufacturer
             if manufacturer:
                 manufacturers.add(manufacturer)
         return sorted(manufacturers)
 
     def get_available_years(self):
         """Return sorted list of unique years."""
+        if self.index is not None:
+            return list(self.index.options()["years"])
         years = set()
         for table in self.tables:
-            year = table_year(table)
+            year = table_keys(table).year
             if year:
-                years.add(str(year))
+                years.add(year)
         return sorted(years)
 
     def _get_table_name(self, table):
@@ -111,8 +257,8 @@ class TableListFilters:
         letters = {l.strip().upper() for l in str(letter).split(',')}
         filtered = []
         for table in tables:
-            name = self._get_table_name(table)
-            if name and name[0].upper() in letters:
+            first_char = table_keys(table).first_char
+            if first_char and first_char in letters:
                 filtered.append(table)
         return filtered
 
@@ -124,8 +270,7 @@ class TableListFilters:
         themes = {t.strip() for t in str(theme).split(',')}
         filtered = []
         for table in tables:
-            table_themes = self._get_table_theme(table)
-            if themes & set(table_themes):
+            if not themes.isdisjoint(table_keys(table).themes):
                 filtered.append(table)
         return filtered
 
@@ -137,8 +282,7 @@ class TableListFilters:
         types = {t.strip() for t in str(table_type).split(',')}
         filtered = []
         for table in tables:
-            current_type = self._get_table_type(table)
-            if current_type in types:
+            if table_keys(table).type in types:
                 filtered.append(table)
         return filtered
 
@@ -150,8 +294,7 @@ class TableListFilters:
         manufacturers = {m.strip() for m in str(manufacturer).split(',')}
         filtered = []
         for table in tables:
-            current_manufacturer = self._get_table_manufacturer(table)
-            if current_manufacturer in manufacturers:
+            if table_keys(table).manufacturer in manufacturers:
                 filtered.append(table)
         return filtered
 
@@ -163,8 +306,7 @@ class TableListFilters:
         years = {y.strip() for y in str(year).split(',')}
         filtered = []
         for table in tables:
-            current_year = self._get_table_year(table)
-            if current_year in years:
+            if table_keys(table).year in years:
                 filtered.append(table)
         return filtered
 
@@ -185,16 +327,22 @@ class TableListFilters:
 
         if self._is_truthy(rating_or_higher):
             min_rating = min(selected_ratings)
-            return [table for table in tables if self._get_table_rating(table) >= min_rating]
+            return [table for table in tables if table_keys(table).rating >= min_rating]
 
         rating_set = set(selected_ratings)
-        return [table for table in tables if self._get_table_rating(table) in rating_set]
+        return [table for table in tables if table_keys(table).rating in rating_set]
 
     def apply_filters(self, letter=None, theme=None, table_type=None, manufacturer=None, year=None, rating=None, rating_or_higher=False):
         """
         Apply multiple filters in combination.
         Returns filtered and sorted list of tables.
         """
+        if self.index is not None:
+            ids = self.index.matching_ids(letter, theme, table_type, manufacturer, year, rating, rating_or_higher)
+            result = [self.tables[table_id] for table_id in ids]
+            result.sort(key=lambda t: table_keys(t).sort_key)
+            return result
+
         result = list(self.tables)  # Make a copy to avoid modifying original
 
         # Apply each filter sequentially
@@ -217,8 +365,6 @@ class TableListFilters:
             result = self.filter_by_rating(result, rating, rating_or_higher)
 
         # Sort alphabetically by name
-        result.sort(
-            key=lambda t: self._get_table_name(t).lower()
-        )
+        result.sort(key=lambda t: table_keys(t).sort_key)
 
         return result
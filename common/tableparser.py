@@ -1,9 +1,12 @@
 import os
+from bisect import insort
+from stat import S_ISDIR
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 from time import perf_counter
-from common.config_access import MediaConfig
-from common.media_paths import apply_media_paths
+from common.config_access import MediaConfig, SettingsConfig
+from common.media_paths import MEDIA_SPECS, apply_media_paths
 from common.table import Table
 from common.info_restore import (
     BACKUP_MARKER,
@@ -12,24 +15,41 @@ from common.info_restore import (
     restorable_backup,
 )
 from common.metaconfig import InvalidMetaConfigError, MetaConfig
+from common.table_scan_index import TableScanIndex, folder_stamp
 
 
 logger = logging.getLogger("vpinfe.common.tableparser")
 
+_ADDON_FLAGS = ("b2sExists", "pupPackExists", "altColorExists", "vniExists", "altSoundExists")
+# Subfolders the scan looks inside. What lands in them moves their mtime, not the table
+# folder's, so the scan index has to stamp them too.
+WATCHED_SUBDIRS = ("medias", "pinmame")
+
+
+def _row_order(row):
+    return Path(row['path'])
+
 
 class TableParser:
     # static console colors
     RED_CONSOLE_TEXT = '\033[31m'
     RESET_CONSOLE_TEXT = '\033[0m'
 
-    def __init__(self, tablesRootFilePath, iniConfig=None):
+    def __init__(self, tablesRootFilePath, iniConfig=None, index_path=None):
         self.tablesRootFilePath = Path(tablesRootFilePath)
         self.tabletype = "table"
         self.tables: list[Table] = []
         self.missing_tables: list[dict] = []
         self.unreadable_tables: list[dict] = []
+        self.scan_workers = 1
         if iniConfig:
             self.tabletype = MediaConfig.from_config(iniConfig).table_type
+            self.scan_workers = SettingsConfig.from_config(iniConfig).table_scan_workers
+        # Without an index path every load reads every folder, as it always has.
+        self.scan_index = (
+            TableScanIndex(index_path, root=self.tablesRootFilePath, table_type=self.tabletype)
+            if index_path else None
+        )
         self.loadTables()
 
     def loadTables(self, reload=False):  # reload if you want to rescan the tables
@@ -45,96 +65,289 @@ class TableParser:
             return
 
         logger.info("Loading tables and image paths...")
-        for table_dir in sorted(self.tablesRootFilePath.iterdir()):
-            if not table_dir.is_dir():
-                continue
-            if table_dir.name.startswith('.'):
-                continue
-
-            table = Table()
-            table.tableDirName = table_dir.name
-            table.fullPathTable = str(table_dir)
-            table_contents = set()
-            table_subdirs = set()
-
-            # Search with scandir to avoid per-entry pathlib stat calls on slow volumes.
-            try:
-                with os.scandir(table_dir) as entries:
-                    for entry in entries:
-                        if entry.is_dir():
-                            table_subdirs.add(entry.name)
-                            continue
-                        table_contents.add(entry.name)
-                        if getattr(table, "fullPathVPXfile", None) or not entry.name.lower().endswith('.vpx'):
-                            continue
-                        table.fullPathVPXfile = entry.path
-                        stat = entry.stat()
-                        table.creation_time = getattr(stat, 'st_birthtime', stat.st_ctime)
-            except OSError:
-                logger.exception("Failed to enumerate table directory: %s", table_dir)
-
-            if not getattr(table, "fullPathVPXfile", None):
-                logger.warning("No .vpx found in %s directory.", table.tableDirName)
-                continue
-
-            info_name = f"{table.tableDirName}.info"
-            if info_name not in table_contents:
-                self.missing_tables.append({
-                    'folder': table.tableDirName,
-                    'path': str(table_dir),
-                })
-
-            # check for addons
-            if any(name.lower().endswith(".directb2s") for name in table_contents):
-                table.b2sExists = True
-            if "pupvideos" in table_subdirs:
-                table.pupPackExists = True
-            if "serum" in table_subdirs:
-                table.altColorExists = True
-            if "vni" in table_subdirs:
-                table.vniExists = True
-            if "pinmame" in table_subdirs and (table_dir / "pinmame" / "altsound").is_dir():
-                table.altSoundExists = True
-
-            self.loadImagePaths(
-                table,
-                table_contents=table_contents,
-                has_medias_dir="medias" in table_subdirs,
-            )
-            try:
-                self.loadMetaData(table)
-            except InvalidMetaConfigError as exc:
-                # One unreadable file used to stop the whole library loading, so a single
-                # truncated .info left the app with no tables at all. Drop the one table
-                # and keep going: excluded rather than loaded empty, because loading it
-                # empty would let the next write overwrite a file we could not read.
-                self.unreadable_tables.append({
-                    'folder': table.tableDirName,
-                    'path': str(table_dir),
-                    'error': str(exc),
-                })
-                logger.error("Skipping table with unreadable metadata: %s", exc)
-                continue
-
-            # Only a table a newer VPinFE upgraded has anything to put back, and only then
-            # is a saved copy worth opening to check we can read it.
-            stamps = backup_names(table_contents, info_name)
-            table.info_restorable = bool(
-                converted_by_newer(table.metaConfig)
-                and stamps
-                and restorable_backup(table_dir, names=table_contents))
-            if stamps:
-                table.info_backup_stamp = stamps[0].rsplit(BACKUP_MARKER, 1)[-1]
+        index = self.scan_index
+        if index is not None:
+            index.load()
 
-            self.tables.append(table)
+        listed_at = perf_counter()
+        table_dirs = self._table_dirs()
+        enumerate_elapsed = perf_counter() - listed_at
+
+        folders_at = perf_counter()
+        workers = min(self.scan_workers, len(table_dirs)) or 1
+        if workers > 1:
+            # Each folder costs several round trips on a network share, so overlap them.
+            # map() hands results back in submission order, which keeps the load order.
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="table-scan") as pool:
+                results = list(pool.map(lambda item: self._load_folder(*item), table_dirs))
+        else:
+            results = [self._load_folder(table_dir, dir_stat) for table_dir, dir_stat in table_dirs]
+        folders_elapsed = perf_counter() - folders_at
+
+        applied_at = perf_counter()
+        reused = 0
+        check_total = read_total = 0.0
+        for (table_dir, _dir_stat), (record, from_index, check_s, read_s) in zip(table_dirs, results):
+            check_total += check_s
+            read_total += read_s
+            if from_index:
+                reused += 1
+            elif index is not None:
+                index.store(str(table_dir), record)
+            self._add_record(table_dir, record)
+
+        if index is not None:
+            index.prune(str(table_dir) for table_dir, _dir_stat in table_dirs)
+            index.save()
+        apply_elapsed = perf_counter() - applied_at
 
         elapsed = perf_counter() - started_at
         logger.debug(
-            "Load completed in %.3fs: loaded=%s missing_info=%s",
+            "Load completed in %.3fs: loaded=%s missing_info=%s reused=%s",
             elapsed,
             len(self.tables),
-            len(self.missing_tables)
+            len(self.missing_tables),
+            reused,
+        )
+        # check/read are summed across workers, so next to the folders wall time they
+        # show how much the pool overlapped.
+        logger.debug(
+            "Load phases: enumerate=%.3fs folders=%.3fs (workers=%s check=%.3fs read=%.3fs) apply=%.3fs",
+            enumerate_elapsed,
+            folders_elapsed,
+            workers,
+            check_total,
+            read_total,
+            apply_elapsed,
+        )
+
+    def _load_folder(self, table_dir, dir_stat):
+        """One folder's record, from the index when its stamp still matches.
+
+        Safe to run on a worker thread: it only reads the index and the disk. Storing
+        fresh records and the missing/unreadable bookkeeping stay on the caller's thread.
+        Returns (record, from_index, check_seconds, read_seconds).
+        """
+        checked_at = perf_counter()
+        record = None
+        if self.scan_index is not None:
+            record = self.scan_index.lookup(str(table_dir), dir_stat)
+        check_s = perf_counter() - checked_at
+        if record is not None:
+            return record, True, check_s, 0.0
+
+        read_at = perf_counter()
+        record = self._scan_table_dir(table_dir, dir_stat)
+        return record, False, check_s, perf_counter() - read_at
+
+    def _table_dirs(self):
+        """Table folders under the root in load order, each with the stat scandir gave us."""
+        found = []
+        try:
+            with os.scandir(self.tablesRootFilePath) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if not entry.is_dir():
+                            continue
+                        dir_stat = entry.stat()
+                    except OSError:
+                        logger.exception("Failed to stat table directory: %s", entry.path)
+                        continue
+                    found.append((Path(entry.path), dir_stat))
+        except OSError:
+            logger.exception("Failed to enumerate tables root: %s", self.tablesRootFilePath)
+        # Path ordering, not name ordering, so the library keeps the order it always had
+        # (case-insensitive on Windows).
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def _scan_table_dir(self, table_dir, dir_stat):
+        """Read one table folder from disk into an index record."""
+        table = Table()
+        table.tableDirName = table_dir.name
+        table.fullPathTable = str(table_dir)
+        table_contents = set()
+        table_subdirs = set()
+
+        # Search with scandir to avoid per-entry pathlib stat calls on slow volumes.
+        try:
+            with os.scandir(table_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        table_subdirs.add(entry.name)
+                        continue
+                    table_contents.add(entry.name)
+                    if getattr(table, "fullPathVPXfile", None) or not entry.name.lower().endswith('.vpx'):
+                        continue
+                    table.fullPathVPXfile = entry.path
+                    stat = entry.stat()
+                    table.creation_time = getattr(stat, 'st_birthtime', stat.st_ctime)
+        except OSError:
+            logger.exception("Failed to enumerate table directory: %s", table_dir)
+
+        info_name = f"{table.tableDirName}.info"
+        # Stamped before the reads below, so a change that lands mid-scan shows up as a
+        # stale stamp next time rather than being recorded as already seen.
+        watched = [info_name] + [name for name in WATCHED_SUBDIRS if name in table_subdirs]
+        record = {
+            "stamp": folder_stamp(str(table_dir), dir_stat, watched),
+            "vpx": table.fullPathVPXfile,
+            "creation_time": table.creation_time,
+            "missing_info": info_name not in table_contents,
+            "error": None,
+        }
+        if not table.fullPathVPXfile:
+            logger.warning("No .vpx found in %s directory.", table.tableDirName)
+            return record
+
+        # check for addons
+        if any(name.lower().endswith(".directb2s") for name in table_contents):
+            table.b2sExists = True
+        if "pupvideos" in table_subdirs:
+            table.pupPackExists = True
+        if "serum" in table_subdirs:
+            table.altColorExists = True
+        if "vni" in table_subdirs:
+            table.vniExists = True
+        if "pinmame" in table_subdirs and (table_dir / "pinmame" / "altsound").is_dir():
+            table.altSoundExists = True
+
+        self.loadImagePaths(
+            table,
+            table_contents=table_contents,
+            has_medias_dir="medias" in table_subdirs,
         )
+        record["flags"] = {name: getattr(table, name) for name in _ADDON_FLAGS}
+        record["media"] = {
+            spec.attr: getattr(table, spec.attr)
+            for spec in MEDIA_SPECS
+            if getattr(table, spec.attr, None)
+        }
+        try:
+            self.loadMetaData(table)
+        except InvalidMetaConfigError as exc:
+            record["error"] = str(exc)
+            return record
+        record["meta"] = table.metaConfig
+
+        # Only a table a newer VPinFE upgraded has anything to put back, and only then
+        # is a saved copy worth opening to check we can read it.
+        stamps = backup_names(table_contents, info_name)
+        record["info_restorable"] = bool(
+            converted_by_newer(table.metaConfig)
+            and stamps
+            and restorable_backup(table_dir, names=table_contents))
+        record["info_backup_stamp"] = stamps[0].rsplit(BACKUP_MARKER, 1)[-1] if stamps else ""
+        return record
+
+    def _add_record(self, table_dir, record):
+        """Apply one folder's record to the library and its missing/unreadable lists."""
+        table, missing, unreadable = self._record_rows(table_dir, record)
+        if missing:
+            self.missing_tables.append(missing)
+        if unreadable:
+            self.unreadable_tables.append(unreadable)
+        if table is not None:
+            self.tables.append(table)
+
+    def _record_rows(self, table_dir, record):
+        """(table, missing row, unreadable row) for one folder's record; each may be None."""
+        if not record.get("vpx"):
+            return None, None, None
+
+        missing = None
+        if record.get("missing_info"):
+            missing = {
+                'folder': table_dir.name,
+                'path': str(table_dir),
+            }
+
+        if record.get("error"):
+            # One unreadable file used to stop the whole library loading, so a single
+            # truncated .info left the app with no tables at all. Drop the one table
+            # and keep going: excluded rather than loaded empty, because loading it
+            # empty would let the next write overwrite a file we could not read.
+            logger.error("Skipping table with unreadable metadata: %s", record["error"])
+            return None, missing, {
+                'folder': table_dir.name,
+                'path': str(table_dir),
+                'error': record["error"],
+            }
+
+        return self._table_from_record(table_dir, record), missing, None
+
+    def refreshTable(self, table_dir):
+        """Re-read one table folder and splice the result into the loaded library.
+
+        The folder may be new, changed or gone. A table already loaded is updated in
+        place rather than replaced, so lists that other callers copied out of
+        getAllTables() see the change too. Returns the table, or None when the folder
+        no longer holds a loadable table.
+        """
+        table_dir = Path(table_dir)
+        key = str(table_dir)
+        self.missing_tables[:] = [row for row in self.missing_tables if row['path'] != key]
+        self.unreadable_tables[:] = [row for row in self.unreadable_tables if row['path'] != key]
+        position = next(
+            (i for i, table in enumerate(self.tables) if table.fullPathTable == key), None)
+
+        dir_stat = None
+        if not table_dir.name.startswith('.'):
+            try:
+                dir_stat = os.stat(table_dir)
+            except OSError:
+                dir_stat = None
+        if dir_stat is None or not S_ISDIR(dir_stat.st_mode):
+            if position is not None:
+                del self.tables[position]
+            if self.scan_index is not None:
+                self.scan_index.discard(key)
+                self.scan_index.save()
+            return None
+
+        record = self._scan_table_dir(table_dir, dir_stat)
+        if self.scan_index is not None:
+            self.scan_index.store(key, record)
+            self.scan_index.save()
+
+        table, missing, unreadable = self._record_rows(table_dir, record)
+        if missing:
+            insort(self.missing_tables, missing, key=_row_order)
+        if unreadable:
+            insort(self.unreadable_tables, unreadable, key=_row_order)
+
+        if table is None:
+            if position is not None:
+                del self.tables[position]
+            return None
+        if position is not None:
+            existing = self.tables[position]
+            existing.update_from(table)
+            return existing
+        insort(self.tables, table, key=lambda t: Path(t.fullPathTable))
+        return table
+
+    @staticmethod
+    def _table_from_record(table_dir, record):
+        table = Table()
+        table.tableDirName = table_dir.name
+        table.fullPathTable = str(table_dir)
+        table.fullPathVPXfile = record["vpx"]
+        table.creation_time = record.get("creation_time")
+        for name, value in (record.get("flags") or {}).items():
+            if name in _ADDON_FLAGS:
+                setattr(table, name, bool(value))
+        for attr, path in (record.get("media") or {}).items():
+            setattr(table, attr, path)
+        # load_meta() builds its own copy, so a table edited in memory never reaches back
+        # into the record it was built from.
+        table.load_meta(record.get("meta") or {})
+        table.info_restorable = bool(record.get("info_restorable", False))
+        table.info_backup_stamp = record.get("info_backup_stamp", "") or ""
+        table.intern_paths()
+        return table
 
     def loadImagePaths(self, Table, table_contents=None, has_medias_dir=None):
         table_dir = Path(Table.fullPathTable)
@@ -8,8 +8,10 @@ from io import BytesIO
 
 
 class ThemeInstallStore:
-    def __init__(self, themes_dir: str) -> None:
+    def __init__(self, themes_dir: str, updates_dir: str | None = None) -> None:
         self.themes_dir = themes_dir
+        # Where stage_zip keeps updates until install_staged puts them in place.
+        self.updates_dir = updates_dir or os.path.join(os.path.dirname(themes_dir), "cache", "theme_updates")
         os.makedirs(self.themes_dir, exist_ok=True)
 
     @staticmethod
@@ -72,5 +74,36 @@ class ThemeInstallStore:
                 os.rename(src, dst)
                 break
 
+    def stage_zip(self, theme_key: str, base_url: str, zip_data: BytesIO) -> None:
+        """Keep a downloaded update for `install_staged`, for a theme that cannot be
+        replaced right now because the windows are loading from its folder."""
+        os.makedirs(self.updates_dir, exist_ok=True)
+        zip_path = os.path.join(self.updates_dir, f"{theme_key}.zip")
+        with open(f"{zip_path}.tmp", "wb") as handle:
+            handle.write(zip_data.getvalue())
+        with open(os.path.join(self.updates_dir, f"{theme_key}.json"), "w", encoding="utf-8") as handle:
+            json.dump({"base_url": base_url}, handle)
+        os.replace(f"{zip_path}.tmp", zip_path)
+
+    def install_staged(self) -> list[str]:
+        """Install the updates `stage_zip` kept; returns their theme keys."""
+        if not os.path.isdir(self.updates_dir):
+            return []
+        installed = []
+        for name in sorted(os.listdir(self.updates_dir)):
+            if not name.endswith(".zip"):
+                continue
+            theme_key = name[:-len(".zip")]
+            zip_path = os.path.join(self.updates_dir, name)
+            info_path = os.path.join(self.updates_dir, f"{theme_key}.json")
+            with open(info_path, "r", encoding="utf-8") as handle:
+                base_url = json.load(handle)["base_url"]
+            with open(zip_path, "rb") as handle:
+                self.install_zip(theme_key, base_url, BytesIO(handle.read()))
+            os.remove(zip_path)
+            os.remove(info_path)
+            installed.append(theme_key)
+        return installed
+
     def delete(self, folder: str) -> None:
         shutil.rmtree(os.path.join(self.themes_dir, folder))
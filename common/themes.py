@@ -4,7 +4,7 @@ import concurrent.futures
 from io import BytesIO
 from typing import Dict, Any
 
-from common.paths import CONFIG_DIR
+from common.paths import CONFIG_DIR, THEME_UPDATES_DIR
 from common.theme_installer import ThemeInstallStore
 from common.theme_registry_client import ThemeRegistryClient, ThemeRegistryError
 
@@ -22,7 +22,7 @@ class ThemeRegistry:
 
         self.base_dir = str(CONFIG_DIR)
         self.themes_dir = os.path.join(self.base_dir, "themes")
-        self.store = ThemeInstallStore(self.themes_dir)
+        self.store = ThemeInstallStore(self.themes_dir, str(THEME_UPDATES_DIR))
 
     # =========================================================
     # NETWORK
@@ -141,14 +141,25 @@ class ThemeRegistry:
     # INSTALLATION
     # =========================================================
 
-    def auto_install_defaults(self):
-        """Auto-install all themes marked as default_install=True"""
+    def auto_install_defaults(self, in_use: str | None = None):
+        """Auto-install all themes marked as default_install=True.
+
+        `in_use` is the folder of the theme the windows are loading from, when they
+        already are. An update to it is only downloaded and staged; replacing the folder
+        under them could serve a half-deleted theme, and on Windows the delete can fail
+        on open files. install_staged_updates() puts it in place at the next start.
+        """
         for key, theme in self.themes.items():
             if theme["registry_info"].get("default_install", False):
-                self.install_theme(key)
+                stage = in_use is not None and self.get_installed_folder(key) == in_use
+                self.install_theme(key, stage=stage)
 
+    def install_staged_updates(self) -> list[str]:
+        """Install the updates auto_install_defaults staged; nothing is downloaded."""
+        return self.store.install_staged()
 
-    def install_theme(self, theme_key: str, force: bool = False):
+
+    def install_theme(self, theme_key: str, force: bool = False, stage: bool = False):
         if theme_key not in self.themes:
             raise ThemeRegistryError(f"Theme '{theme_key}' not loaded.")
 
@@ -169,6 +180,11 @@ class ThemeRegistry:
         zip_url = self._build_zip_url(base_url)
         zip_data = self._download_zip(zip_url)
 
+        if stage:
+            self.store.stage_zip(theme_key, base_url, zip_data)
+            logger.info("Staged %s v%s; it is installed at the next start", theme_key, remote_version)
+            return
+
         self.store.install_zip(theme_key, base_url, zip_data)
 
         logger.info("Installed %s", theme_key)
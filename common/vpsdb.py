@@ -1,10 +1,10 @@
 import logging
-from difflib import SequenceMatcher
 import re
 
 from common.paths import CONFIG_DIR
 from common.config_access import MediaConfig
 from common.vpsdb_cache import VPinMediaDatabase, VPSDatabaseCache
+from common.vpsdb_match import VPSNameIndex
 from common.vpsdb_media import VPSMediaDownloader
 
 
@@ -20,6 +20,7 @@ class VPSdb:
     rootTableDir = None
     data = None
     _vpinfeIniConfig = None
+    _name_index = None
 
     vpsUrlLastUpdate = "https://raw.githubusercontent.com/VirtualPinballSpreadsheet/vps-db/refs/heads/main/lastUpdated.json"
     vpsUrldb = "https://github.com/VirtualPinballSpreadsheet/vps-db/raw/refs/heads/main/db/vpsdb.json"
@@ -80,21 +81,16 @@ class VPSdb:
         if not all((name, manufacturer, year)):
             return None
 
-        for table in self.data or []:
-            # Compare table names
-            if SequenceMatcher(None, name.lower(), table["name"].lower()).ratio() < 0.8:
-                continue
-
-            # Compare manufacturers
-            if SequenceMatcher(None, manufacturer.lower(), table["manufacturer"].lower()).ratio() < 0.8:
-                continue
-
-            # Compare year
-            if SequenceMatcher(None, str(year), str(table["year"])).ratio() >= 0.8:
-                return table
-
-        logger.debug("No match found for: %s", name)
-        return None
+        # Same 0.8 name/manufacturer/year tests as a scan of every entry, answered from an
+        # index built on first use; see vpsdb_match.
+        index = self._name_index
+        if index is None or index.data is not self.data:
+            index = VPSNameIndex(self.data)
+            self._name_index = index
+        table = index.lookup(name, manufacturer, year)
+        if table is None:
+            logger.debug("No match found for: %s", name)
+        return table
 
     def parseTableNameFromDir(self, directory_name):
         """
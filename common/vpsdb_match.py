@@ -0,0 +1,80 @@
+"""Name matching index over the VPS database.
+
+`VPSdb.lookupName` accepts an entry when its name, manufacturer and year each score at
+least 0.8 against the folder's with difflib, and returns the first such entry in VPSdb
+order. Done as a scan, that is three SequenceMatcher runs per entry for every table, and a
+metadata build looks up every table in the library.
+
+The three tests are independent, so they can be answered in any order. The index groups
+entries by (year, manufacturer). The year and manufacturer tests are run once per
+distinct value in VPSdb, and only once per distinct query value. Names are then scored
+only in the few buckets that passed both. A scan and the index use the same scores and
+the same threshold and pick the lowest position, so they return the same entry.
+"""
+
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import Any
+
+
+MATCH_THRESHOLD = 0.8
+
+
+def _ratio(a: str, b: str) -> float:
+    # Argument order matters: ratio() is not guaranteed symmetric, and the scan passes
+    # the query first.
+    return SequenceMatcher(None, a, b).ratio()
+
+
+class VPSNameIndex:
+    def __init__(self, data: list[dict[str, Any]] | None) -> None:
+        self.data = data
+        # year -> manufacturer -> [(position, lowercased name)], all keys as the scan
+        # compares them: str(year), manufacturer.lower().
+        self._buckets: dict[str, dict[str, list[tuple[int, str]]]] = {}
+        manufacturers: set[str] = set()
+        for position, table in enumerate(data or []):
+            year = str(table.get("year", ""))
+            manufacturer = str(table.get("manufacturer") or "").lower()
+            manufacturers.add(manufacturer)
+            self._buckets.setdefault(year, {}).setdefault(manufacturer, []).append(
+                (position, str(table.get("name") or "").lower())
+            )
+        self._manufacturers = sorted(manufacturers)
+        # Query value -> the VPSdb values it is close enough to. Folder names repeat the
+        # same handful of manufacturers and years, so these fill up quickly.
+        self._year_matches: dict[str, tuple[str, ...]] = {}
+        self._manufacturer_matches: dict[str, tuple[str, ...]] = {}
+
+    def _close_years(self, year: str) -> tuple[str, ...]:
+        matches = self._year_matches.get(year)
+        if matches is None:
+            matches = tuple(key for key in self._buckets if _ratio(year, key) >= MATCH_THRESHOLD)
+            self._year_matches[year] = matches
+        return matches
+
+    def _close_manufacturers(self, manufacturer: str) -> tuple[str, ...]:
+        matches = self._manufacturer_matches.get(manufacturer)
+        if matches is None:
+            matches = tuple(
+                key for key in self._manufacturers if _ratio(manufacturer, key) >= MATCH_THRESHOLD
+            )
+            self._manufacturer_matches[manufacturer] = matches
+        return matches
+
+    def lookup(self, name: str, manufacturer: str, year) -> dict[str, Any] | None:
+        """The entry a linear lookupName scan would return, or None."""
+        name = name.lower()
+        manufacturers = self._close_manufacturers(manufacturer.lower())
+        best = None
+        for year_key in self._close_years(str(year)):
+            by_manufacturer = self._buckets[year_key]
+            for manufacturer_key in manufacturers:
+                for position, candidate in by_manufacturer.get(manufacturer_key, ()):
+                    if best is not None and position > best:
+                        break
+                    if _ratio(name, candidate) >= MATCH_THRESHOLD:
+                        best = position
+                        break
+        return None if best is None else self.data[best]
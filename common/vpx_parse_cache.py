@@ -0,0 +1,119 @@
+"""Persistent record of what VPXParser found in each .vpx, keyed by the file's stamp.
+
+Extracting a table hashes the whole .vpx and walks its OLE streams, and a .vpx is commonly
+100-500 MB. A metadata rebuild over an unchanged library used to do that for every table.
+The cache keeps the extracted values next to the (size, mtime_ns) they were read under,
+plus the same for a sidecar .vbs, which replaces the embedded script and so changes the
+code hash, rom and detectors. A file whose stamp still matches is not opened at all.
+
+The values are stored without `gameData`, the table script: nothing downstream of a
+metadata build reads it, and it is often the largest thing in the record.
+
+Like the scan index, this is a cache and never the source of truth; anything it cannot
+vouch for is thrown away and the file is parsed again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from common.info_restore import write_json_atomic
+
+
+logger = logging.getLogger("vpinfe.common.vpx_parse_cache")
+
+CACHE_VERSION = 1
+
+# Dropped from cached records; see the module docstring.
+UNCACHED_FIELDS = ("gameData",)
+
+
+def _stat_stamp(path: str) -> list | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def file_stamp(vpx_path: str) -> list | None:
+    """[size, mtime_ns] of the .vpx, then of its sidecar .vbs (None when absent)."""
+    stamp = _stat_stamp(vpx_path)
+    if stamp is None:
+        return None
+    return [*stamp, _stat_stamp(str(Path(vpx_path).with_suffix(".vbs")))]
+
+
+class VPXParseCache:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                return
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable VPX parse cache %s: %s", self.path, exc)
+                return
+            if isinstance(data, dict) and data.get("version") == CACHE_VERSION \
+                    and isinstance(data.get("files"), dict):
+                self._entries = data["files"]
+
+    def lookup(self, vpx_path: str, stamp: list | None = None) -> dict[str, Any] | None:
+        """A copy of the cached values for `vpx_path`, or None when unknown or changed."""
+        self.load()
+        if stamp is None:
+            stamp = file_stamp(vpx_path)
+        with self._lock:
+            entry = self._entries.get(vpx_path)
+        if not isinstance(entry, dict) or stamp is None or entry.get("stamp") != stamp:
+            return None
+        values = entry.get("values")
+        return dict(values) if isinstance(values, dict) else None
+
+    def store(self, vpx_path: str, stamp: list | None, values: dict[str, Any]) -> None:
+        if stamp is None:
+            return
+        self.load()
+        kept = {key: value for key, value in values.items() if key not in UNCACHED_FIELDS}
+        with self._lock:
+            self._entries[vpx_path] = {"stamp": stamp, "values": kept}
+            self._dirty = True
+
+    def prune(self, seen: Iterable[str]) -> None:
+        """Forget files that are no longer part of the library."""
+        self.load()
+        keep = set(seen)
+        with self._lock:
+            for vpx_path in [key for key in self._entries if key not in keep]:
+                del self._entries[vpx_path]
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": CACHE_VERSION, "files": dict(self._entries)}
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(str(self.path), payload, indent=None)
+        except (OSError, TypeError, ValueError) as exc:
+            # Losing the cache only costs the next build a full parse.
+            logger.warning("Could not save VPX parse cache %s: %s", self.path, exc)
+            with self._lock:
+                self._dirty = True
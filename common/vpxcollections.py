@@ -3,17 +3,13 @@ import configparser
 import logging
 from pathlib import Path
 
-from common.table_metadata import base_table_vps_id, section, table_title
+from common.table_metadata import base_table_vps_id, section, table_keys, table_meta
 
 logger = logging.getLogger("vpinfe.common.vpxcollections")
 
 
-def _get_display_title(table):
-    return table_title(table)
-
-
 def _get_last_run_value(table):
-    user = section(getattr(table, "metaConfig", {}), "User")
+    user = section(table_meta(table), "User")
     raw = user.get("LastRun")
     try:
         return int(raw)
@@ -174,7 +170,7 @@ class VPXCollections:
         result = []
 
         for table in tables:
-            vpinfe = section(getattr(table, "metaConfig", {}), "VPinFE")
+            vpinfe = section(table_meta(table), "VPinFE")
             base_vpsid = base_table_vps_id(table)
             alt_vpsid = str(vpinfe.get("altvpsid", "") or "").strip()
 
@@ -188,9 +184,9 @@ class VPXCollections:
         if collection == "Last Played":
             # Automatic recents collection should surface the most recently run tables first.
             result.sort(
-                key=lambda t: (-_get_last_run_value(t), _get_display_title(t).lower())
+                key=lambda t: (-_get_last_run_value(t), table_keys(t).sort_key)
             )
         else:
-            result.sort(key=lambda t: _get_display_title(t).lower())
+            result.sort(key=lambda t: table_keys(t).sort_key)
 
         return result
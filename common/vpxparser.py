@@ -5,12 +5,15 @@ import olefile
 import json
 import struct
 import hashlib
+import mmap
 import os
 import re
 import csv
 import pathlib
 import sys
 
+from common.vpx_parse_cache import VPXParseCache, file_stamp
+
 
 logger = logging.getLogger("vpinfe.common.vpxparser")
 
@@ -54,7 +57,10 @@ class VPXParser:
         'detectflex': '',
     }
 
-    def __init__(self):
+    def __init__(self, cache: VPXParseCache | None = None):
+        # With a cache, singleFileExtract skips files whose stamp has not moved and
+        # returns the stored values, which leave out `gameData`.
+        self.cache = cache
         self.fieldnames = [
             *self.vpxPaths.keys(),
             *self.vpxPathsBinary.keys(),
@@ -130,14 +136,33 @@ class VPXParser:
         return [str(p) for p in pathlib.Path(directory).glob("*.vpx")]
 
     def extractFile(self, file):
-        vpxFileValues = {
-            'filename': os.path.basename(file),
-            'fileHash': self.sha256sum(file),
-        }
-
-        with olefile.OleFileIO(file) as ole:
-            self.loadTableValues(vpxFileValues, ole)
-            self.loadVBCode(ole, vpxFileValues)
+        # One read of the file: hash the mapping, then let olefile seek around the same
+        # pages, which are in memory by then. Where the file cannot be mapped (empty, or
+        # a filesystem without mmap) it is read twice as before.
+        with open(file, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None
+            try:
+                if mapped is not None:
+                    fileHash = hashlib.sha256(mapped).hexdigest()
+                    source = mapped
+                else:
+                    fileHash = hashlib.file_digest(f, 'sha256').hexdigest()
+                    f.seek(0)
+                    source = f
+
+                vpxFileValues = {
+                    'filename': os.path.basename(file),
+                    'fileHash': fileHash,
+                }
+                with olefile.OleFileIO(source) as ole:
+                    self.loadTableValues(vpxFileValues, ole)
+                    self.loadVBCode(ole, vpxFileValues)
+            finally:
+                if mapped is not None:
+                    mapped.close()
 
         self.loadSidecarVBCode(file, vpxFileValues)
         self.calcCodeHash(vpxFileValues)
@@ -214,13 +239,22 @@ class VPXParser:
     # Bulk ops
     # -------------------------------
     def singleFileExtract(self, vpxFile):
+        stamp = None
+        if self.cache is not None:
+            stamp = file_stamp(vpxFile)
+            cached = self.cache.lookup(vpxFile, stamp)
+            if cached is not None:
+                return cached
         if not os.path.exists(vpxFile):
             logger.warning("File not found: %s", vpxFile)
             return None
         if not olefile.isOleFile(vpxFile):
             logger.warning("Not an OLE file: %s", vpxFile)
             return None
-        return self.extractFile(vpxFile)
+        vpxFileValues = self.extractFile(vpxFile)
+        if self.cache is not None:
+            self.cache.store(vpxFile, stamp, vpxFileValues)
+        return vpxFileValues
 
     def bulkFileExtract(self, vpxFileDir, writer):
         files = self.getAllVpxFilesFromDir(vpxFileDir)
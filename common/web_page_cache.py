@@ -0,0 +1,200 @@
+"""Disk cache for web pages the asset server proxies, such as Pinball Primer tutorials.
+
+Opening a tutorial overlay used to mean a fresh download with a 15 second timeout, every
+time, and no overlay at all without a network. Pages are now kept on disk by URL:
+
+- younger than `ttl`, a page is served from disk without touching the network;
+- older, but within `stale_while_revalidate`, it is still served at once, and a single
+  background request revalidates it (If-None-Match / If-Modified-Since, so an unchanged
+  page costs a 304);
+- older still, it is revalidated before answering, and served anyway if that fails, so a
+  page seen once keeps working offline.
+
+Requests share one pooled session, so repeated fetches reuse the TLS connection.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.file_cache import BoundedFileCache
+
+
+logger = logging.getLogger("vpinfe.common.web_page_cache")
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_STALE_WHILE_REVALIDATE = 30 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TIMEOUT = 15
+USER_AGENT = "VPinFE PinballPrimer Proxy"
+
+# How a page was answered, also sent to the browser as X-Cache.
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+REVALIDATED = "REVALIDATED"
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """One pooled session for every proxied fetch."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+        return _session
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    url: str
+    text: str
+    fetched_at: float
+    etag: str = ""
+    last_modified: str = ""
+
+    def age(self, now: float | None = None) -> float:
+        return (time.time() if now is None else now) - self.fetched_at
+
+
+class WebPageCache(BoundedFileCache):
+    def __init__(
+        self,
+        root: str | Path,
+        ttl: float = DEFAULT_TTL,
+        stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        session: requests.Session | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        super().__init__(root, max_bytes)
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self._session = session
+        self._revalidating: set[str] = set()
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or shared_session()
+
+    def _entry_path(self, url: str) -> Path:
+        return self.path(self.key(url), ".json")
+
+    def load(self, url: str) -> CachedPage | None:
+        path = self._entry_path(url)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            page = CachedPage(
+                url=data["url"],
+                text=data["text"],
+                fetched_at=float(data["fetched_at"]),
+                etag=data.get("etag", ""),
+                last_modified=data.get("last_modified", ""),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if page.url != url:
+            return None
+        self.touch(path)
+        return page
+
+    def store(self, page: CachedPage) -> None:
+        path = self._entry_path(page.url)
+        tmp_path = self.tmp_path(path)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(page.__dict__, handle)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not cache %s: %s", page.url, exc)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+        # Revalidations overwrite the page in place; only the difference is new.
+        self.added(path.stat().st_size, replaced)
+
+    def get(self, url: str) -> tuple[str, str]:
+        """The page's text and how it was answered (HIT, STALE, MISS or REVALIDATED).
+
+        Raises requests.RequestException only when the page has never been fetched and
+        cannot be fetched now.
+        """
+        page = self.load(url)
+        if page is None:
+            return self._fetch(url, None).text, MISS
+
+        age = page.age()
+        if age < self.ttl:
+            return page.text, HIT
+        if age < self.ttl + self.stale_while_revalidate:
+            self._revalidate_in_background(url, page)
+            return page.text, STALE
+        try:
+            return self._fetch(url, page).text, REVALIDATED
+        except requests.RequestException as exc:
+            logger.info("Serving cached %s after a failed revalidation: %s", url, exc)
+            return page.text, STALE
+
+    def _fetch(self, url: str, cached: CachedPage | None) -> CachedPage:
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            page = CachedPage(url, cached.text, time.time(), cached.etag, cached.last_modified)
+        else:
+            response.raise_for_status()
+            page = CachedPage(
+                url,
+                response.text,
+                time.time(),
+                response.headers.get("ETag", ""),
+                response.headers.get("Last-Modified", ""),
+            )
+        self.store(page)
+        return page
+
+    def _revalidate_in_background(self, url: str, page: CachedPage) -> None:
+        with self._lock:
+            if url in self._revalidating:
+                return
+            self._revalidating.add(url)
+
+        def _worker():
+            try:
+                self._fetch(url, page)
+            except requests.RequestException as exc:
+                logger.debug("Background revalidation of %s failed: %s", url, exc)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(url)
+
+        threading.Thread(target=_worker, name="web-page-revalidate", daemon=True).start()
@@ -26,6 +26,9 @@ from common.vpinplay_runtime import (
     get_alternate_profile_state,
 )
 from frontend import config_api, input_api, last_table, launch_service, metadata_build_service, realdmd_service, table_state, theme_api
+from frontend.api_metrics import get_api_metrics
+from frontend.media_prefetch import DEFAULT_RADIUS, get_media_prefetcher
+from frontend.table_store import TableStore, get_table_store
 
 
 logger = logging.getLogger("vpinfe.frontend.api")
@@ -45,6 +48,8 @@ API_ALLOWED_METHODS = {
     'shutdown_system',
     'get_monitors',
     'get_tables',
+    'get_tables_window',
+    'get_tables_since',
     'get_initial_table_index',
     'get_collections',
     'get_collections_metadata',
@@ -71,6 +76,8 @@ API_ALLOWED_METHODS = {
     'set_button_mapping',
     'launch_table',
     'update_frontend_dof_for_table',
+    'prefetch_media',
+    'get_prefetch_stats',
     'get_table_rating',
     'set_table_rating',
     'build_metadata',
@@ -94,6 +101,8 @@ API_ALLOWED_METHODS = {
     'send_event',
     'send_event_all_windows',
     'send_event_all_windows_incself',
+    'get_event_queue_stats',
+    'get_api_metrics',
 }
 
 
@@ -104,6 +113,7 @@ class API:
         self.ws_bridge = ws_bridge              # WebSocketBridge instance
         self.frontend_browser = frontend_browser  # ChromiumManager instance
         self.allTables = ensure_tables_loaded()
+        self.table_store.attach_window(self)
         self.jsTableDictData = None
         # Track current filter state
         self.current_filters = table_state.default_filter_state()
@@ -147,19 +157,30 @@ class API:
     def _queue_realdmd_image_update(self, table_name: str, image_path) -> None:
         self._realdmd_updater.queue_image_update(table_name, image_path)
 
+    @property
+    def table_store(self) -> TableStore:
+        """The library and its views, shared with the other windows' APIs."""
+        return get_table_store()
+
+    @property
+    def allTables(self):
+        return self.table_store.library()
+
+    @allTables.setter
+    def allTables(self, tables):
+        self.table_store.replace_library(tables)
+
     def _reset_to_default_view(self):
         """Reset the current view to the default order: alphabetical by the
         (article-reordered) title, ascending.
 
-        filteredTables is a fresh shallow copy of allTables so later in-place
-        sorts never disturb the master list (the Table objects stay shared, so
-        rating/meta updates still propagate). Shared by startup and every reset
-        path so they all agree on the default order.
+        filteredTables is an immutable snapshot from the shared table store, so
+        the first window to reset sorts the library and the others reuse it. Shared
+        by startup and every reset path so they all agree on the default order.
         """
-        self.filteredTables = list(self.allTables)
+        self.filteredTables = self.table_store.default_view()
         self.current_sort = 'Alpha'
         self.current_order = 'Ascending'
-        table_state.apply_sort(self.filteredTables, self.current_sort, self.current_order)
 
 
     ###################
@@ -196,12 +217,47 @@ class API:
         if self.ws_bridge:
             self.ws_bridge.send_event_all_with_iframe(message)
 
+    def get_event_queue_stats(self):
+        """Each connected window's outbound queue: depth, max_depth, sent, coalesced, dropped."""
+        if self.ws_bridge:
+            return self.ws_bridge.queue_stats()
+        return {}
+
+    def get_api_metrics(self, reset=False):
+        """Calls, errors, queue-wait and execution latency, and response sizes per API method.
+
+        Shared by all windows. With reset=True the counters start over after this snapshot.
+        """
+        metrics = self.ws_bridge.metrics if self.ws_bridge else get_api_metrics()
+        snapshot = metrics.snapshot()
+        if reset:
+            metrics.reset()
+        return snapshot
+
     def get_tables(self, reset=False):
         if reset:
             self._reset_to_default_view()
-        self.jsTableDictData = table_state.tables_json(self.filteredTables)
+        self.jsTableDictData = self.table_store.tables_json(self.filteredTables)
         return self.jsTableDictData
 
+    def get_tables_window(self, offset=0, limit=50, reset=False):
+        """
+        Return `limit` tables of the current view starting at `offset`, as JSON:
+        {"total", "offset", "version", "view", "tables": [...]}.
+        Pass "version" and "view" to get_tables_since to pick up later edits.
+        """
+        if reset:
+            self._reset_to_default_view()
+        return self.table_store.tables_window_json(self.filteredTables, offset, limit)
+
+    def get_tables_since(self, version, view=None):
+        """
+        Return the tables of the current view edited after `version`, as JSON:
+        {"version", "view", "total", "full", "changed": [{"index", "table"}]}.
+        "full" is true (and every table is listed) when the view itself changed.
+        """
+        return table_state.tables_since_json(self.filteredTables, version, view)
+
     def get_initial_table_index(self):
         # Position the wheel on the last-launched table at startup. Resolved
         # against the current (possibly filtered) view; 0 when disabled or unfound.
@@ -259,7 +315,7 @@ class API:
         return self.current_collection or 'None'
 
     def _filter_option(self, key: str):
-        return table_state.filter_options(self.allTables)[key]
+        return self.table_store.filter_options()[key]
 
     def get_filter_letters(self):
         return self._filter_option(_FILTER_OPTION_KEYS["letters"])
@@ -312,7 +368,8 @@ class API:
         self.current_order = table_state.normalize_sort_order(order_by, sort_type)
         logger.debug("Applying sort: %s %s", sort_type, self.current_order)
 
-        count = table_state.apply_sort(self.filteredTables, sort_type, self.current_order)
+        self.filteredTables = self.table_store.sorted_view(self.filteredTables, sort_type, self.current_order)
+        count = len(self.filteredTables)
         logger.debug("Sorted %s tables by %s %s", count, sort_type, self.current_order)
         return count
 
@@ -327,8 +384,11 @@ class API:
         except (TypeError, ValueError):
             index = 0
         paging_type, page_size = input_api.get_paging_config(self._iniConfig.config)
+        group_starts = None
+        if paging_type == "alpha" and self.current_sort == "Alpha":
+            group_starts = self.table_store.paging_group_starts(self.filteredTables)
         return table_state.page_jump_index(
-            self.filteredTables, index, direction, self.current_sort, paging_type, page_size
+            self.filteredTables, index, direction, self.current_sort, paging_type, page_size, group_starts
         )
 
     def console_out(self, output):
@@ -396,14 +456,36 @@ class API:
             "realdmd_queued": True,
         }
 
+    def prefetch_media(self, index, radius=DEFAULT_RADIUS):
+        """Warm the media of the `radius` tables either side of `index` in the background.
+
+        Returns {"tables", "files"} queued; the windows share one prefetcher, so a call
+        from any of them replaces the last one's unfinished work.
+        """
+        try:
+            index, radius = int(index), int(radius)
+        except (TypeError, ValueError):
+            return {"tables": 0, "files": 0}
+        if not 0 <= index < len(self.filteredTables):
+            return {"tables": 0, "files": 0}
+        return get_media_prefetcher().prefetch_tables(self.filteredTables, index, radius)
+
+    def get_prefetch_stats(self):
+        """Prefetch counters: requests, hits, misses, hit_rate, errors, bytes_warmed, pending."""
+        return get_media_prefetcher().stats()
+
     def get_table_rating(self, index):
         """Get User.Rating for a table index in the current filtered list."""
         return table_state.get_table_rating(self.filteredTables, index)
 
     def set_table_rating(self, index, rating):
         """Set User.Rating (0-5) for a table index in the current filtered list."""
+        table = self.filteredTables[index]
+        self.table_store.remember(table)
         result = table_state.set_table_rating(self.filteredTables, index, rating)
-        logger.info("Updated User.Rating for %s -> %s", self.filteredTables[index].tableDirName, result["rating"])
+        logger.info("Updated User.Rating for %s -> %s", table.tableDirName, result["rating"])
+        # Every window, this one included, gets the new rating as a TableChanged event.
+        self.table_store.publish_changes()
         return result
 
     def build_metadata(self, download_media=True, update_all=False):
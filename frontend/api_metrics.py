@@ -0,0 +1,161 @@
+"""Per-method timing for JS→Python API calls.
+
+Every call a theme makes goes through the WebSocket bridge, which runs the method on a
+worker thread. When the wheel feels slow, the question is whether a call was slow to run
+(`get_tables` on a large library), slow to start, or slow to send (a large response).
+A call's queue wait runs from its frame being read off the socket to a worker thread
+starting it. The bridge answers each window's calls in order, so that covers waiting
+behind the same window's earlier calls as well as waiting for a free thread; it does not
+cover time in the browser before the frame is sent. The bridge records all three for each call
+here, and `get_api_metrics` and the Manager UI's API Metrics page read them back.
+
+Times go into fixed histogram buckets rather than a list of samples, so memory stays
+constant however long the frontend runs; percentiles are read off the buckets and are as
+precise as the bucket edges. With `slow_call_ms` set (`Logger.slowapicallms`), a call that
+takes at least that long from arrival to response is also logged as a warning.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger("vpinfe.frontend.api_metrics")
+
+# Upper edges of the histogram buckets, in milliseconds; the last bucket is open-ended.
+BUCKET_EDGES_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_EDGES_MS, value_ms)] += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """The upper edge of the bucket holding the given fraction of samples."""
+        count = sum(self.counts)
+        if not count:
+            return 0.0
+        needed = fraction * count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= needed:
+                edge = BUCKET_EDGES_MS[index] if index < len(BUCKET_EDGES_MS) else self.max
+                return min(edge, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        count = sum(self.counts)
+        return {
+            "avg_ms": round(self.total / count, 3) if count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets": list(self.counts),
+        }
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "queue_wait", "execution", "response_bytes", "max_response_bytes", "last_call")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.queue_wait = _Histogram()
+        self.execution = _Histogram()
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+        self.last_call = 0.0
+
+
+class ApiMetrics:
+    def __init__(self, slow_call_ms: float = 0) -> None:
+        self.slow_call_ms = slow_call_ms
+        self._lock = threading.Lock()
+        self._methods: dict[str, _MethodStats] = {}
+        self._since = time.time()
+
+    def record(
+        self,
+        method: str,
+        queue_wait_s: float,
+        execution_s: float,
+        response_bytes: int,
+        error: bool = False,
+        window_name: str = "",
+    ) -> None:
+        wait_ms = queue_wait_s * 1000.0
+        execution_ms = execution_s * 1000.0
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.queue_wait.add(wait_ms)
+            stats.execution.add(execution_ms)
+            stats.response_bytes += response_bytes
+            stats.max_response_bytes = max(stats.max_response_bytes, response_bytes)
+            stats.last_call = time.time()
+        if self.slow_call_ms and wait_ms + execution_ms >= self.slow_call_ms:
+            logger.warning(
+                "Slow API call %s from '%s': %.1f ms (%.1f ms queued, %.1f ms running), %d byte response",
+                method, window_name, wait_ms + execution_ms, wait_ms, execution_ms, response_bytes,
+            )
+
+    def snapshot(self) -> dict:
+        """Per-method counters and latency summaries, busiest method first."""
+        with self._lock:
+            methods = {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "queue_wait": stats.queue_wait.summary(),
+                    "execution": stats.execution.summary(),
+                    "total_execution_ms": round(stats.execution.total, 3),
+                    "response_bytes": stats.response_bytes,
+                    "avg_response_bytes": stats.response_bytes // stats.calls if stats.calls else 0,
+                    "max_response_bytes": stats.max_response_bytes,
+                    "last_call": stats.last_call,
+                }
+                for name, stats in self._methods.items()
+            }
+            since = self._since
+        ordered = dict(sorted(methods.items(), key=lambda item: item[1]["total_execution_ms"], reverse=True))
+        return {
+            "since": since,
+            "slow_call_ms": self.slow_call_ms,
+            "bucket_edges_ms": list(BUCKET_EDGES_MS),
+            "methods": ordered,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._since = time.time()
+
+
+_metrics: ApiMetrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_api_metrics() -> ApiMetrics:
+    """The metrics the WebSocket bridge records into, shared with the Manager UI."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = ApiMetrics()
+        return _metrics
@@ -1,8 +1,13 @@
 # custom_http_server.py
+import datetime
+import email.utils
 import http.server
 import logging
-from socketserver import ThreadingTCPServer
+import queue
+import socketserver
+from collections import OrderedDict, deque
 import threading
+import time
 import os
 import mimetypes
 from urllib.parse import unquote, urlsplit
@@ -12,33 +17,254 @@ import re
 
 import requests
 
+from common.image_derivatives import DerivativeSpec, ImageDerivativeCache, is_derivable
+from common.mp4_faststart import FaststartCache
+from common.paths import FASTSTART_CACHE_DIR, IMAGE_DERIVATIVE_CACHE_DIR, WEB_PAGE_CACHE_DIR
+from common.web_page_cache import WebPageCache
+
 
 logger = logging.getLogger("vpinfe.frontend.customhttpserver")
 
+# Cache-Control per mount, longest prefix wins. Theme and app code changes under the same
+# URL whenever a theme is installed or VPinFE updated, so the browser always revalidates
+# it (a 304 when unchanged). Table media URLs carry no version either, but they are the
+# bulk of the traffic: a short freshness window plus stale-while-revalidate lets the wheel
+# reuse what it has without waiting, while a replaced image still shows up on a later
+# view once the background revalidation sees the new ETag.
+DEFAULT_CACHE_POLICIES = {
+    "/tables/": "public, max-age=60, stale-while-revalidate=604800",
+    "/collection_icons/": "public, max-age=60, stale-while-revalidate=604800",
+    "/web/": "no-cache",
+    "/themes/": "no-cache",
+}
+FALLBACK_CACHE_POLICY = "no-cache"
+
+
+def _normalize_prefix(prefix):
+    if not prefix.startswith('/'):
+        prefix = '/' + prefix
+    if not prefix.endswith('/'):
+        prefix = prefix + '/'
+    return prefix
+
+
+class MountTable:
+    """Mount points and cache policies, normalized and ordered longest prefix first.
+
+    Built once when the server starts and shared by every request, rather than each
+    handler normalizing the dicts again and sorting them on every translate_path.
+    """
+
+    def __init__(self, mount_points=None, cache_policies=None):
+        roots = {_normalize_prefix(p): os.path.abspath(r) for p, r in (mount_points or {}).items()}
+        self.mount_points = roots
+        self.mounts = tuple(sorted(roots.items(), key=lambda item: -len(item[0])))
+        policies = DEFAULT_CACHE_POLICIES if cache_policies is None else cache_policies
+        self.cache_policies = tuple(sorted(
+            ((_normalize_prefix(p), policy) for p, policy in policies.items()),
+            key=lambda item: -len(item[0]),
+        ))
+
+
+class ServerStats:
+    """Request counters for the asset server: totals plus rate and latency over the last minute.
+
+    Latency runs from the request line being read to the response being written, so time
+    a keep-alive connection sits idle between requests is not counted.
+    """
+
+    WINDOW_SECONDS = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.active = 0
+        self._recent = deque(maxlen=8192)  # (finished_at, seconds)
+
+    def request_started(self):
+        with self._lock:
+            self.active += 1
+
+    def request_finished(self, seconds, status):
+        now = time.monotonic()
+        with self._lock:
+            self.active -= 1
+            self.requests += 1
+            if status == 304:
+                self.not_modified += 1
+            elif status is not None and status >= 400:
+                self.errors += 1
+            self._recent.append((now, seconds))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            cutoff = now - self.WINDOW_SECONDS
+            latencies = sorted(seconds for finished_at, seconds in self._recent if finished_at >= cutoff)
+            totals = {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "errors": self.errors,
+                "active": self.active,
+            }
+        span = min(self.WINDOW_SECONDS, max(now - self.started_at, 1e-9))
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000.0
+
+        return {
+            **totals,
+            "requests_per_second": len(latencies) / span,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": latencies[-1] * 1000.0 if latencies else 0.0,
+            },
+        }
+
+
+class _WorkerPoolHTTPServer(socketserver.TCPServer):
+    """Accepted connections are handed to a fixed set of worker threads.
+
+    ThreadingTCPServer starts a thread per connection with no upper bound; with HTTP/1.1
+    keep-alive most of the wheel's requests ride a few long-lived connections, so a small
+    pool of reused threads serves them without per-connection thread churn, and a burst
+    of connections queues instead of spawning threads. The workers are daemon threads, so
+    an open video stream never holds up shutdown.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, workers, keep_alive, idle_timeout, stats, image_cache=None, faststart_cache=None, page_cache=None):
+        super().__init__(server_address, handler_class)
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self.stats = stats
+        self.image_cache = image_cache
+        self.faststart_cache = faststart_cache
+        self.page_cache = page_cache
+        # Whether each (client, video) pair's last fresh load got the fast-start copy.
+        self._faststart_readers = OrderedDict()
+        self._faststart_lock = threading.Lock()
+        self._connections = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"asset-http-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    MAX_FASTSTART_READERS = 256
+
+    def note_faststart_reader(self, key, copy: bool) -> None:
+        with self._faststart_lock:
+            self._faststart_readers[key] = copy
+            self._faststart_readers.move_to_end(key)
+            while len(self._faststart_readers) > self.MAX_FASTSTART_READERS:
+                self._faststart_readers.popitem(last=False)
+
+    def reads_faststart_copy(self, key) -> bool:
+        with self._faststart_lock:
+            return self._faststart_readers.get(key, False)
+
+    def process_request(self, request, client_address):
+        self._connections.put((request, client_address))
+
+    def _work(self):
+        while True:
+            item = self._connections.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _worker in self._workers:
+            self._connections.put(None)
+
+
 class CustomHTTPServer:
     class MultiDirHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Set debug True to print verbose logs
         debug = False
+        # Headers and body go out as separate writes (the body by sendfile). On a kept-alive
+        # connection Nagle would hold the body back until the client's delayed ACK, ~40 ms.
+        disable_nagle_algorithm = True
         PINBALL_PRIMER_PREFIX = "https://pinballprimer.github.io/"
 
-        def __init__(self, *args, mount_points=None, **kwargs):
-            # normalize mount_points: ensure prefixes start+end with '/'
-            mp = mount_points or {}
-            normalized = {}
-            for p, r in mp.items():
-                prefix = p
-                if not prefix.startswith('/'):
-                    prefix = '/' + prefix
-                if not prefix.endswith('/'):
-                    prefix = prefix + '/'
-                normalized[prefix] = os.path.abspath(r)
-            self.mount_points = normalized
-            if self.debug:
-                logger.debug("[HTTP] Mount points:")
-                for k, v in self.mount_points.items():
-                    logger.debug("  %s -> %s", k, v)
+        def __init__(self, *args, mount_points=None, cache_policies=None, mount_table=None, **kwargs):
+            if mount_table is None:
+                mount_table = MountTable(mount_points, cache_policies)
+            self.mount_table = mount_table
+            self.mount_points = mount_table.mount_points
+            self.cache_policies = mount_table.cache_policies
+            self._status = None
+            self._request_started = None
+            self._keep_after_error = False
             super().__init__(*args, **kwargs)
 
+        def setup(self):
+            super().setup()
+            if getattr(self.server, "keep_alive", False):
+                self.protocol_version = "HTTP/1.1"
+
+        def handle_one_request(self):
+            # While waiting for a request line, an idle keep-alive connection may only hold
+            # its worker for idle_timeout. The timeout is lifted again in parse_request so
+            # a slow reader of a long video is never cut off mid-response.
+            idle_timeout = getattr(self.server, "idle_timeout", None)
+            if idle_timeout:
+                self.connection.settimeout(idle_timeout)
+            self._status = None
+            self._request_started = None
+            try:
+                super().handle_one_request()
+            finally:
+                stats = getattr(self.server, "stats", None)
+                if stats is not None and self._request_started is not None:
+                    stats.request_finished(time.perf_counter() - self._request_started, self._status)
+
+        def parse_request(self):
+            if getattr(self.server, "idle_timeout", None):
+                self.connection.settimeout(self.timeout)
+            stats = getattr(self.server, "stats", None)
+            if stats is not None:
+                stats.request_started()
+            self._request_started = time.perf_counter()
+            return super().parse_request()
+
+        def send_response(self, code, message=None):
+            self._status = code
+            super().send_response(code, message)
+
+        def send_error(self, code, message=None, explain=None):
+            # The base class closes the connection after every error. A 404 or 416 for a
+            # GET/HEAD has no request body left to drain, so keep-alive survives it.
+            self._keep_after_error = (
+                code in (404, 416) and self.command in ("GET", "HEAD") and self.protocol_version == "HTTP/1.1"
+            )
+            try:
+                super().send_error(code, message, explain)
+            finally:
+                self._keep_after_error = False
+
+        def send_header(self, keyword, value):
+            if self._keep_after_error and keyword.lower() == "connection" and value.lower() == "close":
+                return
+            super().send_header(keyword, value)
+
         def log_debug(self, *args):
             if self.debug:
                 logger.debug("[HTTP] %s", " ".join(str(arg) for arg in args))
@@ -58,8 +284,8 @@ class CustomHTTPServer:
 
             self.log_debug("Requested:", raw, "-> normalized:", path)
 
-            # Iterate prefixes longest-first to avoid prefix shadowing
-            for prefix, root in sorted(self.mount_points.items(), key=lambda x: -len(x[0])):
+            # Prefixes are ordered longest-first to avoid prefix shadowing
+            for prefix, root in self.mount_table.mounts:
                 if path == prefix.rstrip('/') or path.startswith(prefix):
                     rel = path[len(prefix):].lstrip('/')
                     # Normalize the relative part using posix rules, then split to join with os.path
@@ -100,18 +326,146 @@ class CustomHTTPServer:
             return super().translate_path(path)
 
         def end_headers(self):
-            # cache busting
-            #self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-            #self.send_header('Pragma', 'no-cache')
-            #self.send_header('Expires', '0')
+            # Cache-Control goes out with file responses only (see _send_validators); errors
+            # and generated pages are left to the browser's defaults.
             # Always add CORS headers to every response
             self.send_header("Access-Control-Allow-Origin", "*")
             self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
             self.send_header("Access-Control-Allow-Headers", "X-Requested-With, Content-Type, Range")
             # Expose some headers so XHR/fetch can see content-length/range when needed
-            self.send_header("Access-Control-Expose-Headers", "Content-Length, Content-Range")
+            self.send_header("Access-Control-Expose-Headers", "Content-Length, Content-Range, ETag, Last-Modified")
             super().end_headers()
 
+        def _cache_policy(self):
+            request_path = unquote(urlsplit(self.path).path)
+            for prefix, policy in self.cache_policies:
+                if request_path.startswith(prefix):
+                    return policy
+            return FALLBACK_CACHE_POLICY
+
+        @staticmethod
+        def _etag(st):
+            # Strong: any change to a file's bytes through normal writes moves its size or
+            # mtime, and the server never transforms what it sends.
+            return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+        def _not_modified(self, etag, st):
+            """Whether the client's cached copy is current (RFC 9110 section 13.2.2 order)."""
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None:
+                if if_none_match.strip() == "*":
+                    return True
+                # If-None-Match uses the weak comparison.
+                tags = (tag.strip() for tag in if_none_match.split(","))
+                return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since:
+                try:
+                    since = email.utils.parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError, IndexError, OverflowError):
+                    return False
+                if since is None:
+                    return False
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=datetime.timezone.utc)
+                return int(st.st_mtime) <= since.timestamp()
+            return False
+
+        def _send_validators(self, etag, st):
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+            self.send_header("Cache-Control", self._cache_policy())
+
+        def _send_not_modified(self, etag, st):
+            self.send_response(304)
+            self._send_validators(etag, st)
+            self.end_headers()
+
+        def _derivative_spec(self, path):
+            """The resized/re-encoded copy this request asks for (see image_derivatives), if any."""
+            if getattr(self.server, "image_cache", None) is None or not is_derivable(path):
+                return None
+            return DerivativeSpec.from_query(urlsplit(self.path).query)
+
+        def _faststart(self, path, st, etag, range_header=None):
+            """The file to send for `path` and its ETag: an MP4's fast-start copy if cached.
+
+            The copy is a different byte layout of the same video, with its own ETag and
+            possibly its own length, so a player has to stay on whichever one it started
+            with. Chromium's follow-up range requests carry no If-Range, so only a fresh
+            load (no Range, or bytes=0-) gets to pick; later ranges from the same client
+            get what its last fresh load got, and the original when no load was seen.
+            A player that was already streaming the original when the copy appeared
+            keeps reading the original.
+            """
+            cache = getattr(self.server, "faststart_cache", None)
+            if cache is None or not path.lower().endswith(".mp4"):
+                return path, etag
+            copy = cache.lookup(path, st)
+            copy_etag = f'{etag[:-1]}-fs"'
+            key = (self.client_address[0], path)
+            if range_header is None or range_header.replace(" ", "").lower() == "bytes=0-":
+                use_copy = copy is not None
+                self.server.note_faststart_reader(key, use_copy)
+            elif self.headers.get("If-Range"):
+                use_copy = copy is not None and self.headers["If-Range"].strip() == copy_etag
+            else:
+                use_copy = copy is not None and self.server.reads_faststart_copy(key)
+            if not use_copy:
+                return path, etag
+            return str(copy), copy_etag
+
+        def send_head(self):
+            """Static files with validators; a 304 answers a current cache without opening the file.
+
+            Directories and missing files keep the base class behavior (index pages,
+            redirects, 404).
+            """
+            path = self.translate_path(self.path)
+            if path.endswith("/") or os.path.isdir(path):
+                return super().send_head()
+            try:
+                st = os.stat(path)
+            except OSError:
+                return super().send_head()
+
+            etag = self._etag(st)
+            served_path, ctype = path, self.guess_type(path)
+            spec = self._derivative_spec(path)
+            if spec is not None:
+                # Checked before rendering, so a cached derivative costs the stat only.
+                etag = f'{etag[:-1]}-{spec.tag}"'
+            else:
+                served_path, etag = self._faststart(path, st, etag)
+            if self._not_modified(etag, st):
+                self._send_not_modified(etag, st)
+                return None
+
+            if spec is not None:
+                derived = self.server.image_cache.get(path, st, spec)
+                if derived is None:
+                    spec, etag = None, self._etag(st)
+                else:
+                    served_path, ctype = derived, spec.content_type
+            try:
+                f = open(served_path, 'rb')
+                length = os.fstat(f.fileno()).st_size
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+            try:
+                self.send_response(200)
+                self.send_header("Content-type", ctype)
+                self.send_header("Content-Length", str(length))
+                if spec is None:
+                    self.send_header("Accept-Ranges", "bytes")
+                self._send_validators(etag, st)
+                self.end_headers()
+                return f
+            except Exception:
+                f.close()
+                raise
+
         @classmethod
         def _is_allowed_pinball_primer_url(cls, url):
             if not isinstance(url, str):
@@ -189,11 +543,13 @@ class CustomHTTPServer:
 </html>
 """
 
-        def _send_pinball_primer_html(self, status_code, html_text):
+        def _send_pinball_primer_html(self, status_code, html_text, cache_status=None):
             body = html_text.encode("utf-8")
             self.send_response(status_code)
             self.send_header("Content-Type", "text/html; charset=utf-8")
             self.send_header("Content-Length", str(len(body)))
+            if cache_status:
+                self.send_header("X-Cache", cache_status)
             self.end_headers()
             try:
                 self.wfile.write(body)
@@ -221,13 +577,11 @@ class CustomHTTPServer:
                 )
                 return
 
+            page_cache = getattr(self.server, "page_cache", None)
+            if page_cache is None:
+                page_cache = WebPageCache(WEB_PAGE_CACHE_DIR)
             try:
-                response = requests.get(
-                    requested_url,
-                    timeout=15,
-                    headers={"User-Agent": "VPinFE PinballPrimer Proxy"},
-                )
-                response.raise_for_status()
+                page_text, cache_status = page_cache.get(requested_url)
             except requests.RequestException as exc:
                 logger.warning("Pinball Primer proxy fetch failed for %s: %s", requested_url, exc)
                 self._send_pinball_primer_html(
@@ -239,8 +593,8 @@ class CustomHTTPServer:
                 )
                 return
 
-            html_text = self._inject_base_tag(response.text, requested_url)
-            self._send_pinball_primer_html(200, html_text)
+            html_text = self._inject_base_tag(page_text, requested_url)
+            self._send_pinball_primer_html(200, html_text, cache_status)
 
         def _serve_app_bootstrap(self, window_name):
             window_labels = {
@@ -311,67 +665,173 @@ class CustomHTTPServer:
                 return
 
             range_header = self.headers.get('Range')
-            if not range_header:
-                # No Range header — use default behavior
+            path = self.translate_path(self.path) if range_header else None
+            if range_header and self._derivative_spec(path) is None:
+                if not os.path.isfile(path):
+                    self.send_error(404, "File not found")
+                    return
                 try:
-                    super().do_GET()
+                    if self._send_ranges(path, range_header):
+                        return
                 except (ConnectionResetError, BrokenPipeError):
-                    # Client closed connection while we were writing the response.
-                    return
-                return
-
-            # Resolve the file path
-            path = self.translate_path(self.path)
-            if not os.path.isfile(path):
-                self.send_error(404, "File not found")
-                return
+                    return  # Client closed connection, that's fine
 
-            file_size = os.path.getsize(path)
-
-            # Parse "bytes=START-END" or "bytes=START-"
+            # No usable Range header (or If-Range says the client's copy is stale): the
+            # whole file, through send_head and copyfile below.
             try:
-                range_spec = range_header.replace('bytes=', '')
-                parts = range_spec.split('-', 1)
-                start = int(parts[0]) if parts[0] else 0
-                end = int(parts[1]) if parts[1] else file_size - 1
-            except (ValueError, IndexError):
-                self.send_error(416, "Requested Range Not Satisfiable")
+                super().do_GET()
+            except (ConnectionResetError, BrokenPipeError):
+                # Client closed connection while we were writing the response.
                 return
 
-            if start >= file_size or start > end:
-                self.send_error(416, "Requested Range Not Satisfiable")
+        def copyfile(self, source, outputfile):
+            if outputfile is self.wfile:
+                self._send_file(source, 0, None)
+            else:
+                super().copyfile(source, outputfile)
+
+        def _send_file(self, f, offset, count):
+            """Write `count` bytes of `f` from `offset` (None = to the end) to the client.
+
+            socket.sendfile hands the copy to the kernel (os.sendfile) where there is
+            one, so video bytes never pass through Python or hold the GIL; on platforms
+            without it, it falls back to its own read/send loop.
+            """
+            self.wfile.flush()
+            sendfile = getattr(self.connection, "sendfile", None)
+            if sendfile is not None:
+                sendfile(f, offset, count)
                 return
+            f.seek(offset)
+            remaining = count
+            while remaining is None or remaining > 0:
+                chunk = f.read(65536 if remaining is None else min(65536, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+
+        @staticmethod
+        def _parse_ranges(range_header, file_size):
+            """Byte ranges from a Range header as inclusive (start, end) pairs.
+
+            None means the header should be ignored and the full file sent: it is not a
+            bytes range, is malformed, or asks for more pieces than MAX_RANGES. An empty
+            list means it was valid but nothing in it overlaps the file (416).
+            """
+            unit, _, spec = range_header.partition("=")
+            if unit.strip().lower() != "bytes" or not spec.strip():
+                return None
+            specs = [part.strip() for part in spec.split(",") if part.strip()]
+            if not specs or len(specs) > CustomHTTPServer.MAX_RANGES:
+                return None
+            ranges = []
+            for part in specs:
+                first, dash, last = part.partition("-")
+                if not dash:
+                    return None
+                try:
+                    if first:
+                        start = int(first)
+                        end = int(last) if last else max(start, file_size - 1)
+                        if start > end:
+                            return None
+                    else:
+                        # "-N": the last N bytes.
+                        suffix = int(last)
+                        start, end = max(0, file_size - suffix), file_size - 1
+                        if suffix == 0:
+                            continue
+                except ValueError:
+                    return None
+                if start < 0 or start >= file_size:
+                    continue
+                ranges.append((start, min(end, file_size - 1)))
+            return ranges
+
+        def _if_range_matches(self, etag, st):
+            """If-Range: the range applies only to the representation the client already has."""
+            if_range = self.headers.get("If-Range")
+            if if_range is None:
+                return True
+            if_range = if_range.strip()
+            if if_range.startswith('"') or if_range.startswith("W/"):
+                # Strong comparison, so a weak tag never matches.
+                return if_range == etag
+            try:
+                since = email.utils.parsedate_to_datetime(if_range)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since is None:
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=datetime.timezone.utc)
+            return int(st.st_mtime) == int(since.timestamp())
+
+        def _send_ranges(self, path, range_header):
+            """Answer a Range request. Returns False to have the caller send the whole file."""
+            st = os.stat(path)
+            served_path, etag = self._faststart(path, st, self._etag(st), range_header)
+            if self._not_modified(etag, st):
+                self._send_not_modified(etag, st)
+                return True
+            if not self._if_range_matches(etag, st):
+                return False
 
-            # Clamp end to file boundary
-            end = min(end, file_size - 1)
-            content_length = end - start + 1
             ctype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
-
-            self.send_response(206)
-            self.send_header("Content-Type", ctype)
-            self.send_header("Content-Length", str(content_length))
-            self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
-            self.send_header("Accept-Ranges", "bytes")
-            self.end_headers()
-
-            try:
-                with open(path, 'rb') as f:
-                    f.seek(start)
-                    remaining = content_length
-                    while remaining > 0:
-                        chunk = f.read(min(65536, remaining))
-                        if not chunk:
-                            break
-                        self.wfile.write(chunk)
-                        remaining -= len(chunk)
-            except (ConnectionResetError, BrokenPipeError):
-                pass  # Client closed connection, that's fine
+            with open(served_path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                ranges = self._parse_ranges(range_header, file_size)
+                if ranges is None:
+                    return False
+                if not ranges:
+                    self.send_response(416, "Requested Range Not Satisfiable")
+                    self.send_header("Content-Range", f"bytes */{file_size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return True
+
+                if len(ranges) == 1:
+                    start, end = ranges[0]
+                    self.send_response(206)
+                    self.send_header("Content-Type", ctype)
+                    self.send_header("Content-Length", str(end - start + 1))
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
+                    self.send_header("Accept-Ranges", "bytes")
+                    self._send_validators(etag, st)
+                    self.end_headers()
+                    self._send_file(f, start, end - start + 1)
+                    return True
+
+                boundary = f"vpinfe-{os.urandom(8).hex()}"
+                part_heads = [
+                    (
+                        f"\r\n--{boundary}\r\nContent-Type: {ctype}\r\n"
+                        f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+                    ).encode("latin-1")
+                    for start, end in ranges
+                ]
+                tail = f"\r\n--{boundary}--\r\n".encode("latin-1")
+                length = sum(map(len, part_heads)) + len(tail) + sum(end - start + 1 for start, end in ranges)
+                self.send_response(206)
+                self.send_header("Content-Type", f"multipart/byteranges; boundary={boundary}")
+                self.send_header("Content-Length", str(length))
+                self.send_header("Accept-Ranges", "bytes")
+                self._send_validators(etag, st)
+                self.end_headers()
+                for head, (start, end) in zip(part_heads, ranges):
+                    self.wfile.write(head)
+                    self._send_file(f, start, end - start + 1)
+                self.wfile.write(tail)
+            return True
 
         def do_OPTIONS(self):
             self.send_response(200, "OK")
             self.send_header("Access-Control-Allow-Origin", "*")
             self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
             self.send_header("Access-Control-Allow-Headers", "X-Requested-With, Content-Type, Range")
+            self.send_header("Content-Length", "0")
             self.end_headers()
 
         # Keep default logging behavior or override to quiet it:
@@ -380,22 +840,65 @@ class CustomHTTPServer:
             if self.debug:
                 logger.debug("[HTTP] " + fmt % args)
 
-    def __init__(self, mount_points):
+    # More ranges than this in one request is not a player seeking; send the file instead.
+    MAX_RANGES = 16
+
+    # Enough for every keep-alive connection Chromium opens across the three windows plus
+    # the long-running video streams, with room to spare; more connections wait in line.
+    DEFAULT_WORKERS = 32
+    # How long an idle keep-alive connection may hold a worker before it is closed.
+    IDLE_TIMEOUT = 15.0
+
+    def __init__(self, mount_points, cache_policies=None, workers=DEFAULT_WORKERS, keep_alive=True, image_cache=None, faststart_cache=None, page_cache=None):
         self.file_server = None
+        # Where ?w=&h=&fmt= image derivatives are kept; see common.image_derivatives.
+        self.image_cache = image_cache if image_cache is not None else ImageDerivativeCache(IMAGE_DERIVATIVE_CACHE_DIR)
+        # Videos with moov moved to the front; see common.mp4_faststart.
+        self.faststart_cache = faststart_cache if faststart_cache is not None else FaststartCache(FASTSTART_CACHE_DIR)
+        # Proxied Pinball Primer pages; see common.web_page_cache.
+        self.page_cache = page_cache if page_cache is not None else WebPageCache(WEB_PAGE_CACHE_DIR)
         self.mount_points = mount_points
+        self.cache_policies = cache_policies
+        self.workers = workers
+        self.keep_alive = keep_alive
+        self.mount_table = None
+        self.stats = ServerStats()
 
     def start_file_server(self, port=8000):
-        handler_class = partial(self.MultiDirHTTPRequestHandler, mount_points=self.mount_points)
-        ThreadingTCPServer.allow_reuse_address = True
-        self.file_server = ThreadingTCPServer(("", port), handler_class)
+        self.mount_table = MountTable(self.mount_points, self.cache_policies)
+        if self.MultiDirHTTPRequestHandler.debug:
+            logger.debug("[HTTP] Mount points:")
+            for prefix, root in self.mount_table.mounts:
+                logger.debug("  %s -> %s", prefix, root)
+        handler_class = partial(self.MultiDirHTTPRequestHandler, mount_table=self.mount_table)
+        self.stats = ServerStats()
+        self.file_server = _WorkerPoolHTTPServer(
+            ("", port),
+            handler_class,
+            workers=self.workers,
+            keep_alive=self.keep_alive,
+            idle_timeout=self.IDLE_TIMEOUT if self.keep_alive else None,
+            stats=self.stats,
+            image_cache=self.image_cache,
+            faststart_cache=self.faststart_cache,
+            page_cache=self.page_cache,
+        )
         threading.Thread(target=self.file_server.serve_forever, daemon=True).start()
         logger.info("Serving on http://127.0.0.1:%s/", port)
 
+    def get_stats(self):
+        """Request totals, requests/second and latency percentiles (ms) over the last minute."""
+        return self.stats.snapshot()
+
     def stop_file_server(self):
         if self.file_server:
             self.file_server.shutdown()
             self.file_server.server_close()
-            logger.info("File server stopped.")
+            stats = self.stats.snapshot()
+            logger.info(
+                "File server stopped after %s requests (%s not modified, %s errors).",
+                stats["requests"], stats["not_modified"], stats["errors"],
+            )
             self.file_server = None
 
     def on_closed(self):
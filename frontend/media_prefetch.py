@@ -0,0 +1,218 @@
+"""Warm the media of the tables either side of the wheel before the user gets there.
+
+Themes ask for a table's images and videos once the selection lands on it, so on a
+spinning disk or a NAS every stop starts with a cold read. `prefetch_media` is called with
+the wheel position; the neighbours' media files are pulled into the OS page cache on a
+background thread, so the asset server's reads (and its sendfile) hit memory.
+
+Where the OS offers it, warming is `posix_fadvise(WILLNEED)`, which queues readahead in
+the kernel without copying anything into Python; elsewhere the bytes are read and
+dropped. Images are warmed whole. For videos only the start is warmed, since that is what
+the first frame needs, plus the moov atom when it sits at the end of the file. When the
+asset server has a fast-start copy of a video, that copy is what gets warmed.
+
+The three windows share one prefetcher. A newer request replaces an older one that has
+not finished, because once the wheel has moved on the old neighbours no longer matter.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common.media_paths import MEDIA_SPECS
+from common.mp4_faststart import FaststartCache
+from common.paths import FASTSTART_CACHE_DIR
+
+
+logger = logging.getLogger("vpinfe.frontend.media_prefetch")
+
+MAX_RADIUS = 10
+DEFAULT_RADIUS = 2
+# Enough of a video for the player to get going; the rest streams while it plays.
+VIDEO_HEAD_BYTES = 4 * 1024 * 1024
+# Images larger than this are warmed up to this size.
+MAX_FILE_BYTES = 32 * 1024 * 1024
+# How many warmed files are remembered, so a neighbour that is still warm is not
+# re-read each time the wheel moves by one.
+WARM_ENTRIES = 512
+# After this long the page cache may well have dropped a file again, so it is re-warmed.
+WARM_SECONDS = 300.0
+READ_CHUNK = 1024 * 1024
+
+_MEDIA_ATTRS = tuple(spec.attr for spec in MEDIA_SPECS)
+
+
+def neighbour_indices(index: int, radius: int, count: int) -> list[int]:
+    """Positions around `index` on a wheel of `count` tables, nearest first, not `index`."""
+    if count <= 1:
+        return []
+    radius = max(0, min(int(radius), MAX_RADIUS, count // 2))
+    seen = {index}
+    indices = []
+    for step in range(1, radius + 1):
+        for candidate in ((index + step) % count, (index - step) % count):
+            if candidate not in seen:
+                seen.add(candidate)
+                indices.append(candidate)
+    return indices
+
+
+def _warm_range(fd: int, offset: int, length: int) -> None:
+    if length <= 0:
+        return
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is not None:
+        fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+        return
+    os.lseek(fd, offset, os.SEEK_SET)
+    remaining = length
+    while remaining > 0:
+        chunk = os.read(fd, min(READ_CHUNK, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+
+
+class MediaPrefetcher:
+    def __init__(self, faststart_cache: FaststartCache | None = None) -> None:
+        self._faststart = faststart_cache
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._pending: list[str] = []
+        self._generation = 0
+        self._thread: threading.Thread | None = None
+        self._warm: OrderedDict[tuple, float] = OrderedDict()
+        self._stats = {
+            "requests": 0,
+            "hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "bytes_warmed": 0,
+            "superseded": 0,
+        }
+
+    @property
+    def faststart_cache(self) -> FaststartCache:
+        if self._faststart is None:
+            # No asset server running (tests, tools): only asked whether a copy exists.
+            self._faststart = FaststartCache(FASTSTART_CACHE_DIR, remux_in_background=False)
+        return self._faststart
+
+    def prefetch_tables(self, tables, index: int, radius: int = DEFAULT_RADIUS) -> dict:
+        """Queue the media of the tables around `index` in `tables`; returns at once."""
+        indices = neighbour_indices(int(index), radius, len(tables))
+        paths = []
+        for position in indices:
+            table = tables[position]
+            for attr in _MEDIA_ATTRS:
+                path = getattr(table, attr, None)
+                if path:
+                    paths.append(path)
+        self.queue(paths)
+        return {"tables": len(indices), "files": len(paths)}
+
+    def queue(self, paths: list[str]) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            if self._pending:
+                self._stats["superseded"] += 1
+            self._pending = list(paths)
+            self._generation += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker_loop, name="media-prefetch", daemon=True)
+                self._thread.start()
+        self._event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        looked_up = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / looked_up, 3) if looked_up else 0.0
+        return stats
+
+    def _worker_loop(self) -> None:
+        while True:
+            self._event.wait()
+            self._event.clear()
+            with self._lock:
+                generation = self._generation
+            while True:
+                with self._lock:
+                    if generation != self._generation or not self._pending:
+                        break
+                    path = self._pending.pop(0)
+                self._warm_file(path)
+
+    def _warm_file(self, path: str) -> None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return  # media paths come from the last scan; a removed file is not an error
+        key = (path, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            warmed_at = self._warm.get(key)
+            if warmed_at is not None and time.monotonic() - warmed_at < WARM_SECONDS:
+                self._stats["hits"] += 1
+                return
+            self._stats["misses"] += 1
+
+        try:
+            warmed = self._warm_media(path, st)
+        except OSError as exc:
+            logger.debug("Could not prefetch %s: %s", path, exc)
+            with self._lock:
+                self._stats["errors"] += 1
+            return
+        with self._lock:
+            self._stats["bytes_warmed"] += warmed
+            self._warm[key] = time.monotonic()
+            self._warm.move_to_end(key)
+            while len(self._warm) > WARM_ENTRIES:
+                self._warm.popitem(last=False)
+
+    def _warm_media(self, path: str, st: os.stat_result) -> int:
+        ranges = [(0, min(st.st_size, MAX_FILE_BYTES))]
+        served = path
+        if path.lower().endswith(".mp4"):
+            copy = self.faststart_cache.cached_copy(path, st)
+            if copy is not None:
+                served = str(copy)
+                ranges = [(0, min(copy.stat().st_size, VIDEO_HEAD_BYTES))]
+            else:
+                ranges = [(0, min(st.st_size, VIDEO_HEAD_BYTES))]
+                info = self.faststart_cache.analysis(path, st)
+                if info.needs_remux:
+                    ranges.append((info.moov.offset, info.moov.size))
+
+        fd = os.open(served, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            for offset, length in ranges:
+                _warm_range(fd, offset, length)
+        finally:
+            os.close(fd)
+        return sum(length for _offset, length in ranges)
+
+
+_prefetcher: MediaPrefetcher | None = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_media_prefetcher(faststart_cache: FaststartCache | None = None) -> MediaPrefetcher:
+    """The prefetcher the bg, dmd and table windows' APIs share.
+
+    The asset server hands over its fast-start cache when it starts, so the prefetcher
+    warms the copies the server will send, as that cache knows them, rather than keeping
+    a second index of the same directory.
+    """
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = MediaPrefetcher(faststart_cache)
+        elif faststart_cache is not None:
+            _prefetcher._faststart = faststart_cache
+        return _prefetcher
@@ -36,8 +36,9 @@ def start_build(api, *, build_metadata_func, ensure_tables_loaded_func, download
                 log_cb=log_callback,
             )
             event_queue.put({"type": "buildmeta_complete", "result": result})
-            api.allTables = ensure_tables_loaded_func(reload=True)
-            api.filteredTables = api.allTables
+            # Windows get what the build changed as table change events, and keep their
+            # filters, sort and place in the list.
+            api.table_store.publish_changes(ensure_tables_loaded_func(reload=True))
         except Exception as exc:
             event_queue.put({"type": "buildmeta_error", "error": str(exc)})
             logger.exception("buildMetaData failed")
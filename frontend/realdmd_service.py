@@ -5,14 +5,14 @@ import threading
 from pathlib import Path
 
 from common.config_access import MediaConfig
-from common.table_metadata import normalize_meta
+from common.table_metadata import table_meta
 
 
 logger = logging.getLogger("vpinfe.frontend.realdmd_service")
 
 
 def get_frontend_dof_event_for_table(table) -> str:
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
+    meta = table_meta(table)
     user = meta.get("User", {}) if isinstance(meta, dict) else {}
     if not isinstance(user, dict):
         return ""
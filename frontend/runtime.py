@@ -9,10 +9,13 @@ from pathlib import Path
 from frontend.api import API
 from frontend.chromium_manager import ChromiumManager
 from frontend.customhttpserver import CustomHTTPServer
+from frontend.media_prefetch import get_media_prefetcher
+from frontend.table_store import get_table_store
 from frontend.ws_bridge import WebSocketBridge
 from common import system_actions
-from common.config_access import DisplayConfig, NetworkConfig, SettingsConfig
+from common.config_access import DisplayConfig, LoggerConfig, NetworkConfig, SettingsConfig
 from common.display_service import get_display_monitors
+from common.table_repository import add_refresh_listener, start_table_watcher, stop_table_watcher
 from common.vpinplay_runtime import clear_alternate_profile
 
 
@@ -27,6 +30,12 @@ def create_api_instances(iniconfig, logger):
     network = NetworkConfig.from_config(iniconfig)
     displays = DisplayConfig.from_config(iniconfig)
     ws_bridge = WebSocketBridge(port=network.ws_port)
+    ws_bridge.metrics.slow_call_ms = LoggerConfig.from_config(iniconfig).slow_api_call_ms
+    # Edits made anywhere (a rating, a metadata build, the Manager UI, the table watcher)
+    # reach the windows as table change events rather than full reloads.
+    table_store = get_table_store()
+    table_store.subscribe(ws_bridge.send_event_all)
+    add_refresh_listener(table_store.publish_changes)
     frontend_browser = ChromiumManager()
 
     for window_name, config_key in WINDOW_CONFIGS:
@@ -85,6 +94,16 @@ def start_startup_media_sync(iniconfig, logger, build_metadata_func, started: bo
     return True
 
 
+def start_table_watcher_if_enabled(iniconfig, logger) -> bool:
+    if not SettingsConfig.from_config(iniconfig).watch_tables:
+        return False
+    try:
+        return start_table_watcher() is not None
+    except Exception:
+        logger.exception("Failed to start table watcher")
+        return False
+
+
 def build_mount_points(base_path: str, config_dir: Path, iniconfig):
     themes_dir = str(config_dir / "themes")
     collection_icons_dir = str(config_dir / "collection_icons")
@@ -101,10 +120,18 @@ def build_mount_points(base_path: str, config_dir: Path, iniconfig):
     return mount_points, themes_dir
 
 
+def installed_theme(themes_dir: str, iniconfig) -> str | None:
+    """The configured theme's folder when it is already on disk, so the windows need not
+    wait for the theme registry to install it; None when it is not."""
+    theme = SettingsConfig.from_config(iniconfig).theme
+    return theme if os.path.isdir(os.path.join(themes_dir, theme)) else None
+
+
 def start_asset_server(mount_points, iniconfig):
     http_server = CustomHTTPServer(mount_points)
     theme_assets_port = NetworkConfig.from_config(iniconfig).theme_assets_port
     http_server.start_file_server(port=theme_assets_port)
+    get_media_prefetcher(http_server.faststart_cache)
     return http_server
 
 
@@ -173,6 +200,7 @@ def shutdown_services(logger, *, vpinplay_sync, iniconfig, ws_bridge, stop_dof,
         ("vpinplay_sync_on_shutdown", lambda: vpinplay_sync(iniconfig)),
         ("clear_alternate_vpinplay_profile", clear_alternate_profile),
         ("ws_bridge.stop", ws_bridge.stop),
+        ("stop_table_watcher", stop_table_watcher),
         ("stop_dof_service", stop_dof),
         ("stop_libdmdutil_service", lambda: stop_dmd(clear=False)),
         ("http_server.on_closed", http_server.on_closed),
@@ -2,20 +2,22 @@ from __future__ import annotations
 
 import json
 import logging
+from bisect import bisect_right
 
-from common.collections_service import filter_tables_by_collection, get_collection_names, save_filter_collection
+from common.collections_service import get_collection_names, save_filter_collection
 from common.media_paths import table_media_payload
+from common.table import Table, meta_generation
 from common.tablelistfilters import TableListFilters
 from common.table_metadata import (
     DETECTION_KEYS,
+    full_table_meta,
     get_or_create_user_meta,
     load_table_meta,
-    normalize_meta,
     normalize_rating,
     persist_table_meta,
     reorder_leading_article,
     section,
-    table_title,
+    table_keys,
 )
 
 
@@ -55,52 +57,132 @@ def _to_bool(value):
     return value == 1
 
 
+def _table_row(table):
+    meta = full_table_meta(table)
+
+    vpinfe = section(meta, "VPinFE")
+    info = section(meta, "Info")
+    used_alttitle = False
+    alt_title = str(vpinfe.get("alttitle", "") or "").strip()
+    if alt_title:
+        info["Title"] = alt_title
+        meta["Info"] = info
+        used_alttitle = True
+
+    # Reorder a leading "The " on the canonical Info.Title so the theme
+    # displays and sorts by the second word, e.g. "The Addams Family" ->
+    # "Addams Family, The". A user-set alttitle is left exactly as entered.
+    # Idempotent, so the in-place mutation of the shared meta dict is safe.
+    if not used_alttitle and info.get("Title"):
+        info["Title"] = reorder_leading_article(info["Title"])
+        meta["Info"] = info
+
+    vpx = section(meta, "VPXFile")
+    for key in DETECTION_KEYS:
+        vpx[key] = _to_bool(vpx.get(key, False))
+    vpx["altSoundExists"] = bool(table.altSoundExists)
+    vpx["altColorExists"] = bool(table.altColorExists)
+    vpx["pupPackExists"] = bool(table.pupPackExists)
+
+    row = {
+        "tableDirName": table.tableDirName,
+        "fullPathTable": table.fullPathTable,
+        "fullPathVPXfile": table.fullPathVPXfile,
+        "pupPackExists": table.pupPackExists,
+        "altColorExists": table.altColorExists,
+        "altSoundExists": table.altSoundExists,
+        "meta": meta,
+    }
+    row.update(table_media_payload(table))
+    return row
+
+
+def table_json_fragment(table) -> str:
+    """One table's row as the frontend receives it, already serialized.
+
+    Cached on Table objects until their metadata changes, so the three windows and every
+    filter change reuse the same strings instead of rebuilding and dumping each row.
+    """
+    if not isinstance(table, Table):
+        return json.dumps(_table_row(table))
+    fragment = table.json_fragment
+    if fragment is None:
+        fragment = json.dumps(_table_row(table))
+        table.json_fragment = fragment
+    return fragment
+
+
 def tables_json(tables) -> str:
-    result = []
-    for table in tables:
-        meta = normalize_meta(table.metaConfig)
-
-        vpinfe = section(meta, "VPinFE")
-        info = section(meta, "Info")
-        used_alttitle = False
-        alt_title = str(vpinfe.get("alttitle", "") or "").strip()
-        if alt_title:
-            info["Title"] = alt_title
-            meta["Info"] = info
-            used_alttitle = True
-
-        # Reorder a leading "The " on the canonical Info.Title so the theme
-        # displays and sorts by the second word, e.g. "The Addams Family" ->
-        # "Addams Family, The". A user-set alttitle is left exactly as entered.
-        # Idempotent, so the in-place mutation of the shared meta dict is safe.
-        if not used_alttitle and info.get("Title"):
-            info["Title"] = reorder_leading_article(info["Title"])
-            meta["Info"] = info
-
-        vpx = section(meta, "VPXFile")
-        for key in DETECTION_KEYS:
-            vpx[key] = _to_bool(vpx.get(key, False))
-        vpx["altSoundExists"] = bool(table.altSoundExists)
-        vpx["altColorExists"] = bool(table.altColorExists)
-        vpx["pupPackExists"] = bool(table.pupPackExists)
-
-        row = {
-            "tableDirName": table.tableDirName,
-            "fullPathTable": table.fullPathTable,
-            "fullPathVPXfile": table.fullPathVPXfile,
-            "pupPackExists": table.pupPackExists,
-            "altColorExists": table.altColorExists,
-            "altSoundExists": table.altSoundExists,
-            "meta": meta,
-        }
-        row.update(table_media_payload(table))
-        result.append(row)
-    return json.dumps(result)
+    # Same text json.dumps gives for the list of rows.
+    return "[" + ", ".join(table_json_fragment(table) for table in tables) + "]"
+
+
+class TableView(tuple):
+    """A view the table store handed out, with the stamp it was given when it was made.
+
+    Views never change once made, so the stamp names the tables and their order for as
+    long as the view lives, without looking at them again.
+    """
+
+    def __new__(cls, tables, stamp: str):
+        view = super().__new__(cls, tables)
+        view.stamp = stamp
+        return view
+
+
+def view_stamp(tables) -> str:
+    """Identifies which tables a view holds and in what order, for delta clients.
+
+    Store views carry one. Anything else is stamped by its folders, in order. A string
+    because JavaScript would round a 64-bit number on the way back.
+    """
+    stamp = getattr(tables, "stamp", None)
+    if stamp is not None:
+        return stamp
+    paths = tuple(getattr(table, "fullPathTable", None) for table in tables)
+    return format(hash(paths) & 0xFFFFFFFFFFFFFFFF, "x")
+
+
+def tables_window_json(tables, offset=0, limit=None) -> str:
+    """A slice of the view, plus what a client needs to ask for the rest or for changes."""
+    # Read first: a table edited while the rows are gathered then shows up as changed.
+    version = meta_generation()
+    total = len(tables)
+    offset = min(max(0, int(offset or 0)), total)
+    end = total if limit is None else min(total, offset + max(0, int(limit)))
+    return (
+        f'{{"total": {total}, "offset": {offset}, "version": {version}, '
+        f'"view": "{view_stamp(tables)}", "tables": {tables_json(tables[offset:end])}}}'
+    )
+
+
+def tables_since_json(tables, version, view=None) -> str:
+    """The rows whose metadata changed after `version`, by position in the view.
+
+    When `view` no longer matches (a filter, sort or reload reordered the list) the
+    positions mean nothing to the client, so every row is sent with "full": true.
+    """
+    current_version = meta_generation()
+    try:
+        version = int(version)
+    except (TypeError, ValueError):
+        version = -1
+    current_view = view_stamp(tables)
+    full = version < 0 or view is None or str(view) != current_view
+    changed = [
+        f'{{"index": {index}, "table": {table_json_fragment(table)}}}'
+        for index, table in enumerate(tables)
+        if full or getattr(table, "meta_version", None) is None or table.meta_version > version
+    ]
+    return (
+        f'{{"version": {current_version}, "view": "{current_view}", "total": {len(tables)}, '
+        f'"full": {"true" if full else "false"}, "changed": [{", ".join(changed)}]}}'
+    )
 
 
 def apply_collection(api, collection):
     api.current_collection = collection
-    filtered, filters = filter_tables_by_collection(api.allTables, collection)
+    filtered, filters = api.table_store.collection_view(collection)
     api.filteredTables = filtered
     if filters is None:
         api.current_filters = default_filter_state()
@@ -125,8 +207,8 @@ def save_current_filter_collection(api, name, letter, theme, table_type, manufac
     return {"success": True, "message": f"Filter collection '{name}' saved successfully"}
 
 
-def filter_options(tables):
-    filters = TableListFilters(tables)
+def filter_options(tables, index=None):
+    filters = TableListFilters(tables, index=index)
     return {
         "letters": filters.get_available_letters(),
         "themes": filters.get_available_themes(),
@@ -152,25 +234,16 @@ def apply_filters(api, letter=None, theme=None, table_type=None, manufacturer=No
     if rating_or_higher is not None:
         api.current_filters["rating_or_higher"] = str(rating_or_higher).strip().lower() in ("1", "true", "yes", "on")
 
-    api.filteredTables = TableListFilters(api.allTables).apply_filters(
-        letter=api.current_filters["letter"],
-        theme=api.current_filters["theme"],
-        table_type=api.current_filters["type"],
-        manufacturer=api.current_filters["manufacturer"],
-        year=api.current_filters["year"],
-        rating=api.current_filters["rating"],
-        rating_or_higher=api.current_filters["rating_or_higher"],
-    )
+    api.filteredTables = api.table_store.filtered_view(api.current_filters)
     return len(api.filteredTables)
 
 
 def apply_sort(tables, sort_type, order_by=None):
     reverse = normalize_sort_order(order_by, sort_type) == "Descending"
     if sort_type == "Alpha":
-        tables.sort(key=lambda table: table_title(table).lower(), reverse=reverse)
+        tables.sort(key=lambda table: table_keys(table).sort_key, reverse=reverse)
     elif sort_type == "Newest":
-        tables.sort(key=lambda table: table_title(table).lower())
-        tables.sort(key=lambda table: table.creation_time if table.creation_time is not None else 0, reverse=reverse)
+        _sort_by_number(tables, lambda table: table.creation_time if table.creation_time is not None else 0, reverse)
     elif sort_type == "LastRun":
         _sort_by_numeric_meta(tables, "LastRun", reverse)
     elif sort_type == "Highest StartCount":
@@ -184,13 +257,31 @@ def _paging_group_key(table):
     # Letter groups for alpha paging. Titles starting with a digit or symbol all
     # land in one '#' bucket so a big collection doesn't take several presses to
     # cross the numeric titles.
-    title = table_title(table).strip()
-    if title and title[0].isalpha():
-        return title[0].upper()
-    return "#"
+    return table_keys(table).group
 
 
-def page_jump_index(tables, index, direction, sort_type="Alpha", paging_type="alpha", page_size=10):
+def paging_group_starts(tables) -> tuple[int, ...]:
+    """Where each letter group of a title-ordered view starts, for alpha paging.
+
+    Paging is circular, so when the last run of titles has the same letter as the
+    first (only possible in a list that is not strictly title-ordered) the two count
+    as one group, starting at the last run. Empty when the view is one group or less.
+    """
+    starts = []
+    previous = None
+    for position, table in enumerate(tables):
+        key = _paging_group_key(table)
+        if key != previous:
+            starts.append(position)
+            previous = key
+    if len(starts) < 2:
+        return ()
+    if _paging_group_key(tables[0]) == _paging_group_key(tables[-1]):
+        del starts[0]
+    return tuple(starts)
+
+
+def page_jump_index(tables, index, direction, sort_type="Alpha", paging_type="alpha", page_size=10, group_starts=None):
     """Return the target wheel index for a joypageup/joypagedown press.
 
     Alpha paging jumps to the first table of the adjacent letter group in the
@@ -198,6 +289,10 @@ def page_jump_index(tables, index, direction, sort_type="Alpha", paging_type="al
     sort); otherwise, or when the whole list is one letter group, it falls back
     to numeric paging. Numeric paging steps by pagingsize, capped at half the
     list so a press never wraps past the starting point. All paging is circular.
+
+    `group_starts` is `paging_group_starts(tables)` when the caller keeps it with the
+    view (the table store does), so a held page key costs a binary search per repeat
+    rather than a pass over every title.
     """
     count = len(tables)
     if count <= 1:
@@ -206,36 +301,31 @@ def page_jump_index(tables, index, direction, sort_type="Alpha", paging_type="al
     forward = direction != "prev"
 
     if paging_type == "alpha" and sort_type == "Alpha":
-        keys = [_paging_group_key(table) for table in tables]
-        if len(set(keys)) > 1:
-            step = 1 if forward else -1
-            pos = (index + step) % count
-            while keys[pos] == keys[index]:
-                pos = (pos + step) % count
-            if not forward:
-                # Walked back onto the previous group's last entry; rewind to its first.
-                while keys[(pos - 1) % count] == keys[pos] and (pos - 1) % count != index:
-                    pos = (pos - 1) % count
-            return pos
+        starts = paging_group_starts(tables) if group_starts is None else group_starts
+        if starts:
+            # The group holding `index`; -1 when it is the one wrapping round past the end.
+            group = bisect_right(starts, index) - 1
+            if forward:
+                return starts[(group + 1) % len(starts)]
+            return starts[(group - 1) % len(starts)]
 
     step = min(page_size, max(1, count // 2))
     return (index + step) % count if forward else (index - step) % count
 
 
 def _sort_by_numeric_meta(tables, field, reverse):
-    tables.sort(key=lambda table: table_title(table).lower())
-    tables.sort(key=lambda table: _numeric_meta_value(table, field), reverse=reverse)
+    _sort_by_number(tables, lambda table: _numeric_meta_value(table, field), reverse)
+
+
+def _sort_by_number(tables, value, reverse):
+    # One pass on (number, title) rather than a title sort followed by a stable number
+    # sort. Ties stay in ascending title order either way, so only the number is negated.
+    sign = -1 if reverse else 1
+    tables.sort(key=lambda table: (sign * value(table), table_keys(table).sort_key))
 
 
 def _numeric_meta_value(table, field):
-    meta = normalize_meta(getattr(table, "metaConfig", {}))
-    user = section(meta, "User")
-    info = section(meta, "Info")
-    try:
-        value = int(user.get(field, info.get(field, -1 if field == "LastRun" else 0)))
-    except (TypeError, ValueError):
-        value = -1 if field == "LastRun" else 0
-    return value
+    return table_keys(table).numeric[field]
 
 
 def get_table_rating(tables, index):
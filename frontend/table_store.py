@@ -0,0 +1,438 @@
+"""One table library and its views, shared by the bg, dmd and table windows' APIs.
+
+Each window has its own `API`, and each used to load the library, sort it for the default
+view, apply the startup collection and then repeat every filter and sort the theme synced
+across windows, three times over. The store holds the library once and works out each
+view once: the first window to ask for a filter, sort or collection computes it, and the
+others get the same result.
+
+Results are immutable snapshots (tuples), so a window can keep one for as long as it
+likes while another moves on. They are memoized by what they were computed from, so a
+snapshot is never served after that stopped being true:
+
+- the store's `version`, bumped whenever the library list is replaced (a rescan);
+- `meta_generation()`, bumped by any metadata edit (a rating, a launch's LastRun), since
+  those can move a table in or out of a filter or along a sort;
+- for sorts, which view is being sorted (its stamp);
+- for collections, collections.ini's size and mtime.
+
+Every view the store makes is a `TableView` stamped with the store's `version` and a
+count of views made, so a view is known by its stamp without a pass over its tables.
+Lists that did not come from the store (tests, mostly) are sorted without memoizing.
+
+The API methods run on `asyncio.to_thread` workers. The store's lock is only held to look
+things up and file results: a view is computed outside it, so a window sorting or
+serializing a large library does not hold up the others. A request for a view that is
+being computed waits for that result instead of computing it again, the way
+`BoundedFileCache.building` guards a file being made. The filter index is not
+thread-safe on its own, so the filters and menus take turns on it.
+
+The store is also where windows hear about edits. `publish_changes` compares the library
+with what was last published and sends subscribers (the WebSocket bridge) one compact
+event per kind of change instead of leaving every window to download the whole list
+again:
+
+- `TableChanged`: the tables whose row changed, each with only the top-level fields and
+  .info sections that differ from the row last published for it (the whole row when
+  there is nothing to compare with). A rescan replaces every Table object, so tables are
+  compared by their serialized rows, not by identity: the windows' views move onto the
+  new objects, and only rows that actually differ go out. Windows keep their order; a re-rated table stays where it is until the
+  view is rebuilt, as it always has.
+- `TablesRemoved`: the folders that went away. They are taken out of every window's view.
+- `TablesAdded`: the new tables' rows. Each is appended to the views of the windows whose
+  current filters or collection it matches.
+
+Themes address tables by their index in the view, so the windows' views here and the
+lists in the browser must move in step. The membership events say, per window, which
+view stamp they apply to and which one results; a window holding anything else reloads.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+
+from common.collections_service import filter_tables_by_collection
+from common.paths import COLLECTIONS_PATH
+from common.table import Table, meta_generation
+from common.table_repository import ensure_tables_loaded
+from common.tablelistfilters import TableFilterIndex, TableListFilters
+from frontend import table_state
+
+
+logger = logging.getLogger("vpinfe.frontend.table_store")
+
+# Views remembered at once; each is a tuple of references into the library.
+MAX_VIEWS = 32
+# Serialized views remembered at once; each is the view's full JSON, megabytes for a
+# large library, so only the ones the windows are showing right now.
+MAX_JSON_VIEWS = 4
+
+
+def _collections_stamp() -> tuple:
+    try:
+        st = os.stat(COLLECTIONS_PATH)
+    except OSError:
+        return ()
+    return (st.st_size, st.st_mtime_ns)
+
+
+class TableStore:
+    def __init__(self, loader=ensure_tables_loaded) -> None:
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._library: tuple | None = None
+        self._index: TableFilterIndex | None = None
+        self._index_lock = threading.Lock()
+        self._building: dict[tuple, threading.Lock] = {}
+        self._views: OrderedDict[tuple, object] = OrderedDict()
+        self._json: OrderedDict[tuple, str] = OrderedDict()
+        self.version = 0
+        self._view_numbers = itertools.count(1)
+        self._stats = {"hits": 0, "misses": 0}
+        # The change feed: the metadata generation and rows the windows were last told
+        # about, who to tell, and the window APIs whose views follow the library.
+        # Publishing is serialized on its own lock: it asks for views, which must not
+        # happen while holding the store's lock.
+        self._publish_lock = threading.Lock()
+        self._published_generation: int | None = None
+        self._rows: dict[str, str] = {}
+        self._subscribers: list = []
+        self._windows = weakref.WeakSet()
+
+    # -- the library ---------------------------------------------------------
+
+    def library(self) -> tuple:
+        """Every table, in the order the scan returned them."""
+        return self._snapshot()[1]
+
+    def _snapshot(self) -> tuple[int, tuple, TableFilterIndex]:
+        """The library with its version and filter index, read together."""
+        with self._lock:
+            if self._library is None:
+                self._set_library(self._loader())
+            if self._published_generation is None:
+                self._published_generation = meta_generation()
+            return self.version, self._library, self._index
+
+    def replace_library(self, tables) -> tuple:
+        """Swap in a freshly scanned library; views of the old one are forgotten.
+
+        Each window's API hands over what `ensure_tables_loaded` gave it. When that is
+        the same tables in the same order, the current library and its views stay.
+        """
+        with self._lock:
+            current = self._library
+            if current is None or len(current) != len(tables) or any(a is not b for a, b in zip(current, tables)):
+                self._set_library(tables)
+            return self._library
+
+    def _set_library(self, tables) -> None:
+        self.version += 1
+        self._library = self._view(tables)
+        self._index = TableFilterIndex(self._library)
+        self._views.clear()
+        self._json.clear()
+        logger.debug("Table store version %s: %s tables", self.version, len(self._library))
+
+    # -- views ---------------------------------------------------------------
+
+    def _view(self, tables) -> table_state.TableView:
+        return table_state.TableView(tables, f"{self.version}.{next(self._view_numbers)}")
+
+    def _memo(self, key, compute, memo=None, limit=MAX_VIEWS, version=None):
+        """`compute()`, remembered under `key` for the library `version` (the current one
+        by default) and the current metadata generation."""
+        memo = self._views if memo is None else memo
+        with self._lock:
+            key = (self.version if version is None else version, meta_generation()) + key
+            value = self._lookup(memo, key)
+            if value is not None:
+                return value
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            try:
+                # Whoever held the guard before may have just filed it.
+                with self._lock:
+                    value = self._lookup(memo, key)
+                    if value is not None:
+                        return value
+                    self._stats["misses"] += 1
+                value = compute()
+                with self._lock:
+                    if key[0] == self.version:
+                        memo[key] = value
+                        while len(memo) > limit:
+                            memo.popitem(last=False)
+                return value
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+    def _lookup(self, memo, key):
+        value = memo.get(key)
+        if value is not None:
+            memo.move_to_end(key)
+            self._stats["hits"] += 1
+        return value
+
+    def sorted_view(self, tables, sort_type, order_by=None) -> tuple:
+        """`tables` sorted as `table_state.apply_sort` would, without touching `tables`."""
+        order = table_state.normalize_sort_order(order_by, sort_type)
+
+        def compute():
+            result = list(tables)
+            table_state.apply_sort(result, sort_type, order)
+            return self._view(result)
+
+        if not isinstance(tables, table_state.TableView):
+            return compute()
+        return self._memo(("sort", tables.stamp, sort_type, order), compute)
+
+    def default_view(self) -> tuple:
+        """The whole library by title, A to Z."""
+        return self.sorted_view(self.library(), "Alpha", "Ascending")
+
+    def filtered_view(self, filters: dict) -> tuple:
+        """The library through the filter menus' selections, by title."""
+        version, library, index = self._snapshot()
+        selection = (
+            filters.get("letter"),
+            filters.get("theme"),
+            filters.get("type"),
+            filters.get("manufacturer"),
+            filters.get("year"),
+            filters.get("rating"),
+            bool(filters.get("rating_or_higher")),
+        )
+
+        def compute():
+            letter, theme, table_type, manufacturer, year, rating, rating_or_higher = selection
+            with self._index_lock:
+                tables = TableListFilters(library, index=index).apply_filters(
+                    letter=letter,
+                    theme=theme,
+                    table_type=table_type,
+                    manufacturer=manufacturer,
+                    year=year,
+                    rating=rating,
+                    rating_or_higher=rating_or_higher,
+                )
+            return self._view(tables)
+
+        return self._memo(("filter",) + selection, compute, version=version)
+
+    def collection_view(self, collection) -> tuple[tuple, dict | None]:
+        """A collection's tables, and the saved filters when it is a filter collection."""
+        version, library, index = self._snapshot()
+
+        def compute():
+            with self._index_lock:
+                tables, filters = filter_tables_by_collection(library, collection, index=index)
+            return self._view(tables), filters
+
+        tables, filters = self._memo(("collection", collection, _collections_stamp()), compute, version=version)
+        return tables, (dict(filters) if filters is not None else None)
+
+    def tables_json(self, tables) -> str:
+        """`table_state.tables_json` for a view, serialized once for every window."""
+        return self._json_memo(("all",), tables, lambda: table_state.tables_json(tables))
+
+    def tables_window_json(self, tables, offset=0, limit=None) -> str:
+        """`table_state.tables_window_json`, serialized once for every window."""
+        return self._json_memo(
+            ("window", offset, limit), tables, lambda: table_state.tables_window_json(tables, offset, limit)
+        )
+
+    def _json_memo(self, key, tables, compute) -> str:
+        if not isinstance(tables, table_state.TableView):
+            return compute()
+        return self._memo(key + (tables.stamp,), compute, self._json, MAX_JSON_VIEWS)
+
+    def paging_group_starts(self, tables) -> tuple[int, ...]:
+        """`table_state.paging_group_starts` for a view, worked out once per view.
+
+        A view is known by its stamp, so no pass over the tables is needed to find its
+        groups again, which is the point. A title edit bumps `meta_generation()`, which
+        drops them.
+        """
+        if not isinstance(tables, table_state.TableView):
+            return table_state.paging_group_starts(tables)
+        return self._memo(("groups", tables.stamp), lambda: table_state.paging_group_starts(tables))
+
+    def filter_options(self) -> dict:
+        """What each filter menu offers across the whole library."""
+        version, library, index = self._snapshot()
+
+        def compute():
+            with self._index_lock:
+                return table_state.filter_options(library, index)
+
+        return self._memo(("options",), compute, version=version)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self._stats,
+                version=self.version,
+                tables=len(self._library or ()),
+                views=len(self._views),
+            )
+
+    # -- change feed ---------------------------------------------------------
+
+    def subscribe(self, callback) -> None:
+        """Call `callback(event)` for every event `publish_changes` produces."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def attach_window(self, api) -> None:
+        """Keep `api.filteredTables` in step with tables being added and removed."""
+        with self._lock:
+            self._windows.add(api)
+
+    def remember(self, table) -> None:
+        """Note a table's row as the windows have it, just before editing it, so the
+        edit goes out as a delta rather than the whole row."""
+        if isinstance(table, Table):
+            with self._publish_lock:
+                self._rows[table.fullPathTable] = table_state.table_json_fragment(table)
+
+    def publish_changes(self, tables=None) -> list[dict]:
+        """Take in the current library (or `tables`) and tell subscribers what changed.
+
+        Returns the events sent, which is an empty list when nothing did.
+        """
+        with self._publish_lock:
+            with self._lock:
+                if self._library is None:
+                    if tables is not None:
+                        self._set_library(tables)
+                    self._snapshot()
+                    return []
+                if tables is None:
+                    tables = self._loader()
+                previous = {table.fullPathTable: table for table in self._library}
+                current = {table.fullPathTable: table for table in tables}
+                since = self._published_generation
+                changed = [
+                    (table, previous[path]) for path, table in current.items()
+                    if path in previous and (previous[path] is not table or table.meta_version > since)
+                ]
+                removed = [path for path in previous if path not in current]
+                added = [table for path, table in current.items() if path not in previous]
+
+                self.replace_library(tables)
+                self._published_generation = meta_generation()
+                windows = list(self._windows)
+                subscribers = list(self._subscribers)
+
+            if any(table is not old for table, old in changed):
+                self._follow_new_objects(current, windows)
+            events = []
+            if removed:
+                events.append(self._removed_event(set(removed), windows))
+            if added:
+                events.append(self._added_event(added, windows))
+            updates = []
+            for table, old in changed:
+                changes = self._delta(table, old)
+                if changes:
+                    updates.append({"fullPathTable": table.fullPathTable, "changes": changes})
+            if updates:
+                events.append({
+                    "type": "TableChanged",
+                    "since": since,
+                    "version": self._published_generation,
+                    "tables": updates,
+                })
+
+        for event in events:
+            logger.debug("Publishing %s (%s tables)", event["type"], len(event["tables"]))
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Table change subscriber failed on %s", event["type"])
+        return events
+
+    def _follow_new_objects(self, current: dict, windows) -> None:
+        """Point the windows' views at the rescanned tables for their folders. Same
+        folders in the same order, so each view keeps its stamp."""
+        for api in windows:
+            old = api.filteredTables
+            api.filteredTables = table_state.TableView(
+                (current.get(getattr(table, "fullPathTable", None), table) for table in old),
+                table_state.view_stamp(old),
+            )
+
+    def _delta(self, table, old) -> dict:
+        fragment = table_state.table_json_fragment(table)
+        previous = self._rows.get(table.fullPathTable)
+        if previous is None and old is not table:
+            # Never published on its own: the windows have the row the old object gave.
+            previous = table_state.table_json_fragment(old)
+        self._rows[table.fullPathTable] = fragment
+        if previous == fragment:
+            return {}
+        row = json.loads(fragment)
+        if previous is None:
+            return row
+        old = json.loads(previous)
+        changes = {key: value for key, value in row.items() if key != "meta" and old.get(key) != value}
+        old_meta, meta = old.get("meta") or {}, row.get("meta") or {}
+        sections = {name: value for name, value in meta.items() if old_meta.get(name) != value}
+        sections.update({name: None for name in old_meta if name not in meta})
+        if sections:
+            changes["meta"] = sections
+        return changes
+
+    def _removed_event(self, removed: set, windows) -> dict:
+        for path in removed:
+            self._rows.pop(path, None)
+        views = {}
+        for api in windows:
+            old = api.filteredTables
+            kept = self._view(table for table in old if getattr(table, "fullPathTable", None) not in removed)
+            api.filteredTables = kept
+            views[api.window_name] = {"from": table_state.view_stamp(old), "to": table_state.view_stamp(kept)}
+        return {"type": "TablesRemoved", "tables": sorted(removed), "views": views}
+
+    def _added_event(self, added: list, windows) -> dict:
+        views = {}
+        for api in windows:
+            if api.current_collection:
+                members = self.collection_view(api.current_collection)[0]
+            else:
+                members = self.filtered_view(api.current_filters)
+            member_ids = {id(table) for table in members}
+            append = [position for position, table in enumerate(added) if id(table) in member_ids]
+            old = api.filteredTables
+            api.filteredTables = self._view(tuple(old) + tuple(added[position] for position in append))
+            views[api.window_name] = {
+                "from": table_state.view_stamp(old),
+                "to": table_state.view_stamp(api.filteredTables),
+                "append": append,
+            }
+        for table in added:
+            self._rows[table.fullPathTable] = table_state.table_json_fragment(table)
+        rows = [json.loads(self._rows[table.fullPathTable]) for table in added]
+        return {"type": "TablesAdded", "tables": rows, "views": views}
+
+
+_store: TableStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_table_store() -> TableStore:
+    """The store the bg, dmd and table windows' APIs share."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TableStore()
+        return _store
@@ -6,22 +6,149 @@ Each Chromium window connects via WebSocket with its window name as a query para
 
 JS→Python: API call requests with unique IDs, responses sent back
 Python→JS: Event push messages for inter-window communication
+
+Frames are compressed with permessage-deflate when the browser offers it (Chromium
+always does). A client that adds `&encoding=compact` to the URL gets API responses whose
+result is a string (the table list is a JSON string) as binary frames instead: a 4-byte
+big-endian header length, the JSON header, then the string's UTF-8 bytes. The result is
+then not escaped into a second layer of JSON here or unescaped again in the browser.
+Everything else is sent as JSON text either way.
+
+Every connection has its own outbound queue drained by its own sender task, so a window
+that stops reading only backs up its own queue, never the others'. Events are encoded
+once and queued for each window without waiting on any of them. High-rate events are
+coalesced while they wait (a window that is behind gets the latest `buildmeta_progress`,
+not every step). A queue that reaches `MAX_QUEUE_DEPTH` drops its oldest event of a type
+in `DROPPABLE_EVENT_TYPES` (progress that a later event supersedes). Anything else (table
+changes, launches, API responses) is never dropped: a window that missed one would show
+stale state without knowing, so when nothing droppable is queued the queue grows instead.
 """
 
 import asyncio
 import json
 import logging
 import socket
+import struct
 import threading
+import time
+from collections import deque
 from urllib.parse import urlparse, parse_qs
 
 import websockets
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
 
 from frontend.api import API_ALLOWED_METHODS
+from frontend.api_metrics import get_api_metrics
 
 
 logger = logging.getLogger("vpinfe.frontend.ws_bridge")
 
+COMPACT_ENCODING = "compact"
+# Events where only the newest pending one matters to a window that is behind.
+COALESCED_EVENT_TYPES = frozenset({"buildmeta_progress"})
+# Events a window that has fallen far behind can lose without showing anything stale.
+DROPPABLE_EVENT_TYPES = COALESCED_EVENT_TYPES
+# Frames a window can fall behind by before its oldest droppable events are dropped.
+MAX_QUEUE_DEPTH = 256
+
+
+def encode_frame(message, compact=False):
+    """The frame for one Python→JS message: JSON text, or a compact binary frame."""
+    result = message.get("result")
+    if not compact or message.get("type") != "api_response" or not isinstance(result, str):
+        return json.dumps(message)
+    header = {key: value for key, value in message.items() if key != "result"}
+    header["body"] = "result"
+    header_bytes = json.dumps(header).encode("utf-8")
+    return struct.pack(">I", len(header_bytes)) + header_bytes + result.encode("utf-8")
+
+
+class _Outbox:
+    """One window's outbound queue and the task that sends it, in order.
+
+    Only touched from the bridge's event loop.
+    """
+
+    def __init__(self, websocket, max_depth=MAX_QUEUE_DEPTH):
+        self.websocket = websocket
+        self.max_depth = max_depth
+        self._queue = deque()        # [frame, coalesce_key or None, droppable]
+        self._pending = {}           # {coalesce_key: queued entry}
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_seen_depth = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def put_response(self, frame):
+        self._append([frame, None, False])
+
+    def put_event(self, frame, coalesce_key=None, droppable=False):
+        if coalesce_key is not None:
+            entry = self._pending.get(coalesce_key)
+            if entry is not None:
+                entry[0] = frame  # keeps its place in the queue, carries the newest state
+                self.coalesced += 1
+                return
+        entry = [frame, coalesce_key, droppable]
+        if len(self._queue) >= self.max_depth:
+            self._drop_oldest_droppable()
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = entry
+        self._append(entry)
+
+    def _append(self, entry):
+        self._queue.append(entry)
+        self.max_seen_depth = max(self.max_seen_depth, len(self._queue))
+        self._wakeup.set()
+
+    def _drop_oldest_droppable(self):
+        for entry in self._queue:
+            if entry[2]:
+                self._queue.remove(entry)
+                self._forget(entry)
+                self.dropped += 1
+                return
+
+    def _forget(self, entry):
+        key = entry[1]
+        if key is not None and self._pending.get(key) is entry:
+            del self._pending[key]
+
+    async def _run(self):
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            entry = self._queue.popleft()
+            self._forget(entry)
+            try:
+                await self.websocket.send(entry[0])
+            except websockets.exceptions.ConnectionClosed:
+                return
+            self.sent += 1
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_seen_depth,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
 
 class WebSocketBridge:
     """WebSocket server that bridges JavaScript ↔ Python API calls."""
@@ -29,10 +156,13 @@ class WebSocketBridge:
     # Public API methods that JS is allowed to call
     ALLOWED_METHODS = API_ALLOWED_METHODS
 
-    def __init__(self, port=8002):
+    def __init__(self, port=8002, metrics=None):
         self.port = port
+        self.metrics = metrics or get_api_metrics()
         self._api_instances = {}       # {window_name: api_instance}
         self._connections = {}         # {window_name: websocket}
+        self._compact = set()          # websockets that asked for encoding=compact
+        self._outboxes = {}            # {websocket: _Outbox}
         self._loop = None
         self._thread = None
         self._server = None
@@ -77,6 +207,11 @@ class WebSocketBridge:
             self._handle_connection,
             sock=sock,
             max_size=10 * 1024 * 1024,  # 10MB max message size for large table data
+            # The library default trades ratio for memory (4 KiB window, memLevel 5), which
+            # suits servers with thousands of clients; this one has three, and the table
+            # list compresses noticeably better with the full 32 KiB window.
+            compression=None,
+            extensions=[ServerPerMessageDeflateFactory(compress_settings={"memLevel": 8})],
         )
         # Wait until stop is signaled
         while not self._stop_event.is_set():
@@ -90,22 +225,22 @@ class WebSocketBridge:
         parsed = urlparse(websocket.request.path if hasattr(websocket.request, 'path') else str(websocket.request))
         params = parse_qs(parsed.query)
         window_name = params.get('window', ['unknown'])[0]
+        compact = params.get('encoding', [''])[0] == COMPACT_ENCODING
 
-        logger.info("Window '%s' connected", window_name)
+        logger.info("Window '%s' connected%s", window_name, " (compact encoding)" if compact else "")
         self._connections[window_name] = websocket
+        if compact:
+            self._compact.add(websocket)
+        outbox = self._outboxes[websocket] = _Outbox(websocket)
+        outbox.start()
+        # Frames are read as they come and answered in order by a task of their own, so
+        # a frame's arrival is stamped while earlier calls from this window still run.
+        inbox = asyncio.Queue()
+        worker = asyncio.create_task(self._answer_messages(window_name, websocket, inbox))
 
         try:
             async for raw_message in websocket:
-                try:
-                    data = json.loads(raw_message)
-                    await self._dispatch(window_name, websocket, data)
-                except json.JSONDecodeError:
-                    await websocket.send(json.dumps({
-                        'type': 'error',
-                        'message': 'Invalid JSON'
-                    }))
-                except Exception:
-                    logger.exception("Error handling message from '%s'", window_name)
+                inbox.put_nowait((time.perf_counter(), raw_message))
         except websockets.exceptions.ConnectionClosed as exc:
             logger.info(
                 "Window '%s' disconnected (code=%s, reason=%s)",
@@ -114,27 +249,56 @@ class WebSocketBridge:
                 getattr(exc, "reason", ""),
             )
         finally:
+            worker.cancel()
+            outbox.stop()
+            self._outboxes.pop(websocket, None)
+            self._compact.discard(websocket)
             if self._connections.get(window_name) is websocket:
                 del self._connections[window_name]
 
-    async def _dispatch(self, window_name, websocket, data):
+    async def _answer_messages(self, window_name, websocket, inbox):
+        """Handle one window's messages one at a time, in the order they arrived."""
+        while True:
+            arrived, raw_message = await inbox.get()
+            try:
+                data = json.loads(raw_message)
+                await self._dispatch(window_name, websocket, data, arrived)
+            except json.JSONDecodeError:
+                outbox = self._outboxes.get(websocket)
+                if outbox is not None:
+                    outbox.put_response(json.dumps({
+                        'type': 'error',
+                        'message': 'Invalid JSON'
+                    }))
+            except Exception:
+                logger.exception("Error handling message from '%s'", window_name)
+
+    async def _dispatch(self, window_name, websocket, data, arrived=None):
         """Dispatch an incoming message from JS."""
         msg_type = data.get('type')
 
         if msg_type == 'api_call':
-            await self._handle_api_call(window_name, websocket, data)
+            await self._handle_api_call(window_name, websocket, data, arrived)
         else:
             logger.warning("Unknown message type from '%s': %s", window_name, msg_type)
 
-    async def _handle_api_call(self, window_name, websocket, data):
-        """Handle a JS→Python API call."""
+    async def _handle_api_call(self, window_name, websocket, data, arrived=None):
+        """Handle a JS→Python API call.
+
+        Its queue wait runs from `arrived`, when the frame was read off the socket, to a
+        worker thread starting it: time behind this window's earlier calls and time
+        waiting for a free thread both count.
+        """
         call_id = data.get('id')
         method = data.get('method')
         args = data.get('args', [])
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            return
 
         if method not in self.ALLOWED_METHODS:
             logger.warning("Window '%s' called disallowed/unknown API method: %s", window_name, method)
-            await websocket.send(json.dumps({
+            outbox.put_response(json.dumps({
                 'type': 'api_response',
                 'id': call_id,
                 'error': f'Method not allowed: {method}'
@@ -143,7 +307,7 @@ class WebSocketBridge:
 
         api = self._api_instances.get(window_name)
         if api is None:
-            await websocket.send(json.dumps({
+            outbox.put_response(json.dumps({
                 'type': 'api_response',
                 'id': call_id,
                 'error': f'No API instance for window: {window_name}'
@@ -152,34 +316,44 @@ class WebSocketBridge:
 
         fn = getattr(api, method, None)
         if fn is None or not callable(fn):
-            await websocket.send(json.dumps({
+            outbox.put_response(json.dumps({
                 'type': 'api_response',
                 'id': call_id,
                 'error': f'Method not found: {method}'
             }))
             return
 
-        try:
-            # Run the API method in a thread to avoid blocking the event loop
-            result = await asyncio.to_thread(fn, *args)
+        compact = websocket in self._compact
+        submitted = time.perf_counter() if arrived is None else arrived
+        timing = []  # [started, finished] on the worker thread
 
-            await websocket.send(json.dumps({
-                'type': 'api_response',
-                'id': call_id,
-                'result': result
-            }))
-        except websockets.exceptions.ConnectionClosed:
-            pass  # Client disconnected before response (e.g. close_app)
-        except Exception as e:
-            logger.exception("API call error: %s(%s)", method, args)
+        def call():
+            timing.append(time.perf_counter())
             try:
-                await websocket.send(json.dumps({
+                # Encoded on the worker thread too: a full table list is megabytes of JSON.
+                return encode_frame({
                     'type': 'api_response',
                     'id': call_id,
-                    'error': str(e)
-                }))
-            except websockets.exceptions.ConnectionClosed:
-                pass
+                    'result': fn(*args)
+                }, compact)
+            finally:
+                timing.append(time.perf_counter())
+
+        error = False
+        try:
+            # Run the API method in a thread to avoid blocking the event loop
+            frame = await asyncio.to_thread(call)
+        except Exception as e:
+            logger.exception("API call error: %s(%s)", method, args)
+            error = True
+            frame = json.dumps({
+                'type': 'api_response',
+                'id': call_id,
+                'error': str(e)
+            })
+        started, finished = timing if len(timing) == 2 else (submitted, time.perf_counter())
+        self.metrics.record(method, started - submitted, finished - started, len(frame), error, window_name)
+        outbox.put_response(frame)
 
     # -----------------------------------------------------------
     # Python-callable methods for pushing events to browsers
@@ -187,58 +361,49 @@ class WebSocketBridge:
 
     def send_event(self, window_name, message):
         """Send an event to a specific window's browser."""
-        if self._loop is None:
-            return
-        asyncio.run_coroutine_threadsafe(
-            self._send_event_async(window_name, message),
-            self._loop
-        )
+        self._queue_event(message, only=window_name)
 
     def send_event_all(self, message, exclude=None):
         """Broadcast an event to all connected windows, optionally excluding one."""
-        if self._loop is None:
-            return
-        asyncio.run_coroutine_threadsafe(
-            self._send_event_all_async(message, exclude=exclude, forward_iframe=False),
-            self._loop
-        )
+        self._queue_event(message, exclude=exclude, forward_iframe=False)
 
     def send_event_all_with_iframe(self, message):
         """Broadcast an event to all windows, including iframe forwarding."""
-        if self._loop is None:
-            return
-        asyncio.run_coroutine_threadsafe(
-            self._send_event_all_async(message, exclude=None, forward_iframe=True),
-            self._loop
-        )
+        self._queue_event(message, forward_iframe=True)
 
-    async def _send_event_async(self, window_name, message):
-        """Internal async: send event to one window."""
-        ws = self._connections.get(window_name)
-        if ws is None:
+    def _queue_event(self, message, only=None, exclude=None, forward_iframe=None):
+        """Encode an event once, on the caller's thread, and hand it to the loop."""
+        if self._loop is None:
             return
+        envelope = {'type': 'event', 'message': message}
+        if forward_iframe is not None:
+            envelope['forward_iframe'] = forward_iframe
+        frame = json.dumps(envelope)
+        event_type = message.get('type') if isinstance(message, dict) else None
+        coalesce_key = event_type if event_type in COALESCED_EVENT_TYPES else None
+        droppable = event_type in DROPPABLE_EVENT_TYPES
         try:
-            await ws.send(json.dumps({
-                'type': 'event',
-                'message': message
-            }))
-        except websockets.exceptions.ConnectionClosed:
-            pass
-
-    async def _send_event_all_async(self, message, exclude=None, forward_iframe=False):
-        """Internal async: broadcast event to windows."""
-        payload = json.dumps({
-            'type': 'event',
-            'message': message,
-            'forward_iframe': forward_iframe
-        })
+            self._loop.call_soon_threadsafe(self._fan_out, frame, coalesce_key, droppable, only, exclude)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _fan_out(self, frame, coalesce_key, droppable, only, exclude):
+        """On the loop: put one event on each addressed window's queue. Never waits."""
         for name, ws in list(self._connections.items()):
-            if exclude and name == exclude:
+            if (only is not None and name != only) or (exclude and name == exclude):
                 continue
-            try:
-                await ws.send(payload)
-            except websockets.exceptions.ConnectionClosed:
-                pass
+            outbox = self._outboxes.get(ws)
+            if outbox is not None:
+                outbox.put_event(frame, coalesce_key, droppable)
+
+    def queue_stats(self):
+        """Outbound queue depth and counters for each connected window."""
+        stats = {}
+        for name, ws in list(self._connections.items()):
+            outbox = self._outboxes.get(ws)
+            if outbox is not None:
+                stats[name] = outbox.stats()
+        return stats
 
     def stop(self):
         """Stop the WebSocket server."""
@@ -43,6 +43,7 @@ from common.app_version import get_version
 from common.themes import ThemeRegistry
 from common.paths import VPINFE_INI_PATH, configure_nicegui_storage, ensure_config_dir
 from common.metadata_service import build_metadata
+from common.startup import StartupPlan
 
 # Get the base path
 base_path = os.path.dirname(os.path.abspath(__file__))
@@ -58,16 +59,6 @@ logger.info("Logging to %s", log_path)
 logger.info("Using NiceGUI storage path: %s", nicegui_storage_path)
 logger.info("Version: %s", get_version())
 
-try:
-    roms_update_result = ensure_latest_roms_json(iniconfig)
-    logger.info(
-        "pinmame-score-parser roms.json status=%s path=%s",
-        roms_update_result.get("status"),
-        roms_update_result.get("path"),
-    )
-except Exception:
-    logger.exception("Failed to update pinmame-score-parser roms.json at startup")
-
 
 def reconfigure_app_logging() -> None:
     configure_logging(config_dir, iniconfig)
@@ -132,6 +123,44 @@ def create_api_instances():
     ws_bridge, frontend_browser = runtime.create_api_instances(iniconfig, logger)
 
 
+def _update_roms_json():
+    """Fetch the latest pinmame-score-parser roms.json; scores are read lazily, so nothing waits on it."""
+    roms_update_result = ensure_latest_roms_json(iniconfig)
+    logger.info(
+        "pinmame-score-parser roms.json status=%s path=%s",
+        roms_update_result.get("status"),
+        roms_update_result.get("path"),
+    )
+
+
+def _install_staged_theme_updates():
+    """Put theme updates staged by the last run's refresh in place, before any window opens."""
+    installed = ThemeRegistry().install_staged_updates()
+    if installed:
+        logger.info("Installed staged theme updates: %s", ", ".join(installed))
+
+
+def _refresh_themes(in_use=None):
+    """Load the theme registry and install or update the default themes. An update to
+    `in_use`, the theme the windows are already loading, is staged for the next start."""
+    theme_registry = ThemeRegistry()
+    theme_registry.load_registry()
+    theme_registry.load_theme_manifests(default_only=True)
+    theme_registry.auto_install_defaults(in_use=in_use)
+
+
+def _configure_rar_tool():
+    """Point the archive analyzer at a configured RAR tool (blank = auto-detect from PATH)."""
+    from managerui.services.asset_analyzer_service import configure_rar_tool
+    configure_rar_tool(iniconfig.config.get('Settings', 'rartoolpath', fallback='').strip())
+
+
+def _start_manager_ui():
+    manager_ui_port = int(iniconfig.config['Network'].get('manageruiport', '8001'))
+    start_manager_ui(port=manager_ui_port)
+    reconfigure_app_logging()
+
+
 def _start_startup_media_sync():
     """Optionally sync media from VPinMediaDB on startup in a background thread."""
     global _startup_media_sync_started
@@ -160,36 +189,34 @@ if iniconfig.is_new:
     runtime.wait_for_manager_ui_ready(manager_ui_port)
     logger.info("First run: Manager UI ready on port %s", manager_ui_port)
 
-# Initialize theme registry and auto-install default themes
-try:
-    theme_registry = ThemeRegistry()
-    theme_registry.load_registry()
-    theme_registry.load_theme_manifests(default_only=True)
-    theme_registry.auto_install_defaults()
-except Exception:
-    logger.exception("Theme registry initialization failed")
-
+# Everything the windows need before they open, run as a dependency graph so
+# independent steps overlap. The roms.json download and, once the configured theme is
+# installed, the theme registry refresh run in the background off the critical path.
+# A background refresh only stages updates to the theme in use; the next start installs
+# them (from disk) before the windows open.
+startup = StartupPlan()
+startup.add("roms_json", _update_roms_json, optional=True, background=True)
+startup.add("theme_updates", _install_staged_theme_updates, optional=True)
+theme_in_use = runtime.installed_theme(themes_dir, iniconfig)
+startup.add(
+    "themes", lambda: _refresh_themes(in_use=theme_in_use), optional=True,
+    background=theme_in_use is not None, requires=("theme_updates",),
+)
 # Optionally sync media updates from VPinMediaDB in background
-_start_startup_media_sync()
-start_dof_service_if_enabled(iniconfig)
-
-# Point the archive analyzer at a configured RAR tool (blank = auto-detect from PATH)
-from managerui.services.asset_analyzer_service import configure_rar_tool
-configure_rar_tool(iniconfig.config.get('Settings', 'rartoolpath', fallback='').strip())
-
+startup.add("media_sync", _start_startup_media_sync)
+startup.add("dof", lambda: start_dof_service_if_enabled(iniconfig))
+startup.add("rar_tool", _configure_rar_tool)
 # Create API instances and register with WebSocket bridge
-create_api_instances()
-
+startup.add("tables", create_api_instances)
+# Optionally pick up table folders changed outside VPinFE without a full rescan
+startup.add("table_watcher", lambda: runtime.start_table_watcher_if_enabled(iniconfig, logger), requires=("tables",))
 # Start the HTTP server to serve images from the "tables" directory
-http_server = runtime.start_asset_server(MOUNT_POINTS, iniconfig)
-
+startup.add("asset_server", lambda: runtime.start_asset_server(MOUNT_POINTS, iniconfig))
 # Start the NiceGUI HTTP server
-manager_ui_port = int(iniconfig.config['Network'].get('manageruiport', '8001'))
-start_manager_ui(port=manager_ui_port)
-reconfigure_app_logging()
-
+startup.add("manager_ui", _start_manager_ui, requires=("tables",))
 # Start the WebSocket bridge
-ws_bridge.start()
+startup.add("ws_bridge", lambda: ws_bridge.start(), requires=("tables",))
+http_server = startup.run()["asset_server"]
 
 runtime.run_frontend_loop(
     headless,
@@ -19,6 +19,7 @@ INPUT_MAPPING_ACTION_ORDER = [
 CHECKBOX_FIELDS = {
     ("Settings", "autoupdatemediaonstartup"),
     ("Settings", "restorelasttable"),
+    ("Settings", "watchtables"),
     ("Settings", "splashscreen"),
     ("Settings", "muteaudio"),
     ("Settings", "mmhidequitbutton"),
@@ -20,6 +20,7 @@ from .pages import mobile as tab_mobile
 from .pages import vpinplay as tab_vpinplay
 from .pages import vpinplay_player as tab_vpinplay_player
 from .pages import logs as tab_logs
+from .pages import api_metrics as tab_api_metrics
 from .page_registry import NAV_PAGES, PAGE_ALIASES
 from .services import app_control
 from .services.archive_service import cleanup_archive, create_vpxz_archive
@@ -120,6 +121,7 @@ _PAGE_RENDERERS = {
     'themes': tab_themes.render_panel,
     'mobile': lambda: tab_mobile.build(standalone=False),
     'system': tab_system.render_panel,
+    'api_metrics': tab_api_metrics.render_panel,
     'logs': tab_logs.render_panel,
     'vpinfe': tab_vpinfe.render_panel,
     'vpinplay': tab_vpinplay.render_panel,
@@ -18,6 +18,7 @@ NAV_PAGES: tuple[ManagerPage, ...] = (
     ManagerPage("themes", "Themes", "palette"),
     ManagerPage("mobile", "Mobile Uploader", "smartphone"),
     ManagerPage("system", "System", "monitor_heart"),
+    ManagerPage("api_metrics", "API Metrics", "speed"),
     ManagerPage("vpinfe", "Configuration", "tune"),
     ManagerPage("vpx_config", "VPX Config", "settings_applications"),
     ManagerPage("vpx_plugins", "VPX-Plugins", "extension"),
@@ -34,6 +35,8 @@ PAGE_ALIASES = {
     "configuration": "vpinfe",
     "config": "vpinfe",
     "log": "logs",
+    "metrics": "api_metrics",
+    "api-metrics": "api_metrics",
     "logs": "logs",
     "vpinplay": "vpinplay",
     "vpinplay_config": "vpinplay",
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from nicegui import ui
+
+from frontend.api_metrics import get_api_metrics
+from managerui.services.system_service import format_bytes
+from managerui.ui_helpers import load_page_style
+
+
+_COLUMNS = [
+    {"name": "method", "label": "Method", "field": "method", "align": "left", "sortable": True},
+    {"name": "calls", "label": "Calls", "field": "calls", "align": "right", "sortable": True},
+    {"name": "errors", "label": "Errors", "field": "errors", "align": "right", "sortable": True},
+    {"name": "wait_p50", "label": "Wait p50 (ms)", "field": "wait_p50", "align": "right", "sortable": True},
+    {"name": "wait_p95", "label": "Wait p95 (ms)", "field": "wait_p95", "align": "right", "sortable": True},
+    {"name": "exec_p50", "label": "Run p50 (ms)", "field": "exec_p50", "align": "right", "sortable": True},
+    {"name": "exec_p95", "label": "Run p95 (ms)", "field": "exec_p95", "align": "right", "sortable": True},
+    {"name": "exec_max", "label": "Run max (ms)", "field": "exec_max", "align": "right", "sortable": True},
+    {"name": "total_ms", "label": "Total run (ms)", "field": "total_ms", "align": "right", "sortable": True},
+    {"name": "avg_bytes", "label": "Avg response", "field": "avg_bytes_label", "align": "right"},
+    {"name": "max_bytes", "label": "Max response", "field": "max_bytes_label", "align": "right"},
+]
+
+
+def _metric_rows(snapshot: dict) -> list[dict]:
+    rows = []
+    for method, stats in snapshot["methods"].items():
+        rows.append({
+            "method": method,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "wait_p50": stats["queue_wait"]["p50_ms"],
+            "wait_p95": stats["queue_wait"]["p95_ms"],
+            "exec_p50": stats["execution"]["p50_ms"],
+            "exec_p95": stats["execution"]["p95_ms"],
+            "exec_max": stats["execution"]["max_ms"],
+            "total_ms": round(stats["total_execution_ms"]),
+            "avg_bytes_label": format_bytes(stats["avg_response_bytes"]),
+            "max_bytes_label": format_bytes(stats["max_response_bytes"]),
+        })
+    return rows
+
+
+def render_panel():
+    load_page_style("system.css")
+    metrics = get_api_metrics()
+
+    with ui.column().classes("w-full gap-4"):
+        with ui.card().classes("w-full system-hero"):
+            with ui.row().classes("w-full justify-between items-center p-4 gap-4"):
+                with ui.row().classes("items-center gap-3"):
+                    ui.icon("speed", size="32px").style("color: var(--neon-cyan) !important;")
+                    with ui.column().classes("gap-0"):
+                        ui.label("API Metrics").classes("text-2xl font-bold").style("color: var(--ink) !important;")
+                        ui.label(
+                            "How long each theme API call waits to start, how long it runs, and how much it sends back."
+                        ).classes("text-sm").style("color: var(--neon-cyan) !important;")
+                with ui.row().classes("items-center gap-3"):
+                    refresh_button = ui.button("Refresh", icon="refresh").style(
+                        "color: var(--neon-cyan) !important; background: var(--surface) !important; "
+                        "border: 1px solid var(--neon-cyan); border-radius: 18px; padding: 4px 10px;"
+                    )
+                    reset_button = ui.button("Reset", icon="restart_alt").style(
+                        "color: var(--neon-purple) !important; background: var(--surface) !important; "
+                        "border: 1px solid var(--neon-purple); border-radius: 18px; padding: 4px 10px;"
+                    )
+
+        with ui.card().classes("system-card w-full p-5"):
+            summary_label = ui.label("").classes("text-sm").style("color: var(--ink-muted) !important;")
+            table = ui.table(
+                columns=_COLUMNS,
+                rows=[],
+                row_key="method",
+                pagination={"rowsPerPage": 50, "sortBy": "total_ms", "descending": True},
+            ).classes("w-full").props("dense").style(
+                "color: var(--ink) !important; background-color: var(--surface) !important; "
+                "border: 1px solid var(--line); border-radius: var(--radius);"
+            )
+            ui.label(
+                "Wait runs from the call's message reaching VPinFE to a worker thread starting it. Each window's "
+                "calls run one at a time in order, so a high wait usually means the call sat behind an earlier, "
+                "slow call from the same window. Percentiles are read from fixed buckets, so they "
+                "are rounded up to the nearest bucket edge. Set Logger.slowapicallms to log individual slow calls."
+            ).classes("text-xs").style("color: var(--ink-muted) !important;")
+
+    def refresh_metrics():
+        snapshot = metrics.snapshot()
+        table.rows = _metric_rows(snapshot)
+        table.update()
+        calls = sum(stats["calls"] for stats in snapshot["methods"].values())
+        slow = f"{snapshot['slow_call_ms']} ms" if snapshot["slow_call_ms"] else "off"
+        summary_label.set_text(
+            f"{calls} calls to {len(snapshot['methods'])} methods since "
+            f"{datetime.fromtimestamp(snapshot['since']):%Y-%m-%d %H:%M:%S}. Slow call logging: {slow}."
+        )
+
+    def reset_metrics():
+        metrics.reset()
+        refresh_metrics()
+
+    refresh_button.on_click(refresh_metrics)
+    reset_button.on_click(reset_metrics)
+    refresh_metrics()
+    ui.timer(2.0, refresh_metrics)
@@ -69,6 +69,9 @@ FRIENDLY_NAMES = {
     'startup_collection': 'Startup Collection',
     'autoupdatemediaonstartup': 'Auto Update Media On Startup',
     'restorelasttable': 'Restore Last Table',
+    'tablescanworkers': 'Table Scan Workers (1 = serial)',
+    'metadatajobs': 'Metadata Build Jobs (0 = one per CPU, 1 = serial)',
+    'watchtables': 'Watch Tables Folder For Changes',
     'splashscreen': 'Enable splashscreen',
     'muteaudio': 'Mute Frontend Audio',
     'chromeoptions': 'Additional Chrome Options',
@@ -84,6 +87,7 @@ FRIENDLY_NAMES = {
     'theme': 'Active Theme',
     'level': 'Log Verbosity',
     'console': 'Console Logging',
+    'slowapicallms': 'Log API Calls Slower Than (ms, 0 = off)',
 
     # [Displays]
     'tablescreenid': 'Playfield Monitor ID',
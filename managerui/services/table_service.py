@@ -12,9 +12,10 @@ from common import info_restore, table_repository
 from common.table_repository import get_missing_tables, get_table_rows, refresh_table
 from common import metadata_service
 from common.vpxcollections import VPXCollections
+from common.vpx_parse_cache import VPXParseCache
 from common.vpxparser import VPXParser
 
-from common.paths import CONFIG_DIR
+from common.paths import CONFIG_DIR, VPX_PARSE_CACHE_PATH
 from managerui.paths import COLLECTIONS_PATH, VPINFE_INI_PATH, get_tables_path
 from managerui.services import table_index_service
 
@@ -296,8 +297,10 @@ def associate_vps_to_folder(
         raise FileNotFoundError(f"No .vpx found in {table_folder}")
 
     vpx_file = vpx_files[0]
-    parser = VPXParser()
+    parse_cache = VPXParseCache(VPX_PARSE_CACHE_PATH)
+    parser = VPXParser(cache=parse_cache)
     vpxdata = parser.singleFileExtract(str(vpx_file))
+    parse_cache.save()
 
     meta_path = table_folder / f"{table_folder.name}.info"
     meta = MetaConfig(str(meta_path))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Time joypageup/joypagedown presses (API.get_page_index) over a synthetic library.
+
+    python scripts/bench_paging.py                      # this checkout
+    python scripts/bench_paging.py --tree /tmp/before   # another checkout, e.g. a worktree
+                                                        # of the commit before a change
+
+Two libraries are timed: every title under one letter (alpha paging finds a single
+group and falls back to numeric steps, the case where a press used to scan the whole
+view), and titles spread over the alphabet. Each run presses "next" twice and "prev"
+once, in turn, from the top of the A-Z view. Needs a checkout with the table store
+(frontend/table_store.py).
+"""
+import argparse
+import configparser
+import random
+import sys
+import time
+import types
+from pathlib import Path
+from unittest import mock
+
+MANUFACTURERS = ("Bally", "Williams", "Stern", "Gottlieb", "Data East")
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+
+def _tables(count, spread):
+    from common.table import Table
+
+    rng = random.Random(1)
+    tables = []
+    for i in range(count):
+        prefix = f"{rng.choice(LETTERS)}{i} " if spread else ""
+        name = f"{prefix}Table {i} ({rng.choice(MANUFACTURERS)} {rng.randint(1970, 2020)})"
+        table = Table(tableDirName=name, fullPathTable=f"/home/user/tables/{name}")
+        table.load_meta({
+            "Info": {"Title": name, "Manufacturer": rng.choice(MANUFACTURERS), "Year": str(rng.randint(1970, 2020))},
+            "User": {"Rating": rng.randint(0, 5)},
+        })
+        tables.append(table)
+    return tables
+
+
+def _time_presses(tables, presses):
+    from frontend.api import API
+    from frontend.table_store import TableStore
+
+    store = TableStore(loader=lambda: list(tables))
+    parser = configparser.ConfigParser()
+    parser.read_dict({"Input": {"pagingtype": "alpha", "pagingsize": "10"}})
+    api = API.__new__(API)
+    api._iniConfig = types.SimpleNamespace(config=parser)
+    api.filteredTables = store.default_view()
+    api.current_sort = "Alpha"
+
+    with mock.patch("frontend.api.get_table_store", return_value=store):
+        api.get_page_index(0, "next")  # the first press pays for anything kept with the view
+        index = 0
+        started = time.perf_counter()
+        for i in range(presses):
+            index = api.get_page_index(index, "next" if i % 3 else "prev")
+        elapsed = time.perf_counter() - started
+    return elapsed / presses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=5000, help="Library size (default 5000)")
+    parser.add_argument("--presses", type=int, default=2000, help="Presses timed per library (default 2000)")
+    parser.add_argument("--tree", type=Path, default=Path(__file__).resolve().parent.parent,
+                        help="Checkout to import VPinFE from (default: this one)")
+    args = parser.parse_args()
+    sys.path.insert(0, str(args.tree.resolve()))
+
+    print(f"{args.tree.resolve()}: {args.tables} tables, {args.presses} presses")
+    for label, spread in (("one letter group", False), ("titles A-Z, 0-9", True)):
+        per_press = _time_presses(_tables(args.tables, spread), args.presses)
+        print(f"  {label:18s} {per_press * 1e6:8.1f} us/press")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Time VPSdb name lookups: the old SequenceMatcher scan against VPSNameIndex.lookup.
+
+    python scripts/bench_vpsdb_match.py                      # this checkout
+    python scripts/bench_vpsdb_match.py --tree /tmp/other    # another checkout, e.g. a worktree
+
+A synthetic VPSdb (12,000 entries by default) is queried with folder-style names,
+manufacturers and years, some misspelled and some with no entry to find. The scan is the
+loop VPSdb.lookupName ran before the index, copied here so any checkout can be compared
+against it. The index time includes building it. Every query's result is checked to be
+the same entry from both. Needs a checkout with common/vpsdb_match.py.
+"""
+import argparse
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+WORDS = (
+    "Attack", "Mars", "Medieval", "Madness", "Addams", "Family", "Twilight", "Zone", "Monster",
+    "Bash", "Cactus", "Canyon", "Theatre", "Magic", "Scared", "Stiff", "Fish", "Tales", "Black",
+    "Knight", "Space", "Shuttle", "Xenon", "Pirates", "Champion", "Pub", "Road", "Show", "Star",
+    "Trek", "Jungle", "Lord", "Eight", "Ball", "Deluxe", "Flash", "Gordon", "Fireball", "Party",
+)
+MANUFACTURERS = (
+    "Bally", "Williams", "Stern", "Gottlieb", "Data East", "Bally Midway", "Sega", "Zaccaria",
+    "Atari", "Chicago Coin", "Game Plan", "Premier", "Capcom", "Jersey Jack Pinball", "Spooky",
+)
+
+
+def _scan(data, name, manufacturer, year):
+    for table in data:
+        if SequenceMatcher(None, name.lower(), table["name"].lower()).ratio() < 0.8:
+            continue
+        if SequenceMatcher(None, manufacturer.lower(), table["manufacturer"].lower()).ratio() < 0.8:
+            continue
+        if SequenceMatcher(None, str(year), str(table["year"])).ratio() >= 0.8:
+            return table
+    return None
+
+
+def _misspell(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 2)):
+        pos = rng.randrange(len(chars))
+        if rng.random() < 0.5:
+            del chars[pos]
+        else:
+            chars.insert(pos, rng.choice("aeiou"))
+    return "".join(chars) or text
+
+
+def _database(count):
+    rng = random.Random(1)
+    return [
+        {
+            "id": str(i),
+            "name": " ".join(rng.sample(WORDS, rng.randint(1, 3))),
+            "manufacturer": rng.choice(MANUFACTURERS),
+            "year": rng.randint(1950, 2024),
+        }
+        for i in range(count)
+    ]
+
+
+def _queries(data, count):
+    rng = random.Random(2)
+    queries = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            table = rng.choice(data)
+            queries.append((_misspell(rng, table["name"]), table["manufacturer"], table["year"]))
+        else:
+            queries.append((" ".join(rng.sample(WORDS, 4)), rng.choice(MANUFACTURERS), rng.randint(1950, 2024)))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=12000, help="VPSdb size (default 12000)")
+    parser.add_argument("--queries", type=int, default=50,
+                        help="Lookups timed (default 50; the scan takes a few hundred ms each)")
+    parser.add_argument("--tree", type=Path, default=Path(__file__).resolve().parent.parent,
+                        help="Checkout to import VPinFE from (default: this one)")
+    args = parser.parse_args()
+    sys.path.insert(0, str(args.tree.resolve()))
+    from common.vpsdb_match import VPSNameIndex
+
+    data = _database(args.entries)
+    queries = _queries(data, args.queries)
+    print(f"{args.tree.resolve()}: {args.entries} entries, {args.queries} queries")
+
+    started = time.perf_counter()
+    scanned = [_scan(data, *query) for query in queries]
+    scan_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = VPSNameIndex(data)
+    indexed = [index.lookup(*query) for query in queries]
+    index_time = time.perf_counter() - started
+
+    mismatches = sum(a is not b for a, b in zip(scanned, indexed))
+    found = sum(table is not None for table in scanned)
+    print(f"  linear scan {scan_time:8.2f} s {scan_time / args.queries * 1e3:8.2f} ms/lookup")
+    print(f"  index       {index_time:8.2f} s {index_time / args.queries * 1e3:8.2f} ms/lookup (with build)")
+    print(f"  {found} found, {mismatches} results differ")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
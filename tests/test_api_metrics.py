@@ -0,0 +1,41 @@
+import unittest
+
+from frontend.api_metrics import ApiMetrics
+
+
+class TestApiMetrics(unittest.TestCase):
+    def test_counts_latency_and_payload_per_method(self) -> None:
+        metrics = ApiMetrics()
+        for execution in (0.003, 0.004, 0.040):
+            metrics.record("get_tables", 0.0002, execution, 1000)
+        metrics.record("get_theme_config", 0.0, 0.0001, 20, error=True)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(list(snapshot["methods"]), ["get_tables", "get_theme_config"])
+        tables = snapshot["methods"]["get_tables"]
+        self.assertEqual((tables["calls"], tables["errors"]), (3, 0))
+        self.assertEqual(tables["execution"]["p50_ms"], 5)
+        self.assertEqual(tables["execution"]["p95_ms"], 40.0)  # capped at the slowest call
+        self.assertEqual(tables["queue_wait"]["p50_ms"], 0.2)
+        self.assertEqual(sum(tables["execution"]["buckets"]), 3)
+        self.assertEqual((tables["avg_response_bytes"], tables["max_response_bytes"]), (1000, 1000))
+        self.assertEqual(snapshot["methods"]["get_theme_config"]["errors"], 1)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()["methods"], {})
+
+    def test_slow_calls_are_logged_only_over_the_threshold(self) -> None:
+        metrics = ApiMetrics()
+        with self.assertNoLogs("vpinfe.frontend.api_metrics", level="WARNING"):
+            metrics.record("get_tables", 0.1, 0.5, 10)
+
+        metrics.slow_call_ms = 100
+        with self.assertNoLogs("vpinfe.frontend.api_metrics", level="WARNING"):
+            metrics.record("get_tables", 0.01, 0.05, 10)
+        with self.assertLogs("vpinfe.frontend.api_metrics", level="WARNING") as logs:
+            metrics.record("launch_table", 0.06, 0.05, 10, window_name="table")
+        self.assertIn("launch_table from 'table'", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
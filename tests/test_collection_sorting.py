@@ -3,7 +3,10 @@ from pathlib import Path
 from tempfile import TemporaryDirectory
 from types import SimpleNamespace
 
+from common.table import Table
+from common.table_metadata import table_keys
 from common.vpxcollections import VPXCollections
+from frontend.table_state import apply_sort
 
 from frontend.api import API
 
@@ -131,6 +134,37 @@ class TestCollectionSorting(unittest.TestCase):
             ["Short", "Medium", "Long"],
         )
 
+    def test_descending_number_sort_keeps_ties_in_title_order(self) -> None:
+        tables = [
+            _table("Charlie", "vps-1", start_count=2),
+            _table("Alpha", "vps-2", start_count=2),
+            _table("Bravo", "vps-3", start_count=5),
+        ]
+
+        apply_sort(tables, "Highest StartCount", "Descending")
+
+        self.assertEqual(
+            [table.metaConfig["Info"]["Title"] for table in tables],
+            ["Bravo", "Alpha", "Charlie"],
+        )
+
+    def test_table_keys_are_cached_until_the_metadata_is_replaced(self) -> None:
+        table = Table(metaConfig={"Info": {"Title": "The Getaway", "Year": 1992}, "User": {"Rating": 9}})
+
+        keys = table_keys(table)
+        self.assertIs(table_keys(table), keys)
+        self.assertEqual((keys.title, keys.sort_key, keys.group), ("Getaway, The", "getaway, the", "G"))
+        self.assertEqual((keys.year, keys.rating, keys.numeric["LastRun"]), ("1992", 5, -1))
+
+        table.metaConfig = {"Info": {"Title": "24"}, "User": {"LastRun": "42"}}
+        keys = table_keys(table)
+        self.assertEqual((keys.title, keys.first_char, keys.group), ("24", "2", "#"))
+        self.assertEqual(keys.numeric["LastRun"], 42)
+
+        table.metaConfig["Info"]["Title"] = "Xenon"
+        table.invalidate_keys()
+        self.assertEqual(table_keys(table).title, "Xenon")
+
     def test_filter_collections_default_to_descending_order(self) -> None:
         with TemporaryDirectory() as tmp:
             ini_path = Path(tmp) / "collections.ini"
@@ -2,6 +2,8 @@ import os
 import configparser
 import json
 import unittest
+import zipfile
+from io import BytesIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from types import SimpleNamespace
@@ -11,7 +13,7 @@ from common.config_access import DisplayConfig, MediaConfig, NetworkConfig, Sett
 from common.external_service import find_named_path, import_module_from_path
 from common.jobs import JobReporter
 from common.media_paths import apply_media_paths, media_filename_map, table_media_payload
-from common.metadata_service import claim_media_for_table
+from common.metadata_service import build_metadata, claim_media_for_table
 from common.standalonescripts import StandaloneScripts
 from common.table_metadata import table_themes, table_title, table_type
 from common.table_repository import table_to_row
@@ -80,6 +82,25 @@ class TestCommonArchitecture(unittest.TestCase):
             self.assertEqual(store.installed_version("ExampleTheme"), "1.2.3")
             self.assertTrue(store.is_version_newer("1.2.4", "1.2.3"))
 
+    def test_theme_updates_can_be_staged_and_installed_later(self) -> None:
+        with TemporaryDirectory() as tmp:
+            themes_dir = Path(tmp) / "themes"
+            installed = themes_dir / "Revolution"
+            installed.mkdir(parents=True)
+            (installed / "manifest.json").write_text(json.dumps({"version": "1.0.0"}), encoding="utf-8")
+            archive = BytesIO()
+            with zipfile.ZipFile(archive, "w") as handle:
+                handle.writestr("vpinfe-theme-revolution-master/manifest.json", json.dumps({"version": "1.1.0"}))
+
+            store = ThemeInstallStore(str(themes_dir), str(Path(tmp) / "updates"))
+            store.stage_zip("Revolution", "https://github.com/example/vpinfe-theme-revolution", archive)
+            self.assertEqual(store.installed_version("Revolution"), "1.0.0")
+
+            self.assertEqual(store.install_staged(), ["Revolution"])
+            self.assertEqual(store.installed_version("Revolution"), "1.1.0")
+            self.assertEqual(os.listdir(store.updates_dir), [])
+            self.assertEqual(store.install_staged(), [])
+
     def test_table_parser_accessors_return_copies(self) -> None:
         parser = TableParser.__new__(TableParser)
         parser.tables = [SimpleNamespace(name="one")]
@@ -266,5 +287,58 @@ class TestCommonArchitecture(unittest.TestCase):
             self.assertFalse(table_to_row(by_name["No B2S (Bally 1991)"])["b2s_exists"])
 
 
+    def test_parallel_metadata_build_matches_a_serial_one(self) -> None:
+        from tests.test_vpxparser import _write_vpx
+
+        class FakeVPSdb:
+            def __init__(self, *_args) -> None:
+                pass
+
+            def __len__(self) -> int:
+                return 1
+
+            def parseTableNameFromDir(self, name):
+                return {"name": name.split(" (")[0], "manufacturer": "Bally", "year": "1990"}
+
+            def lookupName(self, name, manufacturer, year):
+                if name.startswith("Unknown"):
+                    return None
+                return {"id": f"id-{name}", "name": name, "manufacturer": manufacturer, "year": year}
+
+            def downloadMediaForTable(self, table, table_id, metaConfig=None):
+                raise KeyError(table_id)
+
+        def run(root, jobs):
+            logs, progress = [], []
+            config = _FakeIni()
+            config.config.read_dict({"Settings": {"tablerootdir": str(root)}})
+            with mock.patch("common.metadata_service.VPSdb", FakeVPSdb), \
+                    mock.patch("common.metadata_service.VPX_PARSE_CACHE_PATH", root.parent / f"cache{jobs}.json"):
+                result = build_metadata(
+                    iniconfig=config, jobs=jobs, log_cb=logs.append,
+                    progress_cb=lambda current, total, message: progress.append((current, total, message)),
+                )
+            infos = {
+                path.name: json.loads(path.read_text(encoding="utf-8"))["Info"]
+                for path in sorted(root.glob("*/*.info"))
+            }
+            return result, logs, progress, infos
+
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp) / "tables"
+            for i in range(6):
+                name = f"{'Unknown' if i == 2 else 'Table'} {i} (Bally 1990)"
+                (root / name).mkdir(parents=True)
+                _write_vpx(root / name / f"{name}.vpx", f'Const cGameName = "rom{i}"', f"Table {i}")
+            outputs = []
+            for jobs in (1, 4):
+                for info in root.glob("*/*.info"):
+                    info.unlink()
+                outputs.append(run(root, jobs))
+
+            self.assertEqual(outputs[0][0], {"found": 6, "not_found": 1})
+            self.assertEqual(outputs[0], outputs[1])
+            self.assertEqual(outputs[1][3]["Table 5 (Bally 1990).info"]["Rom"], "rom5")
+
 if __name__ == "__main__":
     unittest.main()
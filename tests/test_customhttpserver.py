@@ -1,6 +1,19 @@
+import http.client
+import io
+import os
+import socket
+import time
 import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-from frontend.customhttpserver import CustomHTTPServer
+from PIL import Image
+
+from common.image_derivatives import ImageDerivativeCache
+from common.mp4_faststart import FaststartCache, analyze
+from frontend.customhttpserver import CustomHTTPServer, MountTable
+from tests.test_mp4_faststart import write_mp4
 
 
 class TestCustomHttpServer(unittest.TestCase):
@@ -27,3 +40,286 @@ class TestCustomHttpServer(unittest.TestCase):
         updated = handler._inject_base_tag(html, "https://pinballprimer.github.io/paddock_GR0W9.html")
 
         self.assertTrue(updated.startswith('<head><base href="https://pinballprimer.github.io/paddock_GR0W9.html"></head>'))
+
+
+class TestCustomHttpServerCaching(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = TemporaryDirectory()
+        root = Path(cls._tmp.name)
+        (root / "tables" / "Example" / "medias").mkdir(parents=True)
+        (root / "web").mkdir()
+        cls.wheel = root / "tables" / "Example" / "medias" / "wheel.png"
+        (root / "web" / "app.js").write_text("console.log(1);", encoding="utf-8")
+        cls.image_cache = ImageDerivativeCache(root / "derivatives")
+        cls.faststart_cache = FaststartCache(root / "faststart", remux_in_background=False)
+        cls.server = CustomHTTPServer(
+            {"/tables/": root / "tables", "/web/": root / "web"},
+            image_cache=cls.image_cache, faststart_cache=cls.faststart_cache,
+        )
+        cls.server.start_file_server(port=0)
+        cls.port = cls.server.file_server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.stop_file_server()
+        cls._tmp.cleanup()
+
+    def setUp(self) -> None:
+        self.wheel.write_bytes(b"png-bytes" * 100)
+
+    def _get(self, path, **headers):
+        headers = {key.replace("_", "-"): value for key, value in headers.items()}
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            return response, response.read()
+        finally:
+            conn.close()
+
+    def test_validators_and_per_mount_cache_policy(self) -> None:
+        response, body = self._get("/tables/Example/medias/wheel.png")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.wheel.read_bytes())
+        self.assertTrue(response.getheader("ETag").startswith('"'))
+        self.assertIsNotNone(response.getheader("Last-Modified"))
+        self.assertIn("stale-while-revalidate", response.getheader("Cache-Control"))
+
+        response, _ = self._get("/web/app.js")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+
+        response, _ = self._get("/web/missing.js")
+        self.assertEqual(response.status, 404)
+        self.assertIsNone(response.getheader("Cache-Control"))
+
+    def test_conditional_requests_get_304_until_the_file_changes(self) -> None:
+        first, _ = self._get("/tables/Example/medias/wheel.png")
+        etag = first.getheader("ETag")
+
+        response, body = self._get("/tables/Example/medias/wheel.png", **{"If-None-Match": f'W/"x", {etag}'})
+        self.assertEqual((response.status, body), (304, b""))
+        self.assertEqual(response.getheader("ETag"), etag)
+
+        response, _ = self._get("/tables/Example/medias/wheel.png", **{"If-Modified-Since": first.getheader("Last-Modified")})
+        self.assertEqual(response.status, 304)
+
+        response, _ = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-9", **{"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+
+        self.wheel.write_bytes(b"new-png")
+        st = self.wheel.stat()
+        os.utime(self.wheel, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+        response, body = self._get("/tables/Example/medias/wheel.png", **{"If-None-Match": etag})
+        self.assertEqual((response.status, body), (200, b"new-png"))
+        self.assertNotEqual(response.getheader("ETag"), etag)
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-2")
+        self.assertEqual((response.status, body), (206, b"new"))
+        self.assertEqual(response.getheader("ETag"), self._get("/tables/Example/medias/wheel.png")[0].getheader("ETag"))
+
+    def test_full_and_single_range_bodies(self) -> None:
+        data = bytes(range(256)) * 40
+        self.wheel.write_bytes(data)
+
+        response, body = self._get("/tables/Example/medias/wheel.png")
+        self.assertEqual((response.status, body), (200, data))
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+
+        for header, expected, content_range in (
+            ("bytes=100-199", data[100:200], "bytes 100-199/10240"),
+            ("bytes=10000-", data[10000:], "bytes 10000-10239/10240"),
+            ("bytes=-40", data[-40:], "bytes 10200-10239/10240"),
+            ("bytes=10200-99999", data[10200:], "bytes 10200-10239/10240"),
+        ):
+            with self.subTest(header=header):
+                response, body = self._get("/tables/Example/medias/wheel.png", Range=header)
+                self.assertEqual((response.status, body), (206, expected))
+                self.assertEqual(response.getheader("Content-Range"), content_range)
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="bytes=20000-")
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader("Content-Range"), "bytes */10240")
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="lines=1-2")
+        self.assertEqual((response.status, body), (200, data))
+
+    def test_multiple_ranges_come_back_as_multipart(self) -> None:
+        data = bytes(range(256)) * 40
+        self.wheel.write_bytes(data)
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-9, 20000-, -5")
+        self.assertEqual(response.status, 206)
+        ctype = response.getheader("Content-Type")
+        self.assertTrue(ctype.startswith("multipart/byteranges; boundary="))
+        self.assertEqual(int(response.getheader("Content-Length")), len(body))
+        boundary = ctype.split("boundary=", 1)[1].encode()
+
+        parts = body.split(b"--" + boundary)
+        self.assertEqual(parts[-1], b"--\r\n")
+        payloads = []
+        for part in parts[1:-1]:
+            head, _, payload = part.partition(b"\r\n\r\n")
+            self.assertIn(b"Content-Type: image/png", head)
+            payloads.append((head.split(b"Content-Range: ")[1].decode(), payload[:-2]))
+        self.assertEqual(payloads, [("bytes 0-9/10240", data[:10]), ("bytes 10235-10239/10240", data[-5:])])
+
+    def test_if_range_sends_the_whole_file_when_the_copy_is_stale(self) -> None:
+        first, body = self._get("/tables/Example/medias/wheel.png")
+        etag, last_modified = first.getheader("ETag"), first.getheader("Last-Modified")
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-2", If_Range=etag)
+        self.assertEqual((response.status, body), (206, b"png"))
+        response, _ = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-2", If_Range=last_modified)
+        self.assertEqual(response.status, 206)
+
+        response, body = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-2", If_Range='"stale"')
+        self.assertEqual((response.status, body), (200, self.wheel.read_bytes()))
+        response, _ = self._get("/tables/Example/medias/wheel.png", Range="bytes=0-2", If_Range=f"W/{etag}")
+        self.assertEqual(response.status, 200)
+
+    def test_requests_share_one_keep_alive_connection(self) -> None:
+        before = self.server.get_stats()["requests"]
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            statuses = []
+            for method, path, headers in (
+                ("GET", "/tables/Example/medias/wheel.png", {}),
+                ("GET", "/tables/Example/medias/missing.png", {}),
+                ("OPTIONS", "/tables/Example/medias/wheel.png", {}),
+                ("GET", "/tables/Example/medias/wheel.png", {"Range": "bytes=0-2"}),
+                ("HEAD", "/web/app.js", {}),
+            ):
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                statuses.append(response.status)
+                if len(statuses) == 1:
+                    sock = conn.sock
+                self.assertIs(conn.sock, sock)
+                self.assertEqual(response.version, 11)
+        finally:
+            conn.close()
+
+        self.assertEqual(statuses, [200, 404, 200, 206, 200])
+        # The last request is counted just after its response goes out.
+        deadline = time.monotonic() + 2
+        while self.server.get_stats()["requests"] - before < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = self.server.get_stats()
+        self.assertEqual(stats["requests"] - before, 5)
+        self.assertGreaterEqual(stats["errors"], 1)
+        self.assertGreater(stats["requests_per_second"], 0)
+        self.assertGreaterEqual(stats["latency_ms"]["max"], stats["latency_ms"]["p50"])
+
+    def test_idle_connections_are_closed(self) -> None:
+        self.server.file_server.idle_timeout = 0.2
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+                started = time.monotonic()
+                self.assertEqual(sock.recv(1), b"")
+                self.assertLess(time.monotonic() - started, 4)
+        finally:
+            self.server.file_server.idle_timeout = CustomHTTPServer.IDLE_TIMEOUT
+
+    def test_image_derivatives_are_resized_once_and_revalidated(self) -> None:
+        Image.new("RGBA", (800, 400), (255, 0, 0, 128)).save(self.wheel, format="PNG")
+        url = "/tables/Example/medias/wheel.png?w=200&fmt=webp"
+
+        response, body = self._get(url)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "image/webp")
+        self.assertIsNone(response.getheader("Accept-Ranges"))
+        with Image.open(io.BytesIO(body)) as derived:
+            self.assertEqual((derived.format, derived.size, derived.mode), ("WEBP", (200, 100), "RGBA"))
+        etag = response.getheader("ETag")
+        self.assertNotEqual(etag, self._get("/tables/Example/medias/wheel.png")[0].getheader("ETag"))
+
+        with mock.patch.object(ImageDerivativeCache, "_render", side_effect=AssertionError("re-rendered")):
+            again, again_body = self._get(url, Range="bytes=0-1")
+            self.assertEqual((again.status, again_body), (200, body))
+            self.assertEqual(self._get(url, If_None_Match=etag)[0].status, 304)
+
+        response, body = self._get("/tables/Example/medias/wheel.png?h=50&fmt=png")
+        with Image.open(io.BytesIO(body)) as derived:
+            self.assertEqual(derived.size, (100, 50))
+
+        response, body = self._get("/tables/Example/medias/wheel.png?w=abc")
+        self.assertEqual((response.getheader("Content-Type"), body), ("image/png", self.wheel.read_bytes()))
+
+
+    def test_videos_are_sent_from_their_fast_start_copy_once_cached(self) -> None:
+        video = self.wheel.parent / "table.mp4"
+        write_mp4(video)
+        original = video.read_bytes()
+
+        response, body = self._get("/tables/Example/medias/table.mp4")
+        self.assertEqual(body, original)
+        original_etag = response.getheader("ETag")
+
+        _info, copy = self.faststart_cache.ensure(str(video))
+        response, body = self._get("/tables/Example/medias/table.mp4")
+        self.assertEqual(body, copy.read_bytes())
+        self.assertEqual(response.getheader("ETag"), f'{original_etag[:-1]}-fs"')
+        self.assertEqual(analyze(copy).status, "faststart")
+
+        response, body = self._get("/tables/Example/medias/table.mp4", Range="bytes=0-63", If_Range=response.getheader("ETag"))
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, copy.read_bytes()[:64])
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 0-63/{len(original)}")
+
+        response, _ = self._get("/tables/Example/medias/table.mp4", If_None_Match=original_etag)
+        self.assertEqual(response.status, 200)
+
+    def test_a_player_stays_on_the_layout_its_fresh_load_got(self) -> None:
+        video = self.wheel.parent / "attract.mp4"
+        write_mp4(video)
+        original = video.read_bytes()
+
+        response, body = self._get("/tables/Example/medias/attract.mp4", Range="bytes=0-")
+        self.assertEqual((response.status, body), (206, original))
+
+        # The copy appears mid-playback; the player's next range is an offset into the original.
+        _info, copy = self.faststart_cache.ensure(str(video))
+        response, body = self._get("/tables/Example/medias/attract.mp4", Range="bytes=100-")
+        self.assertEqual(body, original[100:])
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-{len(original) - 1}/{len(original)}")
+
+        # A fresh load gets the copy, and so do that player's later ranges.
+        response, body = self._get("/tables/Example/medias/attract.mp4", Range="bytes=0-")
+        self.assertEqual(body, copy.read_bytes())
+        response, body = self._get("/tables/Example/medias/attract.mp4", Range="bytes=100-")
+        self.assertEqual(body, copy.read_bytes()[100:])
+
+
+class TestImageDerivativeCache(unittest.TestCase):
+    def test_cache_is_trimmed_least_recently_used_first(self) -> None:
+        from common.image_derivatives import DerivativeSpec
+
+        with TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            sources = []
+            for i in range(4):
+                source = root / f"src{i}.png"
+                Image.new("RGB", (64, 64), (0, 128, 255)).save(source, format="PNG")
+                sources.append(source)
+            spec = DerivativeSpec(64, None, "png")
+            cache = ImageDerivativeCache(root / "cache")
+
+            first = cache.get(str(sources[0]), sources[0].stat(), spec)
+            cache.max_bytes = first.stat().st_size * 5 // 2
+            paths = [first]
+            for source in sources[1:]:
+                os.utime(paths[-1], (len(paths), len(paths)))  # older than anything made now
+                paths.append(cache.get(str(source), source.stat(), spec))
+
+            self.assertEqual([path.exists() for path in paths], [False, False, True, True])
+
+
+class TestMountTable(unittest.TestCase):
+    def test_prefixes_are_normalized_and_longest_first(self) -> None:
+        table = MountTable({"tables": "/a", "/tables/sub/": "/b", "/web": "/c"}, {"tables": "x"})
+
+        self.assertEqual([prefix for prefix, _root in table.mounts], ["/tables/sub/", "/tables/", "/web/"])
+        self.assertEqual(table.mount_points["/tables/"], os.path.abspath("/a"))
+        self.assertEqual(table.cache_policies, (("/tables/", "x"),))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import configparser
 import json
+import threading
 import types
 import os
 import unittest
@@ -10,7 +11,9 @@ from tempfile import TemporaryDirectory
 from unittest import mock
 
 from common import metadata_service, system_actions, table_play_service, table_report_service
-from frontend import config_api, realdmd_service, table_state, theme_api
+from common.table import Table
+from frontend import config_api, media_prefetch, realdmd_service, table_state, theme_api
+from tests.test_mp4_faststart import write_mp4
 
 
 class FrontendServiceTests(unittest.TestCase):
@@ -324,6 +327,85 @@ class FrontendServiceTests(unittest.TestCase):
             self.assertFalse(vpx_nvram.exists())
             self.assertTrue(info_nvram.exists())
 
+    def test_table_payloads_are_cached_windowed_and_diffable(self) -> None:
+        tables = []
+        for name in ("Alpha", "Bravo", "Charlie"):
+            table = Table(tableDirName=name, fullPathTable=f"/tables/{name}")
+            table.load_meta({"Info": {"Title": f"The {name}"}, "User": {"Rating": 1, "Score": {"rom": "x"}}})
+            tables.append(table)
+
+        full = table_state.tables_json(tables)
+        self.assertEqual(json.loads(full)[0]["meta"]["Info"]["Title"], "Alpha, The")
+        self.assertEqual(json.loads(full)[0]["meta"]["User"]["Score"], {"rom": "x"})
+        self.assertEqual(full, json.dumps(json.loads(full)))
+        fragment = tables[1].json_fragment
+        self.assertIsNotNone(fragment)
+
+        window = json.loads(table_state.tables_window_json(tables, 1, 1))
+        self.assertEqual((window["total"], window["offset"]), (3, 1))
+        self.assertEqual([row["tableDirName"] for row in window["tables"]], ["Bravo"])
+
+        since = window["version"]
+        self.assertEqual(json.loads(table_state.tables_since_json(tables, since, window["view"]))["changed"], [])
+
+        tables[2].metaConfig = {"Info": {"Title": "Charlie 2"}, "User": {"Rating": 5}}
+        self.assertIs(tables[1].json_fragment, fragment)
+        self.assertIsNone(tables[2].json_fragment)
+        diff = json.loads(table_state.tables_since_json(tables, since, window["view"]))
+        self.assertFalse(diff["full"])
+        self.assertEqual([(entry["index"], entry["table"]["meta"]["User"]["Rating"]) for entry in diff["changed"]], [(2, 5)])
+
+        reordered = json.loads(table_state.tables_since_json(tables[::-1], diff["version"], diff["view"]))
+        self.assertTrue(reordered["full"])
+        self.assertEqual(len(reordered["changed"]), 3)
+
+    def test_prefetcher_shares_the_asset_servers_faststart_cache(self) -> None:
+        with TemporaryDirectory() as temp_dir, mock.patch.object(media_prefetch, "_prefetcher", None):
+            cache = media_prefetch.FaststartCache(Path(temp_dir), remux_in_background=False)
+            prefetcher = media_prefetch.get_media_prefetcher()
+            self.assertIs(media_prefetch.get_media_prefetcher(cache), prefetcher)
+            self.assertIs(prefetcher.faststart_cache, cache)
+
+    def test_prefetch_neighbours_wrap_around_nearest_first(self) -> None:
+        self.assertEqual(media_prefetch.neighbour_indices(0, 2, 10), [1, 9, 2, 8])
+        self.assertEqual(media_prefetch.neighbour_indices(1, 5, 4), [2, 0, 3])
+        self.assertEqual(media_prefetch.neighbour_indices(0, 3, 1), [])
+
+    def test_prefetch_warms_neighbour_media_and_counts_hits(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            tables = []
+            for i in range(5):
+                wheel = root / f"wheel{i}.png"
+                wheel.write_bytes(b"png" * 100)
+                video = root / f"table{i}.mp4"
+                write_mp4(video)
+                tables.append(types.SimpleNamespace(WheelImagePath=str(wheel), TableVideoPath=str(video), BGImagePath=None))
+            prefetcher = media_prefetch.MediaPrefetcher(
+                media_prefetch.FaststartCache(root / "faststart", remux_in_background=False)
+            )
+
+            def wait():
+                for _ in range(200):
+                    stats = prefetcher.stats()
+                    if stats["pending"] == 0 and stats["hits"] + stats["misses"] + stats["errors"] >= expected:
+                        return stats
+                    threading.Event().wait(0.01)
+                self.fail(f"prefetch did not finish: {prefetcher.stats()}")
+
+            self.assertEqual(prefetcher.prefetch_tables(tables, 0, 1), {"tables": 2, "files": 4})
+            expected = 4
+            stats = wait()
+            self.assertEqual((stats["misses"], stats["hits"], stats["errors"]), (4, 0, 0))
+            self.assertGreater(stats["bytes_warmed"], 0)
+
+            # Two steps right: table 1 is still warm, table 3 is new.
+            prefetcher.prefetch_tables(tables, 2, 1)
+            expected = 8
+            stats = wait()
+            self.assertEqual((stats["misses"], stats["hits"]), (6, 2))
+            self.assertEqual(stats["hit_rate"], 0.25)
+
 
 if __name__ == "__main__":
     unittest.main()
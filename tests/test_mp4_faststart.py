@@ -0,0 +1,164 @@
+import struct
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from common.mp4_faststart import (
+    FASTSTART,
+    MOOV_AT_END,
+    NOT_MP4,
+    UNSUPPORTED,
+    FaststartCache,
+    _shift_chunk_offsets,
+    analyze,
+    read_top_level_atoms,
+    write_faststart,
+)
+
+
+def _atom(kind, *payload):
+    body = b"".join(payload)
+    return struct.pack(">I4s", len(body) + 8, kind) + body
+
+
+def _offset_table(kind, offsets):
+    fmt = ">Q" if kind == b"co64" else ">I"
+    return _atom(kind, struct.pack(">II", 0, len(offsets)), *(struct.pack(fmt, o) for o in offsets))
+
+
+def _trak(kind, offsets):
+    return _atom(b"trak", _atom(b"tkhd", b"\0" * 20), _atom(b"mdia", _atom(b"minf", _atom(b"stbl", _offset_table(kind, offsets)))))
+
+
+def write_mp4(path, chunks=(b"frame-one", b"frame-two", b"audio-one"), moov_last=True, wide_mdat=False):
+    """A minimal MP4 whose chunk offset tables point at `chunks` in mdat.
+
+    Returns the chunk offsets as they are in the file written. The video track uses stco
+    and the audio track co64, so both tables are rewritten.
+    """
+    ftyp = _atom(b"ftyp", b"isom", b"\0\0\0\1", b"isomavc1")
+    free = _atom(b"free", b"\0" * 4)
+    payload = b"".join(chunks)
+    if wide_mdat:
+        mdat = struct.pack(">I4sQ", 1, b"mdat", len(payload) + 16) + payload
+    else:
+        mdat = _atom(b"mdat", payload)
+
+    def moov(mdat_at):
+        offsets, pos = [], mdat_at + (16 if wide_mdat else 8)
+        for chunk in chunks:
+            offsets.append(pos)
+            pos += len(chunk)
+        return _atom(b"moov", _atom(b"mvhd", b"\0" * 20), _trak(b"stco", offsets[:2]), _trak(b"co64", offsets[2:])), offsets
+
+    if moov_last:
+        moov_bytes, offsets = moov(len(ftyp) + len(free))
+        data = ftyp + free + mdat + moov_bytes
+    else:
+        size = len(moov(0)[0])
+        moov_bytes, offsets = moov(len(ftyp) + size + len(free))
+        data = ftyp + moov_bytes + free + mdat
+    Path(path).write_bytes(data)
+    return offsets
+
+
+def _chunk_offsets(data):
+    """Every offset in the stco/co64 tables, in file order."""
+    offsets = []
+    pos = data.index(b"moov") - 4
+    end = pos + struct.unpack_from(">I", data, pos)[0]
+    while True:
+        hits = [(data.find(kind, pos, end), kind) for kind in (b"stco", b"co64")]
+        hits = [hit for hit in hits if hit[0] >= 0]
+        if not hits:
+            return offsets
+        at, kind = min(hits)
+        count = struct.unpack_from(">I", data, at + 8)[0]
+        fmt, width = (">Q", 8) if kind == b"co64" else (">I", 4)
+        offsets += [struct.unpack_from(fmt, data, at + 12 + i * width)[0] for i in range(count)]
+        pos = at + 12 + count * width
+
+
+class TestMp4Faststart(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_analysis_finds_the_moov(self) -> None:
+        write_mp4(self.root / "end.mp4")
+        write_mp4(self.root / "front.mp4", moov_last=False)
+        (self.root / "other.mp4").write_bytes(b"not a video at all")
+
+        self.assertEqual(analyze(self.root / "end.mp4").status, MOOV_AT_END)
+        self.assertEqual(analyze(self.root / "front.mp4").status, FASTSTART)
+        self.assertEqual(analyze(self.root / "other.mp4").status, NOT_MP4)
+
+    def test_relocated_offsets_point_at_the_same_chunks(self) -> None:
+        chunks = (b"frame-one", b"frame-two", b"audio-one")
+        for wide_mdat in (False, True):
+            with self.subTest(wide_mdat=wide_mdat):
+                src, dst = self.root / "src.mp4", self.root / "dst.mp4"
+                write_mp4(src, chunks, wide_mdat=wide_mdat)
+                write_faststart(src, dst)
+
+                data = dst.read_bytes()
+                self.assertEqual(dst.stat().st_size, src.stat().st_size)
+                with open(dst, "rb") as f:
+                    kinds = [atom.kind for atom in read_top_level_atoms(f, len(data))]
+                self.assertEqual(kinds, [b"ftyp", b"free", b"moov", b"mdat"])
+                self.assertEqual(analyze(dst).status, FASTSTART)
+                offsets = _chunk_offsets(data)
+                self.assertEqual([data[o:o + len(c)] for o, c in zip(offsets, chunks)], list(chunks))
+
+    def test_offsets_that_would_overflow_stco_are_refused(self) -> None:
+        moov = bytearray(_atom(b"moov", _trak(b"stco", [0xFFFFFFF0])))
+        with self.assertRaisesRegex(ValueError, "stco"):
+            _shift_chunk_offsets(moov, 8, len(moov), moved_from=2**33, moved_to=0, delta=0x100)
+
+    def test_compressed_moov_is_left_alone(self) -> None:
+        src = self.root / "src.mp4"
+        write_mp4(src)
+        src.write_bytes(src.read_bytes().replace(b"mvhd", b"cmov"))
+        cache = FaststartCache(self.root / "cache", remux_in_background=False)
+
+        info, copy = cache.ensure(src)
+        self.assertEqual((info.status, info.reason, copy), (UNSUPPORTED, "compressed moov", None))
+        self.assertEqual(list((self.root / "cache").glob("*/*")), [])
+
+    def test_cache_makes_one_copy_and_lookup_finds_it(self) -> None:
+        src = self.root / "table.mp4"
+        write_mp4(src)
+        cache = FaststartCache(self.root / "cache", remux_in_background=False)
+        st = src.stat()
+        self.assertIsNone(cache.lookup(str(src), st))
+
+        info, copy = cache.ensure(str(src))
+        self.assertEqual(info.status, MOOV_AT_END)
+        self.assertEqual(cache.lookup(str(src), st), copy)
+        self.assertEqual(analyze(copy).status, FASTSTART)
+        self.assertEqual(cache.ensure(str(src))[1], copy)
+
+        front = self.root / "front.mp4"
+        write_mp4(front, moov_last=False)
+        self.assertEqual(cache.ensure(str(front)), (analyze(front), None))
+
+    def test_a_miss_queues_one_background_remux(self) -> None:
+        src = self.root / "table.mp4"
+        write_mp4(src)
+        cache = FaststartCache(self.root / "cache")
+        st = src.stat()
+
+        self.assertIsNone(cache.lookup(str(src), st))
+        deadline = time.monotonic() + 2
+        while (copy := cache.lookup(str(src), st)) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(copy)
+        self.assertEqual(analyze(copy).status, FASTSTART)
+
+
+if __name__ == "__main__":
+    unittest.main()
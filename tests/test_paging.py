@@ -4,7 +4,8 @@ from types import SimpleNamespace
 
 from frontend import input_api
 from frontend.api import API
-from frontend.table_state import page_jump_index
+from frontend.table_state import page_jump_index, paging_group_starts
+from frontend.table_store import TableStore
 
 
 def _table(title):
@@ -59,6 +60,53 @@ class TestPageJumpIndexAlpha(unittest.TestCase):
         self.assertEqual(result, 3)
 
 
+class TestPagingGroupStarts(unittest.TestCase):
+    def _walk(self, tables, index, direction):
+        # Paging as it was before the boundaries: step past the current group one
+        # table at a time, then rewind to the start of the group landed in.
+        keys = [(t.metaConfig["Info"]["Title"][0].upper() if t.metaConfig["Info"]["Title"][0].isalpha() else "#")
+                for t in tables]
+        count, step = len(keys), (1 if direction == "next" else -1)
+        pos = (index + step) % count
+        while keys[pos] == keys[index]:
+            pos = (pos + step) % count
+        if step < 0:
+            while keys[(pos - 1) % count] == keys[pos]:
+                pos = (pos - 1) % count
+        return pos
+
+    def test_starts_of_each_letter_group(self):
+        tables = _tables("24", "4x4", "Attack", "Avalanche", "Bally Hoo", "Cactus", "Comet", "Cyclone")
+        self.assertEqual(paging_group_starts(tables), (0, 2, 4, 5))
+        self.assertEqual(paging_group_starts(_tables("Attack", "Avalanche")), ())
+        self.assertEqual(paging_group_starts([]), ())
+
+    def test_matches_walking_the_titles(self):
+        lists = [
+            ("24", "4x4", "Attack", "Avalanche", "Bally Hoo", "Cactus", "Comet", "Cyclone"),
+            ("Cactus", "Bally Hoo", "Attack", "Avalanche"),
+            # Not title-ordered: the last and first runs are one group across the wrap.
+            ("Attack", "Bally Hoo", "Barracora", "Avalanche", "Airborne"),
+        ]
+        for titles in lists:
+            tables = _tables(*titles)
+            for index in range(len(tables)):
+                for direction in ("next", "prev"):
+                    with self.subTest(titles=titles, index=index, direction=direction):
+                        self.assertEqual(
+                            page_jump_index(tables, index, direction), self._walk(tables, index, direction)
+                        )
+
+    def test_store_keeps_the_starts_with_the_view(self):
+        store = TableStore(loader=lambda: _tables("Cactus", "Attack", "Bally Hoo"))
+        view = store.default_view()
+        misses = store.stats()["misses"]
+        first = store.paging_group_starts(view)
+        self.assertIs(store.paging_group_starts(view), first)
+        self.assertEqual(store.stats()["misses"], misses + 1)
+        self.assertEqual(store.paging_group_starts(tuple(view)[::-1]), (0, 1, 2))
+
+
 class TestPageJumpIndexNumeric(unittest.TestCase):
     def test_next_steps_by_page_size(self):
         tables = _tables(*[f"T{i:02d}" for i in range(30)])
@@ -42,6 +42,48 @@ class TestScoreParser(unittest.TestCase):
 
         self.assertIn(str(missing_path), str(ctx.exception))
 
+    def test_roms_are_loaded_on_first_use_and_compiled_to_a_snapshot(self) -> None:
+        with TemporaryDirectory() as temp_dir:
+            roms_path = Path(temp_dir) / "roms.json"
+            config_path = Path(temp_dir) / "vpinfe.ini"
+            roms_path.write_text(json.dumps({
+                "Matrix": {"scoretype": "HIGH SCORE", "decoder": "dummy"},
+                "twenty4_144": {"scoretype": "Leaderboard", "decoder": "dummy", "offsets": [1, 2, 3]},
+            }), encoding="utf-8")
+            config_path.write_text("[pinmame-score-parser]\nromsupdatesha = abc123\n", encoding="utf-8")
+            snapshot_path = score_parser.get_roms_snapshot_path(roms_path)
+
+            with mock.patch.object(score_parser, "USER_ROMS_PATH", roms_path), \
+                    mock.patch.object(score_parser, "USER_CONFIG_PATH", config_path), \
+                    mock.patch.object(score_parser, "_roms", None):
+                self.assertEqual(score_parser.resolve_rom_name("twenty4_150"), "twenty4_144")
+                self.assertEqual(score_parser.resolve_rom_name("MATRIX"), "Matrix")
+                self.assertTrue(snapshot_path.exists())
+                self.assertEqual(score_parser.get_roms().stamp[0], "abc123")
+
+                # A fresh process reads the snapshot rather than roms.json, one entry at a time.
+                score_parser._roms = None
+                with mock.patch.object(score_parser, "load_roms", side_effect=AssertionError("parsed roms.json")), \
+                        mock.patch.object(score_parser.json, "load", side_effect=AssertionError("parsed roms.json")):
+                    roms = score_parser.get_roms()
+                    self.assertEqual(roms._entries, {})
+                    self.assertEqual(score_parser.detect_score_type("twenty4_150"), "Leaderboard")
+                    self.assertEqual(list(roms._entries), ["twenty4_144"])
+                    self.assertEqual(roms["twenty4_144"]["offsets"], [1, 2, 3])
+
+                # A newly recorded release SHA compiles the file again.
+                config_path.write_text("[pinmame-score-parser]\nromsupdatesha = def456\n", encoding="utf-8")
+                score_parser._roms = None
+                self.assertEqual(score_parser.get_roms().stamp[0], "def456")
+
+    def test_roms_sha_is_read_where_the_updater_records_it(self) -> None:
+        from common import pinmame_score_parser_updater as updater
+
+        self.assertEqual(
+            (score_parser.ROMS_SHA_SECTION, score_parser.ROMS_SHA_KEY),
+            (updater.RELEASE_SECTION, updater.RELEASE_SHA_KEY),
+        )
+
     def test_result_to_jsonable_returns_direct_score_payload_for_scalar_scores(self) -> None:
         result = result_to_jsonable("agent777", 123456)
 
@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+from common.startup import StartupError, StartupPlan
+
+
+class TestStartupPlan(unittest.TestCase):
+    def test_independent_tasks_overlap_and_dependents_wait(self) -> None:
+        # Each of the first two tasks only returns once the other has started too.
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+        lock = threading.Lock()
+
+        def step(name, meet=False):
+            def run():
+                if meet:
+                    barrier.wait()
+                with lock:
+                    order.append(name)
+                return name.upper()
+            return run
+
+        plan = StartupPlan()
+        plan.add("tables", step("tables", meet=True))
+        plan.add("asset_server", step("asset_server", meet=True))
+        plan.add("ws_bridge", step("ws_bridge"), requires=("tables",))
+        plan.add("manager_ui", step("manager_ui"), requires=("tables", "asset_server"))
+
+        results = plan.run()
+        self.assertEqual(results["ws_bridge"], "WS_BRIDGE")
+        self.assertEqual(set(order[:2]), {"tables", "asset_server"})
+        self.assertEqual(set(order[2:]), {"ws_bridge", "manager_ui"})
+
+    def test_background_tasks_are_not_waited_for(self) -> None:
+        release, finished = threading.Event(), threading.Event()
+
+        def download():
+            release.wait(5)
+            finished.set()
+
+        plan = StartupPlan()
+        plan.add("roms_json", download, background=True)
+        plan.add("tables", lambda: 5000)
+
+        self.assertEqual(plan.run(), {"tables": 5000})
+        self.assertFalse(finished.is_set())
+        release.set()
+        self.assertTrue(finished.wait(5))
+
+    def test_a_background_task_can_wait_for_a_foreground_one(self) -> None:
+        order, finished = [], threading.Event()
+        plan = StartupPlan()
+        plan.add("theme_updates", lambda: order.append("theme_updates"))
+        plan.add("themes", lambda: order.append("themes") or finished.set(), background=True,
+                 requires=("theme_updates",))
+
+        plan.run()
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(order, ["theme_updates", "themes"])
+
+    def test_optional_failures_are_logged_and_startup_carries_on(self) -> None:
+        plan = StartupPlan()
+        plan.add("themes", lambda: 1 / 0, optional=True)
+        plan.add("windows", lambda: "ready", requires=("themes",))
+
+        with self.assertLogs("vpinfe.common.startup", level="ERROR"):
+            self.assertEqual(plan.run()["windows"], "ready")
+        self.assertIsInstance(plan.tasks["themes"].error, ZeroDivisionError)
+
+    def test_a_required_failure_stops_startup(self) -> None:
+        ran = []
+        plan = StartupPlan()
+        plan.add("tables", lambda: ran.append("tables") or 1 / 0)
+        plan.add("ws_bridge", lambda: ran.append("ws_bridge"), requires=("tables",))
+
+        with self.assertRaises(StartupError) as ctx:
+            plan.run()
+        self.assertIsInstance(ctx.exception.__cause__, ZeroDivisionError)
+        self.assertEqual(ran, ["tables"])
+
+    def test_requirements_must_be_declared_first_and_in_the_foreground(self) -> None:
+        plan = StartupPlan()
+        plan.add("roms_json", lambda: None, background=True)
+        with self.assertRaises(ValueError):
+            plan.add("ws_bridge", lambda: None, requires=("tables",))
+        with self.assertRaises(ValueError):
+            plan.add("scores", lambda: None, requires=("roms_json",))
+        with self.assertRaises(ValueError):
+            plan.add("roms_json", lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
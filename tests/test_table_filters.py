@@ -0,0 +1,124 @@
+import itertools
+import threading
+import unittest
+from types import SimpleNamespace
+
+from common.table import Table, meta_generation
+from common.tablelistfilters import TableFilterIndex, TableListFilters
+
+
+def _meta(title, themes, table_type, manufacturer, year, rating):
+    return {
+        "Info": {
+            "Title": title,
+            "Themes": themes,
+            "Type": table_type,
+            "Manufacturer": manufacturer,
+            "Year": year,
+        },
+        "User": {"Rating": rating},
+    }
+
+
+def _library():
+    rows = [
+        ("The Addams Family", ["Licensed", "Horror"], "SS", "Bally", 1992, 5),
+        ("Attack from Mars", ["Sci-Fi"], "SS", "Bally", 1995, 4),
+        ("24", ["Licensed"], "SS", "Stern", 2009, 2),
+        ("Big Hit", ["Sports"], "EM", "Gottlieb", 1977, 0),
+        ("Cactus Canyon", ["Western"], "SS", "Bally", 1998, 3),
+        ("Xenon", ["Sci-Fi"], "EM", "Bally", 1980, 3),
+        ("", [], "", "", "", 1),
+    ]
+    tables = []
+    for i, row in enumerate(rows):
+        table = Table(tableDirName=f"folder{i}")
+        table.load_meta(_meta(*row))
+        tables.append(table)
+    return tables
+
+
+class TestTableFilterIndex(unittest.TestCase):
+    CRITERIA = {
+        "letter": [None, "A", "a,x", "2", "#"],
+        "theme": [None, "Sci-Fi", "Licensed,Western"],
+        "table_type": [None, "SS", "EM"],
+        "manufacturer": [None, "Bally", "Stern,Gottlieb"],
+        "year": [None, "1992", "1977,2009"],
+        "rating": [None, "3", "0,5"],
+        "rating_or_higher": [False, True],
+    }
+
+    def _names(self, tables):
+        return [table.tableDirName for table in tables]
+
+    def test_index_matches_the_linear_filters(self) -> None:
+        tables = _library()
+        index = TableFilterIndex(tables)
+
+        for values in itertools.product(*self.CRITERIA.values()):
+            criteria = dict(zip(self.CRITERIA, values))
+            with self.subTest(**criteria):
+                self.assertEqual(
+                    self._names(TableListFilters(tables, index=index).apply_filters(**criteria)),
+                    self._names(TableListFilters(tables).apply_filters(**criteria)),
+                )
+
+        indexed = TableListFilters(tables, index=index)
+        linear = TableListFilters(tables)
+        self.assertEqual(indexed.get_available_letters(), linear.get_available_letters())
+        self.assertEqual(indexed.get_available_themes(), linear.get_available_themes())
+        self.assertEqual(indexed.get_available_types(), linear.get_available_types())
+        self.assertEqual(indexed.get_available_manufacturers(), linear.get_available_manufacturers())
+        self.assertEqual(indexed.get_available_years(), linear.get_available_years())
+
+    def test_edits_reach_the_index_without_a_rebuild(self) -> None:
+        tables = _library()
+        index = TableFilterIndex(tables)
+        options = index.options()
+        self.assertIs(index.options(), options)
+
+        tables[3].metaConfig = _meta("Big Hit", ["Sports"], "EM", "Williams", 1977, 5)
+
+        self.assertIsNot(index.options(), options)
+        self.assertIn("Williams", index.options()["manufacturers"])
+        self.assertNotIn("Gottlieb", index.options()["manufacturers"])
+        self.assertIn(3, index.matching_ids(rating="5"))
+
+    def test_concurrent_edits_each_move_the_generation_on(self) -> None:
+        tables = _library()
+        start = meta_generation()
+
+        def edit(table):
+            for _ in range(2000):
+                table.invalidate_keys()
+
+        threads = [threading.Thread(target=edit, args=(table,)) for table in tables]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(meta_generation(), start + 2000 * len(tables))
+        self.assertEqual(len({table.meta_version for table in tables}), len(tables))
+
+    def test_index_is_only_used_for_the_list_it_was_built_for(self) -> None:
+        tables = _library()
+        index = TableFilterIndex(tables)
+
+        self.assertIsNone(TableListFilters(list(tables), index=index).index)
+        self.assertIsNone(TableListFilters(tables[:-1], index=index).index)
+
+    def test_plain_objects_are_rechecked_on_every_query(self) -> None:
+        table = SimpleNamespace(metaConfig=_meta("Alpha", [], "SS", "Bally", 1990, 1))
+        tables = [table]
+        index = TableFilterIndex(tables)
+        self.assertEqual(index.matching_ids(manufacturer="Stern"), [])
+
+        table.metaConfig["Info"]["Manufacturer"] = "Stern"
+
+        self.assertEqual(index.matching_ids(manufacturer="Stern"), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
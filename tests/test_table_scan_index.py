@@ -0,0 +1,205 @@
+import configparser
+import json
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from common.table_metadata import load_table_meta, meta_file_path
+from common.table_scan_index import TableScanIndex
+from common.tableparser import TableParser
+
+
+def _touch_later(path: Path) -> None:
+    # Push the mtime well past the scan so a coarse filesystem clock cannot hide it.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+class TestTableScanIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name) / "tables"
+        self.root.mkdir()
+        self.index_path = Path(self._tmp.name) / "config" / "table_scan_index.json"
+
+    def _table(self, name: str, meta=None) -> Path:
+        table_dir = self.root / name
+        table_dir.mkdir()
+        (table_dir / f"{name}.vpx").write_text("", encoding="utf-8")
+        if meta is not None:
+            (table_dir / f"{name}.info").write_text(json.dumps(meta), encoding="utf-8")
+        return table_dir
+
+    def _parser(self) -> TableParser:
+        return TableParser(self.root, index_path=self.index_path)
+
+    def test_unchanged_library_is_rebuilt_from_the_index(self) -> None:
+        self._table("Alpha", {"Info": {"Title": "Alpha"}})
+        beta = self._table("Beta", {"Info": {"Title": "Beta"}})
+        (beta / "medias").mkdir()
+        (beta / "medias" / "wheel.png").write_bytes(b"png")
+        first = self._parser()
+
+        with mock.patch.object(TableParser, "_scan_table_dir", side_effect=AssertionError("rescanned")):
+            second = self._parser()
+
+        self.assertEqual(
+            [t.tableDirName for t in second.getAllTables()],
+            [t.tableDirName for t in first.getAllTables()],
+        )
+        by_name = {t.tableDirName: t for t in second.getAllTables()}
+        self.assertEqual(by_name["Alpha"].metaConfig["Info"]["Title"], "Alpha")
+        self.assertEqual(by_name["Beta"].WheelImagePath, str(beta / "medias" / "wheel.png"))
+
+    def test_only_changed_folders_are_read_again(self) -> None:
+        self._table("Alpha", {"Info": {"Title": "Alpha"}})
+        beta = self._table("Beta", {"Info": {"Title": "Beta"}})
+        (beta / "medias").mkdir()
+        self._parser()
+
+        (beta / "Beta.info").write_text(json.dumps({"Info": {"Title": "Beta 2"}}), encoding="utf-8")
+        (beta / "medias" / "bg.png").write_bytes(b"png")
+        _touch_later(beta / "Beta.info")
+        _touch_later(beta / "medias")
+
+        scanned = []
+        original = TableParser._scan_table_dir
+
+        def _spy(parser, table_dir, dir_stat):
+            scanned.append(table_dir.name)
+            return original(parser, table_dir, dir_stat)
+
+        with mock.patch.object(TableParser, "_scan_table_dir", _spy):
+            parser = self._parser()
+
+        self.assertEqual(scanned, ["Beta"])
+        by_name = {t.tableDirName: t for t in parser.getAllTables()}
+        self.assertEqual(by_name["Beta"].metaConfig["Info"]["Title"], "Beta 2")
+        self.assertEqual(by_name["Beta"].BGImagePath, str(beta / "medias" / "bg.png"))
+
+    def test_missing_and_unreadable_bookkeeping_survives_the_index(self) -> None:
+        self._table("NoInfo")
+        broken = self._table("Broken")
+        (broken / "Broken.info").write_text("{not json", encoding="utf-8")
+        self._parser()
+
+        with mock.patch.object(TableParser, "_scan_table_dir", side_effect=AssertionError("rescanned")):
+            parser = self._parser()
+
+        self.assertEqual([row["folder"] for row in parser.getMissingTables()], ["NoInfo"])
+        self.assertEqual([row["folder"] for row in parser.getUnreadableTables()], ["Broken"])
+        self.assertEqual([t.tableDirName for t in parser.getAllTables()], ["NoInfo"])
+
+    def test_removed_folders_are_dropped_and_other_roots_ignored(self) -> None:
+        self._table("Alpha", {})
+        gone = self._table("Gone", {})
+        self._parser()
+
+        (gone / "Gone.vpx").unlink()
+        (gone / "Gone.info").unlink()
+        gone.rmdir()
+        self._parser()
+        folders = json.loads(self.index_path.read_text(encoding="utf-8"))["folders"]
+        self.assertEqual(list(folders), [str(self.root / "Alpha")])
+
+        index = TableScanIndex(self.index_path, root=Path(self._tmp.name) / "elsewhere")
+        index.load()
+        self.assertIsNone(index.lookup(str(self.root / "Alpha"), os.stat(self.root / "Alpha")))
+
+    def test_parallel_scan_keeps_order_and_bookkeeping(self) -> None:
+        names = [f"Table {i:02d}" for i in range(12)]
+        for name in names:
+            self._table(name, {"Info": {"Title": name}})
+        self._table("NoInfo")
+        (self._table("Broken") / "Broken.info").write_text("", encoding="utf-8")
+        serial = TableParser(self.root)
+        self.assertEqual(serial.scan_workers, 1)
+
+        config = configparser.ConfigParser()
+        config.read_dict({"Settings": {"tablescanworkers": "4"}})
+        parallel = TableParser(self.root, config)
+
+        self.assertEqual(parallel.scan_workers, 4)
+        self.assertEqual(
+            [t.tableDirName for t in parallel.getAllTables()],
+            [t.tableDirName for t in serial.getAllTables()],
+        )
+        self.assertEqual(parallel.getMissingTables(), serial.getMissingTables())
+        self.assertEqual(parallel.getUnreadableTables(), serial.getUnreadableTables())
+
+    def test_table_edits_in_memory_do_not_leak_into_the_index(self) -> None:
+        self._table("Alpha", {"Info": {"Title": "Alpha"}})
+        parser = self._parser()
+        parser.getAllTables()[0].metaConfig["Info"]["Title"] = "Changed"
+
+        parser.loadTables(reload=True)
+
+        self.assertEqual(parser.getAllTables()[0].metaConfig["Info"]["Title"], "Alpha")
+
+    def test_refresh_table_splices_one_folder_in_place(self) -> None:
+        self._table("Alpha", {"Info": {"Title": "Alpha"}})
+        charlie = self._table("Charlie", {"Info": {"Title": "Charlie"}})
+        parser = self._parser()
+        view = parser.getAllTables()
+        old_charlie = view[1]
+
+        (charlie / "Charlie.info").write_text(json.dumps({"Info": {"Title": "Charlie 2"}}), encoding="utf-8")
+        self._table("Bravo", {"Info": {"Title": "Bravo"}})
+        with mock.patch.object(TableParser, "_table_dirs", side_effect=AssertionError("full rescan")):
+            refreshed = parser.refreshTable(charlie)
+            added = parser.refreshTable(self.root / "Bravo")
+
+        self.assertIs(refreshed, old_charlie)
+        self.assertEqual(view[1].metaConfig["Info"]["Title"], "Charlie 2")
+        self.assertEqual(added.tableDirName, "Bravo")
+        self.assertEqual([t.tableDirName for t in parser.getAllTables()], ["Alpha", "Bravo", "Charlie"])
+
+        (charlie / "Charlie.info").unlink()
+        parser.refreshTable(charlie)
+        self.assertEqual([row["folder"] for row in parser.getMissingTables()], ["Charlie"])
+
+        for child in charlie.iterdir():
+            child.unlink()
+        charlie.rmdir()
+        self.assertIsNone(parser.refreshTable(charlie))
+        self.assertEqual([t.tableDirName for t in parser.getAllTables()], ["Alpha", "Bravo"])
+        self.assertEqual(parser.getMissingTables(), [])
+
+    def test_score_and_medias_stay_packed_until_asked_for(self) -> None:
+        meta = {
+            "Info": {"Title": "Alpha"},
+            "User": {"Rating": 4, "Score": {"rom": "afm", "entries": [1, 2, 3]}},
+            "Medias": {"wheel": {"Source": "vpinmediadb"}},
+        }
+        self._table("Alpha", meta)
+        table = self._parser().getAllTables()[0]
+
+        self.assertNotIn("Medias", table.lightMeta)
+        self.assertNotIn("Score", table.lightMeta["User"])
+        self.assertEqual(table.expanded_meta(), meta)
+        self.assertNotIn("Medias", table.lightMeta)
+
+        self.assertEqual(table.metaConfig, meta)
+        self.assertIn("Medias", table.lightMeta)
+        with self.assertRaises(AttributeError):
+            table.unexpected = True
+
+    def test_meta_loaded_for_a_missing_info_keeps_packed_sections(self) -> None:
+        meta = {
+            "Info": {"Title": "Alpha"},
+            "User": {"Rating": 4, "Score": {"rom": "afm", "entries": [1, 2, 3]}},
+            "Medias": {"wheel": {"Source": "vpinmediadb"}},
+        }
+        self._table("Alpha", meta)
+        table = self._parser().getAllTables()[0]
+        meta_file_path(table).unlink()
+
+        self.assertEqual(load_table_meta(table), meta)
+        self.assertNotIn("Medias", table.lightMeta)
+
+
+if __name__ == "__main__":
+    unittest.main()
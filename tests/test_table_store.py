@@ -0,0 +1,238 @@
+import configparser
+import threading
+import types
+import unittest
+from unittest import mock
+
+from common.table import Table
+from frontend import table_state
+from frontend.api import API
+from frontend.table_store import TableStore
+
+
+def _library():
+    rows = [
+        ("The Addams Family", "Bally", 1992, 5),
+        ("Attack from Mars", "Bally", 1995, 4),
+        ("Black Knight", "Williams", 1980, 2),
+        ("Cactus Canyon", "Bally", 1998, 3),
+        ("Xenon", "Bally", 1980, 1),
+    ]
+    tables = []
+    for i, (title, manufacturer, year, rating) in enumerate(rows):
+        table = Table(tableDirName=f"folder{i}", fullPathTable=f"/tables/folder{i}")
+        table.load_meta({
+            "Info": {"Title": title, "Manufacturer": manufacturer, "Year": year},
+            "User": {"Rating": rating},
+        })
+        tables.append(table)
+    return tables
+
+
+def _titles(tables):
+    return [table.metaConfig["Info"]["Title"] for table in tables]
+
+
+class TestTableStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tables = _library()
+        self.store = TableStore(loader=lambda: list(self.tables))
+
+    def test_views_are_computed_once_and_shared(self) -> None:
+        first = self.store.filtered_view({"manufacturer": "Bally"})
+        second = self.store.filtered_view({"manufacturer": "Bally", "letter": None})
+        self.assertIs(first, second)
+        self.assertIsInstance(first, tuple)
+        self.assertEqual(_titles(first), ["The Addams Family", "Attack from Mars", "Cactus Canyon", "Xenon"])
+
+        by_year = self.store.sorted_view(first, "Newest")
+        self.assertIs(self.store.sorted_view(first, "Newest", "Descending"), by_year)
+        self.assertEqual(self.store.stats()["hits"], 2)
+        # The snapshot that was sorted is left as it was.
+        self.assertEqual(_titles(first)[0], "The Addams Family")
+
+    def test_a_metadata_edit_invalidates_the_views(self) -> None:
+        top_rated = self.store.filtered_view({"rating": "4", "rating_or_higher": True})
+        self.assertEqual(len(top_rated), 2)
+
+        self.tables[2].metaConfig["User"]["Rating"] = 5
+        self.tables[2].invalidate_keys()
+
+        self.assertEqual(len(self.store.filtered_view({"rating": "4", "rating_or_higher": True})), 3)
+        self.assertEqual(len(top_rated), 2)  # snapshots already handed out do not change
+
+    def test_the_same_library_keeps_its_version_and_views(self) -> None:
+        view = self.store.default_view()
+        version = self.store.version
+
+        self.store.replace_library(list(self.tables))
+        self.assertEqual(self.store.version, version)
+        self.assertIs(self.store.default_view(), view)
+
+        self.store.replace_library(self.tables[:3])
+        self.assertEqual(self.store.version, version + 1)
+        self.assertEqual(len(self.store.default_view()), 3)
+
+    def test_views_are_stamped_by_the_store_and_never_share_a_stamp(self) -> None:
+        view = self.store.default_view()
+        self.assertEqual(table_state.view_stamp(view).split(".")[0], str(self.store.version))
+        self.assertEqual(table_state.view_stamp(self.store.default_view()), table_state.view_stamp(view))
+
+        stamps = {table_state.view_stamp(view)}
+        for library in (self.tables[:3], self.tables, self.tables[:3]):
+            self.store.replace_library(library)
+            stamps.add(table_state.view_stamp(self.store.default_view()))
+        self.assertEqual(len(stamps), 4)
+
+    def test_concurrent_requests_for_one_view_compute_it_once(self) -> None:
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(self.store.filtered_view({"manufacturer": "Bally"}))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(result) for result in results}), 1)
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_a_slow_view_does_not_hold_up_other_windows(self) -> None:
+        view = self.store.default_view()
+        sorting, release, sorted_ = threading.Event(), threading.Event(), threading.Event()
+        apply_sort = table_state.apply_sort
+
+        def slow_sort(tables, sort_type, order):
+            if sort_type == "Newest":
+                sorting.set()
+                release.wait(2)
+                sorted_.set()
+            apply_sort(tables, sort_type, order)
+
+        with mock.patch.object(table_state, "apply_sort", side_effect=slow_sort):
+            worker = threading.Thread(target=self.store.sorted_view, args=(view, "Newest"))
+            worker.start()
+            self.assertTrue(sorting.wait(5))
+            try:
+                self.assertEqual(len(self.store.filtered_view({"manufacturer": "Williams"})), 1)
+                self.assertIs(self.store.default_view(), view)
+                self.assertFalse(sorted_.is_set())
+            finally:
+                release.set()
+                worker.join()
+
+
+class TestWindowsShareTheStore(unittest.TestCase):
+    def test_windows_get_the_same_snapshots_but_keep_their_own_state(self) -> None:
+        tables = _library()
+        store = TableStore(loader=lambda: list(tables))
+        parser = configparser.ConfigParser()
+        parser.read_dict({"Settings": {"startup_collection": ""}})
+        ini = types.SimpleNamespace(config=parser)
+
+        with mock.patch("frontend.api.get_table_store", return_value=store), \
+                mock.patch("frontend.api.ensure_tables_loaded", side_effect=lambda: list(tables)):
+            bg, table = API(ini, window_name="bg"), API(ini, window_name="table")
+            self.assertIs(bg.filteredTables, table.filteredTables)
+
+            for api in (table, bg):
+                api.apply_filters(manufacturer="Bally")
+                api.apply_sort("Newest", "Descending")
+            self.assertIs(bg.filteredTables, table.filteredTables)
+            self.assertEqual(bg.get_tables_window(0, None), table.get_tables_window(0, None))
+
+            table.reset_filters()
+            self.assertEqual(len(table.filteredTables), 5)
+            self.assertEqual((bg.current_filters["manufacturer"], len(bg.filteredTables)), ("Bally", 4))
+        self.assertEqual(store.version, 1)
+
+
+
+class _Window:
+    """An API's view state, without the rest of the API."""
+
+    def __init__(self, **state):
+        self.__dict__.update(state)
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tables = _library()
+        self.store = TableStore(loader=lambda: list(self.tables))
+        self.events = []
+        self.store.subscribe(self.events.append)
+
+    def _window(self, name, **filters):
+        api = _Window(window_name=name, current_collection=None)
+        api.current_filters = dict({"letter": None, "manufacturer": None}, **filters)
+        api.filteredTables = self.store.sorted_view(self.store.filtered_view(api.current_filters), "Alpha", "Ascending")
+        self.store.attach_window(api)
+        return api
+
+    def test_an_edit_is_published_as_a_delta(self) -> None:
+        window = self._window("table")
+        before = window.filteredTables
+        table = self.tables[2]
+        self.store.remember(table)
+        table.metaConfig["User"]["Rating"] = 5
+        table.invalidate_keys()
+
+        self.store.publish_changes()
+        self.assertEqual(self.events, [{
+            "type": "TableChanged",
+            "since": self.events[0]["since"],
+            "version": table.meta_version,
+            "tables": [{"fullPathTable": "/tables/folder2", "changes": {"meta": {"User": {"Rating": 5}}}}],
+        }])
+        self.assertIs(window.filteredTables, before)
+        self.assertEqual(self.store.publish_changes(), [])
+
+    def test_a_rescan_publishes_only_the_rows_that_changed(self) -> None:
+        window = self._window("table")
+        stamp = table_state.view_stamp(window.filteredTables)
+        table_state.tables_json(window.filteredTables)  # what the window was sent
+
+        rescanned = _library()
+        self.tables[:] = rescanned
+        self.assertEqual(self.store.publish_changes(), [])
+        self.assertTrue(all(any(table is new for new in rescanned) for table in window.filteredTables))
+        self.assertEqual(table_state.view_stamp(window.filteredTables), stamp)
+
+        self.tables[:] = _library()
+        self.tables[4].metaConfig["User"]["Rating"] = 3
+        self.tables[4].invalidate_keys()
+        (event,) = self.store.publish_changes()
+        self.assertEqual(event["tables"], [
+            {"fullPathTable": "/tables/folder4", "changes": {"meta": {"User": {"Rating": 3}}}},
+        ])
+
+    def test_added_and_removed_tables_follow_each_window_view(self) -> None:
+        everything, bally = self._window("bg"), self._window("table", manufacturer="Bally")
+        old_stamp = table_state.view_stamp(bally.filteredTables)
+        new = _library()
+        new_williams, new_bally = new[2], new[3]
+        new_williams.fullPathTable, new_bally.fullPathTable = "/tables/new-williams", "/tables/new-bally"
+        del self.tables[0]
+        self.tables += [new_williams, new_bally]
+
+        removed, added = self.store.publish_changes()
+        self.assertEqual(removed["tables"], ["/tables/folder0"])
+        self.assertEqual(removed["views"]["table"]["from"], old_stamp)
+        self.assertEqual(
+            [row["fullPathTable"] for row in added["tables"]], ["/tables/new-williams", "/tables/new-bally"]
+        )
+        self.assertEqual((added["views"]["bg"]["append"], added["views"]["table"]["append"]), ([0, 1], [1]))
+        self.assertEqual(added["views"]["table"]["to"], table_state.view_stamp(bally.filteredTables))
+        self.assertEqual(
+            _titles(bally.filteredTables), ["Attack from Mars", "Cactus Canyon", "Xenon", "Cactus Canyon"]
+        )
+        self.assertEqual(len(everything.filteredTables), 6)
+        self.assertEqual(len(self.store.library()), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
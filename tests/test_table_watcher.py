@@ -0,0 +1,71 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from common.table_watcher import TableWatcher
+
+
+class TestTableWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.alpha = self.root / "Alpha"
+        (self.alpha / "medias").mkdir(parents=True)
+        (self.alpha / "Alpha.vpx").write_text("", encoding="utf-8")
+        self.batches: list[list[str]] = []
+        self.received = threading.Event()
+
+    def _on_changes(self, batch: list[str]) -> None:
+        self.batches.append(batch)
+        self.received.set()
+
+    def _watch(self, **kwargs) -> TableWatcher:
+        watcher = TableWatcher(self.root, self._on_changes, batch_delay=0.05, **kwargs)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher
+
+    def _changed_folders(self) -> set[str]:
+        self.assertTrue(self.received.wait(5), "no change reported")
+        return {path for batch in self.batches for path in batch}
+
+    def test_polling_reports_changed_and_new_folders(self) -> None:
+        watcher = self._watch(poll_interval=0.1, use_inotify=False)
+        self.assertEqual(watcher.mode, "poll")
+
+        (self.alpha / "Alpha.info").write_text("{}", encoding="utf-8")
+        (self.root / "Bravo").mkdir()
+
+        expected = {str(self.alpha), str(self.root / "Bravo")}
+        # A poll can land between the two writes, so give it a few rounds.
+        for _ in range(50):
+            if expected <= self._changed_folders():
+                break
+            self.received.clear()
+            self.received.wait(0.1)
+        self.assertLessEqual(expected, self._changed_folders())
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_reports_the_table_for_a_medias_change(self) -> None:
+        watcher = self._watch()
+        if watcher.mode != "inotify":
+            self.skipTest("inotify not available here")
+
+        (self.alpha / "medias" / "wheel.png").write_bytes(b"png")
+
+        self.assertEqual(self._changed_folders(), {str(self.alpha)})
+
+    def test_queued_folders_are_flushed_as_one_sorted_batch(self) -> None:
+        watcher = TableWatcher(self.root, self._on_changes)
+        watcher.queue(["/t/b", "/t/a", "/t/b"])
+
+        self.assertEqual(watcher.flush(), ["/t/a", "/t/b"])
+        self.assertEqual(watcher.flush(), [])
+        self.assertEqual(self.batches, [["/t/a", "/t/b"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import random
+import unittest
+from difflib import SequenceMatcher
+
+from common.vpsdb import VPSdb
+from common.vpsdb_match import VPSNameIndex
+
+
+def _scan(data, name, manufacturer, year):
+    # The lookup VPSdb.lookupName used to do, kept as the reference.
+    for table in data:
+        if SequenceMatcher(None, name.lower(), table["name"].lower()).ratio() < 0.8:
+            continue
+        if SequenceMatcher(None, manufacturer.lower(), table["manufacturer"].lower()).ratio() < 0.8:
+            continue
+        if SequenceMatcher(None, str(year), str(table["year"])).ratio() >= 0.8:
+            return table
+    return None
+
+
+NAMES = [
+    "Attack from Mars", "Medieval Madness", "The Addams Family", "Twilight Zone",
+    "Monster Bash", "Cactus Canyon", "Theatre of Magic", "Scared Stiff", "Funhouse",
+    "Fish Tales", "Black Knight", "Black Knight 2000", "Space Shuttle", "Xenon", "24",
+]
+MANUFACTURERS = ["Bally", "Williams", "Stern", "Gottlieb", "Data East", "Bally Midway", "Sega"]
+
+
+def _mutate(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.randrange(3)
+        pos = rng.randrange(len(chars) + 1)
+        if op == 0:
+            chars.insert(pos, rng.choice("abcdefghij "))
+        elif op == 1 and pos < len(chars):
+            del chars[pos]
+        elif pos < len(chars):
+            chars[pos] = chars[pos].upper()
+    return "".join(chars) or text
+
+
+class TestVPSNameIndex(unittest.TestCase):
+    def _data(self, rng):
+        data = []
+        for i in range(200):
+            year = rng.randint(1975, 2000)
+            data.append({
+                "id": str(i),
+                "name": _mutate(rng, rng.choice(NAMES)),
+                "manufacturer": _mutate(rng, rng.choice(MANUFACTURERS)),
+                "year": year if rng.random() < 0.7 else str(year),
+            })
+        return data
+
+    def test_index_returns_what_the_scan_returns(self) -> None:
+        rng = random.Random(7)
+        data = self._data(rng)
+        index = VPSNameIndex(data)
+
+        matched = 0
+        for _ in range(100):
+            query = (
+                _mutate(rng, rng.choice(NAMES)),
+                _mutate(rng, rng.choice(MANUFACTURERS)),
+                rng.choice([rng.randint(1975, 2000), 1995, 19995, "199"]),
+            )
+            with self.subTest(query=query):
+                expected = _scan(data, *query)
+                self.assertIs(index.lookup(*query), expected)
+                matched += expected is not None
+        self.assertGreater(matched, 10)
+
+    def test_lookup_name_rebuilds_when_the_database_is_replaced(self) -> None:
+        vps = VPSdb.__new__(VPSdb)
+        vps.data = [{"id": "a", "name": "Xenon", "manufacturer": "Bally", "year": 1980}]
+        self.assertEqual(vps.lookupName("xenon", "Bally", 1980)["id"], "a")
+        self.assertIsNone(vps.lookupName("Xenon", "Bally", ""))
+
+        vps.data = [{"id": "b", "name": "Xenon", "manufacturer": "Bally", "year": 1980}]
+        self.assertEqual(vps.lookupName("Xenon", "Bally", 1980)["id"], "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,78 @@
+import hashlib
+import os
+import struct
 import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest import mock
 
+from common.vpx_parse_cache import VPXParseCache
 from common.vpxparser import VPXParser
 
 
+_SECTOR = 512
+_END = 0xFFFFFFFE
+_FREE = 0xFFFFFFFF
+
+
+def _write_ole(path: Path, storages: dict) -> None:
+    """A bare compound file: {storage: {stream: bytes}}, every stream at least 4096 bytes
+    so it lives in regular sectors and no mini stream is needed."""
+    entries = [("Root Entry", 5, None)]
+    for storage, streams in storages.items():
+        entries.append((storage, 1, None))
+        entries.extend((name, 2, data) for name, data in streams.items())
+
+    dir_sectors = -(-len(entries) // 4)
+    next_sector = 1 + dir_sectors
+    fat = [0xFFFFFFFD] + [i + 1 for i in range(1, dir_sectors)] + [_END]
+    starts, body = {}, b""
+    for index, (_name, kind, data) in enumerate(entries):
+        if kind != 2:
+            continue
+        count = -(-len(data) // _SECTOR)
+        starts[index] = next_sector
+        fat += [next_sector + i + 1 for i in range(count - 1)] + [_END]
+        next_sector += count
+        body += data.ljust(count * _SECTOR, b"\0")
+
+    def entry(index):
+        name, kind, data = entries[index]
+        encoded = (name + "\0").encode("utf-16-le")
+        child = right = _FREE
+        if kind == 5:
+            child = 1
+        elif kind == 1:
+            child = index + 1
+            following = [i for i in range(index + 1, len(entries)) if entries[i][1] == 1]
+            right = following[0] if following else _FREE
+        elif index + 1 < len(entries) and entries[index + 1][1] == 2:
+            right = index + 1
+        return struct.pack(
+            "<64sHBBIII16sIQQIQ",
+            encoded, len(encoded), kind, 1, _FREE, right, child, b"", 0, 0, 0,
+            starts.get(index, _END), len(data or b""),
+        )
+
+    directory = b"".join(entry(i) for i in range(len(entries))).ljust(dir_sectors * _SECTOR, b"\0")
+    header = struct.pack(
+        "<8s16sHHHHH6sIIIIIIIII",
+        bytes.fromhex("D0CF11E0A1B11AE1"), b"", 0x3E, 3, 0xFFFE, 9, 6, b"",
+        0, 1, 1, 0, 4096, _END, 0, _END, 0,
+    ) + struct.pack("<109I", 0, *([_FREE] * 108))
+    fat_sector = struct.pack(f"<{_SECTOR // 4}I", *(fat + [_FREE] * (_SECTOR // 4 - len(fat))))
+    path.write_bytes(header + fat_sector + directory + body)
+
+
+def _write_vpx(path: Path, script: str, title: str = "Example") -> None:
+    code = script.encode("utf-8")
+    game_data = (b"CODE" + struct.pack("<i", len(code)) + code).ljust(4096, b"\0")
+    _write_ole(path, {
+        "GameStg": {"GameData": game_data},
+        "TableInfo": {"TableName": title.encode("latin-1").ljust(4096, b"\0")},
+    })
+
+
 class TestVPXParser(unittest.TestCase):
     def test_extract_rom_name_ignores_single_quote_commented_cgamename_lines(self) -> None:
         parser = VPXParser()
@@ -80,6 +148,44 @@ class TestVPXParser(unittest.TestCase):
 
             self.assertEqual(values["rom"], "sidecar_active")
 
+    def test_extract_file_reads_a_real_compound_file(self) -> None:
+        with TemporaryDirectory() as tmp:
+            vpx_path = Path(tmp) / "Example.vpx"
+            _write_vpx(vpx_path, 'Const cGameName = "afm_113b"\r\nDim x : x = FlexDMD', "Attack")
+
+            values = VPXParser().singleFileExtract(str(vpx_path))
+
+            self.assertEqual(values["fileHash"], hashlib.sha256(vpx_path.read_bytes()).hexdigest())
+            self.assertEqual(values["tableName"], "Attack")
+            self.assertEqual(values["rom"], "afm_113b")
+            self.assertEqual(values["detectflex"], "true")
+            self.assertEqual(values["authorName"], "")
+
+    def test_parse_cache_skips_unchanged_files_and_sees_sidecar_edits(self) -> None:
+        with TemporaryDirectory() as tmp:
+            vpx_path = Path(tmp) / "Example.vpx"
+            _write_vpx(vpx_path, 'Const cGameName = "embedded"')
+            cache_path = Path(tmp) / "vpx_parse_cache.json"
+            first = VPXParser(cache=VPXParseCache(cache_path))
+            values = first.singleFileExtract(str(vpx_path))
+            first.cache.save()
+            self.assertIn("gameData", values)
+
+            again = VPXParser(cache=VPXParseCache(cache_path))
+            with mock.patch.object(VPXParser, "extractFile", side_effect=AssertionError("re-read")):
+                cached = again.singleFileExtract(str(vpx_path))
+            self.assertEqual(cached, {k: v for k, v in values.items() if k != "gameData"})
+
+            vbs_path = vpx_path.with_suffix(".vbs")
+            vbs_path.write_text('Const cGameName = "sidecar"', encoding="utf-8")
+            self.assertEqual(again.singleFileExtract(str(vpx_path))["rom"], "sidecar")
+
+            st = os.stat(vpx_path)
+            os.utime(vpx_path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+            with mock.patch.object(VPXParser, "extractFile", return_value={"rom": "fresh"}) as extract:
+                self.assertEqual(again.singleFileExtract(str(vpx_path)), {"rom": "fresh"})
+            extract.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,133 @@
+import http.client
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import requests
+
+from common.image_derivatives import ImageDerivativeCache
+from common.web_page_cache import HIT, MISS, REVALIDATED, STALE, CachedPage, WebPageCache
+from frontend.customhttpserver import CustomHTTPServer
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """A tutorial site: one page with an ETag, counting full and conditional requests."""
+
+    body = b"<html><head></head><body>v1</body></html>"
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestWebPageCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        _StandIn.requests = []
+        _StandIn.body, _StandIn.etag = b"<html><head></head><body>v1</body></html>", '"v1"'
+        self.site = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+        threading.Thread(target=self.site.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.site.server_address[1]}/paddock_GR0W9.html"
+        self.cache = WebPageCache(Path(self._tmp.name), ttl=60, stale_while_revalidate=600, session=requests.Session(), timeout=2)
+
+    def tearDown(self) -> None:
+        self.site.shutdown()
+        self.site.server_close()
+        self._tmp.cleanup()
+
+    def _age(self, seconds) -> None:
+        page = self.cache.load(self.url)
+        self.cache.store(CachedPage(page.url, page.text, page.fetched_at - seconds, page.etag, page.last_modified))
+
+    def test_repeat_opens_are_served_from_disk(self) -> None:
+        self.assertEqual(self.cache.get(self.url), ("<html><head></head><body>v1</body></html>", MISS))
+        for _ in range(3):
+            self.assertEqual(self.cache.get(self.url)[1], HIT)
+        self.assertEqual(_StandIn.requests, [None])
+
+    def test_stale_page_is_served_at_once_and_revalidated_in_the_background(self) -> None:
+        self.cache.get(self.url)
+        self._age(120)
+        _StandIn.body, _StandIn.etag = b"<html><body>v2</body></html>", '"v2"'
+
+        text, status = self.cache.get(self.url)
+        self.assertEqual((status, "v1" in text), (STALE, True))
+        for _ in range(200):
+            if "v2" in self.cache.load(self.url).text:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.get(self.url), ("<html><body>v2</body></html>", HIT))
+        self.assertEqual(_StandIn.requests, [None, '"v1"'])
+
+    def test_unchanged_page_revalidates_with_a_304(self) -> None:
+        self.cache.get(self.url)
+        self._age(10_000)
+        self.assertEqual(self.cache.get(self.url)[1], REVALIDATED)
+        self.assertEqual(_StandIn.requests, [None, '"v1"'])
+        self.assertEqual(self.cache.get(self.url)[1], HIT)
+
+    def test_revalidations_do_not_grow_the_cache_size(self) -> None:
+        self.cache.get(self.url)
+        for _ in range(5):
+            self._age(10_000)
+            self.assertEqual(self.cache.get(self.url)[1], REVALIDATED)
+        entry = self.cache._entry_path(self.url)
+        self.assertEqual(self.cache._total_bytes, entry.stat().st_size)
+
+    def test_cached_pages_still_open_offline(self) -> None:
+        self.cache.get(self.url)
+        self._age(10_000)
+        self.site.shutdown()
+        self.site.server_close()
+
+        text, status = self.cache.get(self.url)
+        self.assertEqual((status, "v1" in text), (STALE, True))
+        with self.assertRaises(requests.RequestException):
+            self.cache.get(self.url.replace("paddock", "other"))
+
+
+class TestPinballPrimerProxy(unittest.TestCase):
+    def test_proxy_serves_a_cached_tutorial_without_the_network(self) -> None:
+        url = "https://pinballprimer.github.io/paddock_GR0W9.html"
+        with TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            page_cache = WebPageCache(root / "pages")
+            page_cache.store(CachedPage(url, "<html><head></head><body>cached</body></html>", time.time()))
+            server = CustomHTTPServer({"/web/": root}, image_cache=ImageDerivativeCache(root / "d"), page_cache=page_cache)
+            server.start_file_server(port=0)
+            try:
+                with mock.patch.object(requests.Session, "get", side_effect=AssertionError("network used")):
+                    conn = http.client.HTTPConnection("127.0.0.1", server.file_server.server_address[1], timeout=5)
+                    conn.request("GET", f"/proxy/pinballprimer?url={url}")
+                    response = conn.getresponse()
+                    body = response.read().decode("utf-8")
+                    conn.close()
+            finally:
+                server.stop_file_server()
+
+        self.assertEqual((response.status, response.getheader("X-Cache")), (200, HIT))
+        self.assertIn(f'<base href="{url}">', body)
+        self.assertIn("cached", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
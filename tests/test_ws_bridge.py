@@ -0,0 +1,228 @@
+import asyncio
+import json
+import socket
+import struct
+import time
+import unittest
+
+import websockets
+
+from frontend.api_metrics import ApiMetrics
+from frontend.ws_bridge import WebSocketBridge, _Outbox
+
+
+class _FakeApi:
+    TABLES = json.dumps([{"tableDirName": f"Table {i}", "meta": {"Info": {"Title": "Café ☃"}}} for i in range(500)])
+
+    def get_tables(self, reset=False):
+        return self.TABLES
+
+    def get_theme_config(self):
+        return {"name": "demo"}
+
+
+class _SlowApi:
+    def get_theme_config(self):
+        time.sleep(0.1)
+        return {"name": "slow"}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestWebSocketBridge(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.bridge = WebSocketBridge(port=_free_port(), metrics=ApiMetrics())
+        cls.bridge.register_api("table", _FakeApi())
+        cls.bridge.register_api("bg", _SlowApi())
+        cls.bridge.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.bridge.stop()
+
+    def _exchange(self, query, *methods):
+        async def run():
+            url = f"ws://127.0.0.1:{self.bridge.port}?{query}"
+            async with websockets.connect(url) as ws:
+                frames = []
+                for call_id, method in enumerate(methods):
+                    await ws.send(json.dumps({"type": "api_call", "id": str(call_id), "method": method, "args": []}))
+                    frames.append(await ws.recv())
+                return ws.response.headers.get("Sec-WebSocket-Extensions"), frames
+
+        return asyncio.run(run())
+
+    def test_deflate_is_negotiated_with_the_full_window(self) -> None:
+        extensions, _frames = self._exchange("window=table", "get_theme_config")
+        self.assertIn("permessage-deflate", extensions)
+        self.assertNotIn("server_max_window_bits", extensions)
+
+    def test_json_clients_get_text_frames(self) -> None:
+        _extensions, (tables, config) = self._exchange("window=table", "get_tables", "get_theme_config")
+        self.assertEqual(json.loads(tables)["result"], _FakeApi.TABLES)
+        self.assertEqual(json.loads(config)["result"], {"name": "demo"})
+
+    def test_compact_clients_get_string_results_as_raw_utf8(self) -> None:
+        _extensions, (tables, config) = self._exchange("window=table&encoding=compact", "get_tables", "get_theme_config")
+
+        self.assertIsInstance(tables, bytes)
+        header_length = struct.unpack(">I", tables[:4])[0]
+        header = json.loads(tables[4:4 + header_length])
+        self.assertEqual(header, {"type": "api_response", "id": "0", "body": "result"})
+        self.assertEqual(tables[4 + header_length:].decode("utf-8"), _FakeApi.TABLES)
+
+        # Results that are not strings gain nothing from it and stay JSON text.
+        self.assertEqual(json.loads(config)["result"], {"name": "demo"})
+
+    def test_calls_are_timed_per_method(self) -> None:
+        self.bridge.metrics.reset()
+        self._exchange("window=table", "get_tables", "get_tables", "no_such_method")
+
+        methods = self.bridge.metrics.snapshot()["methods"]
+        self.assertEqual(list(methods), ["get_tables"])  # refused calls never reach a thread
+        self.assertEqual((methods["get_tables"]["calls"], methods["get_tables"]["errors"]), (2, 0))
+        self.assertGreater(methods["get_tables"]["max_response_bytes"], len(_FakeApi.TABLES))
+        self.assertGreater(methods["get_tables"]["execution"]["max_ms"], 0)
+
+    def test_queue_wait_counts_time_behind_the_windows_earlier_calls(self) -> None:
+        self.bridge.metrics.reset()
+
+        async def run():
+            async with websockets.connect(f"ws://127.0.0.1:{self.bridge.port}?window=bg") as ws:
+                for call_id in ("0", "1"):
+                    await ws.send(json.dumps({"type": "api_call", "id": call_id, "method": "get_theme_config", "args": []}))
+                return [json.loads(await ws.recv())["id"] for _ in range(2)]
+
+        self.assertEqual(asyncio.run(run()), ["0", "1"])
+        wait = self.bridge.metrics.snapshot()["methods"]["get_theme_config"]["queue_wait"]
+        self.assertGreaterEqual(wait["max_ms"], 90)
+
+
+class _FakeSocket:
+    """Records frames; `send` blocks while the gate is closed, like a window that stopped reading."""
+
+    def __init__(self, gate_open=True):
+        self.frames = []
+        self.gate = asyncio.Event()
+        if gate_open:
+            self.gate.set()
+
+    async def send(self, frame):
+        await self.gate.wait()
+        self.frames.append(frame)
+
+
+async def _settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestOutbox(unittest.TestCase):
+    def test_pending_progress_is_coalesced_in_place(self) -> None:
+        async def run():
+            ws = _FakeSocket(gate_open=False)
+            outbox = _Outbox(ws)
+            outbox.start()
+            outbox.put_event("progress 1", "buildmeta_progress")
+            await _settle()  # progress 1 is now in send(), no longer pending
+            outbox.put_event("progress 2", "buildmeta_progress")
+            outbox.put_event("log", None)
+            outbox.put_event("progress 3", "buildmeta_progress")
+            outbox.put_event("progress 4", "buildmeta_progress")
+            ws.gate.set()
+            await _settle()
+            outbox.stop()
+            return ws.frames, outbox.stats()
+
+        frames, stats = asyncio.run(run())
+        self.assertEqual(frames, ["progress 1", "progress 4", "log"])
+        self.assertEqual((stats["coalesced"], stats["depth"], stats["sent"]), (2, 0, 3))
+
+    def test_full_queue_drops_oldest_droppable_events_but_never_responses(self) -> None:
+        async def run():
+            ws = _FakeSocket(gate_open=False)
+            outbox = _Outbox(ws, max_depth=3)
+            outbox.put_response("response")
+            for i in range(5):
+                outbox.put_event(f"event {i}", droppable=True)
+            stats = outbox.stats()
+            outbox.start()
+            ws.gate.set()
+            await _settle()
+            outbox.stop()
+            return ws.frames, stats
+
+        frames, stats = asyncio.run(run())
+        self.assertEqual(frames, ["response", "event 3", "event 4"])
+        self.assertEqual((stats["depth"], stats["dropped"]), (3, 3))
+
+    def test_table_changes_survive_an_overflow_of_progress_events(self) -> None:
+        async def run():
+            bridge = WebSocketBridge()
+            bridge._loop = asyncio.get_running_loop()
+            ws = _FakeSocket(gate_open=False)
+            bridge._connections["table"] = ws
+            bridge._outboxes[ws] = outbox = _Outbox(ws, max_depth=4)
+            bridge.send_event_all({"type": "TableChanged", "since": 1, "version": 2, "tables": []})
+            await _settle()
+            for i in range(10):
+                # Each from its own build, so none coalesce into another.
+                bridge._fan_out(json.dumps({"type": "event", "message": {"type": "buildmeta_progress", "current": i}}),
+                                None, True, None, None)
+            bridge.send_event_all({"type": "TablesRemoved", "tables": ["/tables/a"], "views": {}})
+            await _settle()
+            stats = outbox.stats()
+            outbox.start()
+            ws.gate.set()
+            await _settle()
+            outbox.stop()
+            return [json.loads(frame)["message"]["type"] for frame in ws.frames], stats
+
+        types, stats = asyncio.run(run())
+        self.assertEqual(types[0], "TableChanged")
+        self.assertEqual(types[-1], "TablesRemoved")
+        self.assertEqual(types.count("buildmeta_progress"), 2)
+        self.assertEqual((stats["dropped"], stats["depth"]), (8, 4))
+
+        # With nothing droppable left to evict, the queue grows rather than losing an event.
+        outbox = _Outbox(_FakeSocket(gate_open=False), max_depth=2)
+        for i in range(4):
+            outbox.put_event(f"TableChanged {i}")
+        self.assertEqual((outbox.depth, outbox.stats()["dropped"]), (4, 0))
+
+    def test_a_stalled_window_does_not_hold_up_the_others(self) -> None:
+        async def run():
+            bridge = WebSocketBridge()
+            bridge._loop = asyncio.get_running_loop()
+            stalled, healthy = _FakeSocket(gate_open=False), _FakeSocket()
+            for name, ws in (("dmd", stalled), ("bg", healthy)):
+                bridge._connections[name] = ws
+                bridge._outboxes[ws] = _Outbox(ws)
+                bridge._outboxes[ws].start()
+            for i in range(100):
+                bridge.send_event_all_with_iframe({"type": "buildmeta_progress", "current": i})
+                await asyncio.sleep(0)
+            bridge.send_event_all({"type": "done"}, exclude="table")
+            await _settle()
+            stats = bridge.queue_stats()
+            for outbox in bridge._outboxes.values():
+                outbox.stop()
+            return healthy.frames, stats
+
+        frames, stats = asyncio.run(run())
+        messages = [json.loads(frame)["message"] for frame in frames]
+        self.assertEqual(len(messages), 101)
+        self.assertEqual(messages[-1], {"type": "done"})
+        self.assertEqual(stats["bg"]["depth"], 0)
+        # The stalled window is one send behind, holding only the newest progress and "done".
+        self.assertEqual(stats["dmd"]["depth"], 2)
+        self.assertEqual(stats["dmd"]["coalesced"], 98)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,10 +35,15 @@ const DEFAULT_MEDIA_PRIORITIES = {
 
 const MISSING_MEDIA_URL = "/web/images/file_missing.png";
 
+// Pushed by the backend whenever tables are edited, added or removed.
+const TABLE_CHANGE_EVENTS = new Set(["TableChanged", "TablesAdded", "TablesRemoved"]);
+
 
 class VPinFECore {
   constructor() {
     this.tableData = {};
+    this._tableDataVersion = null; // meta version / view stamp tableData was loaded at
+    this._tableDataView = null;
     this.monitors = [];
     this._resolveReady = null;
     this.ready = new Promise(resolve => this._resolveReady = resolve);
@@ -112,6 +117,7 @@ class VPinFECore {
     this._audioCurrentUrl = null;
     this._audioRetries = 0;
     this._lastFrontendDofIndex = null;
+    this._corePrefetchRadius = 2;
     this._vpinplayRatingCache = new Map();
     this._vpinplayRatingRequests = new Map();
 
@@ -198,11 +204,26 @@ class VPinFECore {
   }
 
   // get table image url paths
-  getImageURL(index, type) {
+  getImageURL(index, type, size = null) {
     const table = this.tableData[index];
     if (!table) return null;
     const field = MEDIA_PATH_FIELDS[type];
-    return field ? this.#convertPathToURL(table[field]) : null;
+    const url = field ? this.#convertPathToURL(table[field]) : null;
+    return size ? this.getResizedImageURL(url, size) : url;
+  }
+
+  // Ask the asset server for a copy scaled to fit `width` x `height` (either may be
+  // omitted) and re-encoded as `format` ("webp" by default, or "png"/"jpeg"). The copy is
+  // made once and cached, so a small wheel icon no longer decodes the full-size image.
+  getResizedImageURL(url, { width = null, height = null, format = "webp" } = {}) {
+    if (!url || !/\.(png|jpe?g|webp|bmp|gif)$/i.test(url.split("?")[0])) return url;
+    const params = new URLSearchParams();
+    if (width) params.set("w", String(Math.round(width)));
+    if (height) params.set("h", String(Math.round(height)));
+    if (format) params.set("fmt", format);
+    const query = params.toString();
+    if (!query) return url;
+    return `${url}${url.includes("?") ? "&" : "?"}${query}`;
   }
 
   getMediaURL(index, type) {
@@ -255,6 +276,18 @@ class VPinFECore {
     return !!this._corePagingEnabled;
   }
 
+  // Core asks the backend to warm the media of the tables either side of the
+  // wheel whenever the table window moves it. radius 0 turns that off; themes
+  // can also call prefetchMedia() themselves, e.g. ahead of a paging jump.
+  setCorePrefetchRadius(radius = 2) {
+    const value = Math.floor(Number(radius));
+    this._corePrefetchRadius = Number.isFinite(value) && value > 0 ? value : 0;
+  }
+
+  async prefetchMedia(index = this._currentTableIndex, radius = this._corePrefetchRadius || 2) {
+    return await this.call("prefetch_media", index, radius);
+  }
+
   // Ask the backend where a page next/prev press should land. Available to
   // themes doing their own paging animation.
   async getPageIndex(direction = "next", index = this._currentTableIndex) {
@@ -436,7 +469,11 @@ class VPinFECore {
   }
 
   async getTableData(reset=false) {
-    this.tableData = JSON.parse(await this.call("get_tables", reset));
+    // The whole view, plus the version/view stamps syncTableData() needs later.
+    const page = JSON.parse(await this.call("get_tables_window", 0, null, reset));
+    this.tableData = page.tables;
+    this._tableDataVersion = page.version;
+    this._tableDataView = page.view;
     this.#attachCachedVPinPlayRatings();
     if (this._windowName === "table") {
       const maxIndex = Math.max(0, this.tableData.length - 1);
@@ -454,6 +491,81 @@ class VPinFECore {
     }
   }
 
+  // Fetch `limit` tables of the current view starting at `offset` without touching
+  // tableData, e.g. just the slots a wheel shows. Resolves to
+  // {total, offset, version, view, tables}.
+  async getTableWindow(offset = 0, limit = 50) {
+    return JSON.parse(await this.call("get_tables_window", offset, limit));
+  }
+
+  // Bring tableData up to date with only the tables edited since it was loaded
+  // (ratings, rescanned folders). When the view itself changed underneath - a
+  // filter, sort or reload - the backend sends every table instead. Resolves to
+  // the number of tables replaced.
+  async syncTableData() {
+    const diff = JSON.parse(await this.call(
+      "get_tables_since",
+      this._tableDataVersion ?? -1,
+      this._tableDataView ?? null,
+    ));
+    if (diff.full || !Array.isArray(this.tableData)) {
+      this.tableData = diff.changed.map(entry => entry.table);
+    } else {
+      for (const entry of diff.changed) this.tableData[entry.index] = entry.table;
+    }
+    this._tableDataVersion = diff.version;
+    this._tableDataView = diff.view;
+    if (diff.changed.length) this.#attachCachedVPinPlayRatings();
+    return diff.changed.length;
+  }
+
+  // Patch tableData from a TableChanged, TablesAdded or TablesRemoved event, so an
+  // edit costs one small message instead of a reload. handleEvent() calls this before
+  // the theme's own handlers run. The events say which version (TableChanged) or view
+  // (the other two) they apply to; when tableData holds something else, e.g. an event
+  // was missed, it is brought up to date with syncTableData() instead. Resolves to true
+  // when tableData changed.
+  async applyTableChange(message) {
+    if (!Array.isArray(this.tableData) || this._tableDataVersion === null) return false;
+
+    if (message.type === "TableChanged") {
+      if (this._tableDataVersion !== message.since) return (await this.syncTableData()) > 0;
+      const positions = new Map(this.tableData.map((table, index) => [table.fullPathTable, index]));
+      for (const { fullPathTable, changes } of message.tables) {
+        const table = this.tableData[positions.get(fullPathTable)];
+        if (!table) continue;
+        const { meta, ...fields } = changes;
+        Object.assign(table, fields);
+        if (meta) {
+          table.meta = table.meta || {};
+          for (const [section, value] of Object.entries(meta)) {
+            if (value === null) delete table.meta[section];
+            else table.meta[section] = value;
+          }
+        }
+      }
+      this._tableDataVersion = message.version;
+      this.#attachCachedVPinPlayRatings();
+      return message.tables.length > 0;
+    }
+
+    const view = (message.views || {})[this._windowName];
+    if (!view) return false;
+    if (this._tableDataView !== view.from) return (await this.syncTableData()) > 0;
+    if (message.type === "TablesRemoved") {
+      const removed = new Set(message.tables);
+      const current = this.tableData[this._currentTableIndex];
+      this.tableData = this.tableData.filter(table => !removed.has(table.fullPathTable));
+      const kept = current ? this.tableData.indexOf(current) : -1;
+      this._currentTableIndex = kept >= 0 ? kept : Math.min(this._currentTableIndex, Math.max(0, this.tableData.length - 1));
+    } else {
+      for (const position of view.append) this.tableData.push(message.tables[position]);
+      this.#attachCachedVPinPlayRatings();
+    }
+    this._tableDataView = view.to;
+    return view.from !== view.to;
+  }
+
   // On first table-data load, ask the backend for the last-launched table's
   // index and, if it isn't already first, move the wheel there. Sending a
   // TableIndexUpdate (inc self) drives the theme through the same path its own
@@ -507,6 +619,8 @@ class VPinFECore {
     }
     this.#handleFrontendInputLifecycleEvent(message);
 
+    if (TABLE_CHANGE_EVENTS.has(message.type)) await this.applyTableChange(message);
+
     // Default handling for TableDataChange
     if (message.type === "TableDataChange") {
       if (this._windowName === "table") this._lastFrontendDofIndex = null;
@@ -626,6 +740,7 @@ class VPinFECore {
     if (message.type === "TableIndexUpdate") {
       this.getVPinPlayRating(this._currentTableIndex).catch(() => {});
       this.#updateFrontendDofForCurrentTable().catch(() => {});
+      if (this._corePrefetchRadius > 0) this.prefetchMedia().catch(() => {});
       return;
     }
     if (message.type === "TableDataChange") {
@@ -862,10 +977,27 @@ class VPinFECore {
   // private functions
   // **********************************************
 
+  // Binary frames from the bridge (encoding=compact): a 4-byte big-endian header
+  // length, the JSON header, then the UTF-8 text of a string result. Text frames
+  // are plain JSON, so an older bridge that ignores the option still works.
+  #decodeFrame(data) {
+    if (typeof data === "string") return JSON.parse(data);
+    const view = new DataView(data);
+    const headerLength = view.getUint32(0);
+    const decoder = new TextDecoder();
+    const message = JSON.parse(decoder.decode(new Uint8Array(data, 4, headerLength)));
+    if (message.body === "result") {
+      message.result = decoder.decode(new Uint8Array(data, 4 + headerLength));
+      delete message.body;
+    }
+    return message;
+  }
+
   #connectWebSocket() {
-    const wsUrl = `ws://127.0.0.1:${this.wsPort}?window=${this._windowName}`;
+    const wsUrl = `ws://127.0.0.1:${this.wsPort}?window=${this._windowName}&encoding=compact`;
     console.log(`[WS] Connecting to ${wsUrl}`);
     this._ws = new WebSocket(wsUrl);
+    this._ws.binaryType = "arraybuffer";
 
     this._ws.onopen = async () => {
       console.log("[WS] Connected to bridge");
@@ -874,7 +1006,7 @@ class VPinFECore {
     };
 
     this._ws.onmessage = (event) => {
-      const data = JSON.parse(event.data);
+      const data = this.#decodeFrame(event.data);
       if (data.type === 'api_response') {
         const pending = this._pendingCalls[data.id];
         if (pending) {